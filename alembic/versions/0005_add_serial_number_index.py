@@ -0,0 +1,26 @@
+"""add_serial_number_index
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 09:12:41.518204
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        op.f("ix_assets_serial_number"), "assets", ["serial_number"], unique=False
+    )
+
+
+def downgrade():
+    op.drop_index(op.f("ix_assets_serial_number"), table_name="assets")
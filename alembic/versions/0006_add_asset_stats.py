@@ -0,0 +1,51 @@
+"""add_asset_stats
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 10:02:17.804361
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "asset_stats",
+        sa.Column("dimension", sa.String(), nullable=False),
+        sa.Column("key", sa.String(), nullable=False),
+        sa.Column("assets", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("units", sa.Integer(), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint("dimension", "key"),
+    )
+    # Seed from existing inventory; writes keep it current from here on
+    op.execute(
+        """
+        INSERT INTO asset_stats (dimension, key, assets, units)
+        SELECT 'total', 'all', count(*), coalesce(sum(count), 0)
+          FROM assets HAVING count(*) > 0
+        UNION ALL
+        SELECT 'type', type, count(*), sum(count) FROM assets GROUP BY type
+        UNION ALL
+        SELECT 'owner', CAST(owner_id AS VARCHAR), count(*), sum(count)
+          FROM assets GROUP BY owner_id
+        UNION ALL
+        SELECT 'status',
+               CASE WHEN check_out_date IS NULL THEN 'checked_in'
+                    ELSE 'checked_out' END,
+               count(*), sum(count)
+          FROM assets GROUP BY 2
+        """
+    )
+
+
+def downgrade():
+    op.drop_table("asset_stats")
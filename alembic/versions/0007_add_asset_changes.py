@@ -0,0 +1,40 @@
+"""add_asset_changes
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 11:20:05.331978
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "asset_changes",
+        sa.Column("seq", sa.BigInteger(), primary_key=True, autoincrement=True),
+        sa.Column("asset_id", sa.String(), nullable=False),
+        sa.Column("op", sa.String(), nullable=False),
+        sa.Column("changed_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index(
+        op.f("ix_asset_changes_changed_at"), "asset_changes", ["changed_at"]
+    )
+    # Existing assets become inserts so a sync from cursor 0 sees everything
+    op.execute(
+        "INSERT INTO asset_changes (asset_id, op, changed_at) "
+        "SELECT id, 'insert', now() FROM assets ORDER BY id"
+    )
+
+
+def downgrade():
+    op.drop_index(op.f("ix_asset_changes_changed_at"), table_name="asset_changes")
+    op.drop_table("asset_changes")
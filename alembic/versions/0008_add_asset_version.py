@@ -0,0 +1,28 @@
+"""add_asset_version
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 12:41:53.096117
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "assets",
+        sa.Column("version", sa.Integer(), nullable=False, server_default="1"),
+    )
+
+
+def downgrade():
+    op.drop_column("assets", "version")
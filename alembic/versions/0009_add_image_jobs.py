@@ -0,0 +1,35 @@
+"""add_image_jobs
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19 14:02:37.518240
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "image_jobs",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("asset_id", sa.String(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("error", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index(op.f("ix_image_jobs_asset_id"), "image_jobs", ["asset_id"])
+
+
+def downgrade():
+    op.drop_index(op.f("ix_image_jobs_asset_id"), table_name="image_jobs")
+    op.drop_table("image_jobs")
@@ -0,0 +1,36 @@
+"""add_redescribe_runs
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19 16:41:09.207315
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "redescribe_runs",
+        sa.Column("name", sa.String(), primary_key=True),
+        sa.Column("target", sa.String(), nullable=False),
+        sa.Column("last_asset_id", sa.String(), nullable=True),
+        sa.Column("processed", sa.Integer(), nullable=False),
+        sa.Column("updated", sa.Integer(), nullable=False),
+        sa.Column("skipped", sa.Integer(), nullable=False),
+        sa.Column("failed", sa.Integer(), nullable=False),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade():
+    op.drop_table("redescribe_runs")
@@ -0,0 +1,24 @@
+"""add_image_job_user
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-19 21:12:40.518302
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0011"
+down_revision = "0010"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("image_jobs", sa.Column("user_id", sa.Integer(), nullable=True))
+
+
+def downgrade():
+    op.drop_column("image_jobs", "user_id")
@@ -1,17 +1,34 @@
-from fastapi import Depends, HTTPException
+import json
+
+from fastapi import Depends, HTTPException, Request
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
+from app.core.cache import (
+    get_cached_value,
+    recent_write_key,
+    set_cached_value,
+    user_cache_key,
+)
 from app.core.config import settings, API_V1_PREFIX
-from app.core.database import get_session
+from app.core.database import get_session, mark_writes_by, replica_router
 from app.models.user import User
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{API_V1_PREFIX}/auth/login")
 
+# Cached for authentication; the password hash never goes to Redis
+CACHED_USER_FIELDS = ("id", "email", "name", "phone", "last_ip")
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
 
 async def get_current_user(
+    request: Request,
     token: str = Depends(oauth2_scheme),
     session=Depends(get_session),
 ):
+    """
+    The token's user. Served from Redis for AUTH_USER_CACHE_TTL s when cached,
+    as a detached User, so authenticating doesn't cost a DB connection.
+    """
     try:
         payload = jwt.decode(
             token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM]
@@ -20,7 +37,40 @@ async def get_current_user(
     except JWTError:
         raise HTTPException(401, "Invalid token")
 
+    if request.method not in SAFE_METHODS:
+        # Marked as each write commits, before the response can reach the
+        # client, so its next read is already routed to the primary
+        mark_writes_by(session, user_id)
+
+    if settings.AUTH_USER_CACHE_TTL:
+        cached = await get_cached_value(user_cache_key(user_id))
+        if cached:
+            return User(**json.loads(cached))
+
     user = await session.get(User, user_id)
     if not user:
         raise HTTPException(401, "User not found")
+    if settings.AUTH_USER_CACHE_TTL:
+        fields = {name: getattr(user, name) for name in CACHED_USER_FIELDS}
+        await set_cached_value(
+            user_cache_key(user_id),
+            json.dumps(fields),
+            expire=settings.AUTH_USER_CACHE_TTL,
+        )
     return user
+
+
+async def get_read_session(
+    user=Depends(get_current_user), session=Depends(get_session)
+):
+    """
+    Session for read-only endpoints: on a replica when any are configured,
+    else the request's own session. Users who wrote in the last
+    DB_READ_YOUR_WRITES s stay on the primary, so they see their own changes
+    despite replication lag.
+    """
+    if not replica_router.replicas or await get_cached_value(recent_write_key(user.id)):
+        yield session
+        return
+    async with replica_router.session() as replica_session:
+        yield replica_session
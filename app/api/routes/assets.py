@@ -1,37 +1,258 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile
-from app.core.database import get_session
-from app.schemas.asset import AssetCreate, AssetUpdate, AssetOut
+import asyncio
+import json
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from app.core.config import API_V1_PREFIX
+from app.core.database import (
+    get_session,
+    get_session_factory,
+    mark_writes_by,
+    reads_from_replica,
+    release_connection,
+)
+from app.core.multipart import (
+    MultipartError,
+    PartTooLargeError,
+    UploadedPart,
+    iter_parts,
+    read_file_part,
+)
+from app.schemas.asset import (
+    AssetChangesPage,
+    AssetCreate,
+    AssetUpdate,
+    AssetOut,
+    AssetPartialOut,
+    AssetStats,
+    AssetSuggestion,
+    ImageUploadResult,
+)
+from app.schemas.image_job import ImageJobOut
 from app.schemas.response import SuccessResponse
+from app.services.ai_service import (
+    AIService,
+    AIOverloadedError,
+    AIProviderError,
+    admission_concurrency,
+    get_ai_service,
+    detect_image_type,
+    sniff_image_type,
+    MAX_BATCH_IMAGES,
+    MAX_IMAGE_SIZE,
+)
 from app.services.asset_service import AssetService
-from app.api.deps import get_current_user
-from app.core.cache import cache_response, invalidate_cache
+from app.services.change_log_service import ChangeLogExpiredError
+from app.services.image_job_service import (
+    ImageJobQueue,
+    ImageJobQueueFullError,
+    get_image_job_queue,
+)
+from app.api.deps import get_current_user, get_read_session
+from app.core.cache import (
+    ASSET_COLLECTION_VERSION_KEY,
+    ASSET_LIST_KEY,
+    asset_version_key,
+    cache_response,
+    get_cached_version,
+    invalidate_asset_cache,
+    mirror_version,
+)
+from app.core.etag import check_not_modified, make_etag
 
 router = APIRouter(prefix="/assets")
 
 
-@router.get("", response_model=SuccessResponse[list[AssetOut]])
-@cache_response(key_pattern="assets:list", expire=60)
+ASSET_FIELDS = tuple(AssetOut.model_fields)
+
+
+def parse_fields(
+    fields: str | None = Query(
+        None, description="Comma-separated fields to return, e.g. id,name,type"
+    ),
+) -> tuple[str, ...] | None:
+    """
+    Sparse fieldset from `?fields=`, in canonical (schema) order.
+
+    `id` is always included. Returns None when every field is requested, so
+    the full and the unprojected response share cache entries and ETags.
+    """
+    if not fields:
+        return None
+    requested = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = requested.difference(ASSET_FIELDS)
+    if unknown:
+        raise HTTPException(400, f"Unknown fields: {', '.join(sorted(unknown))}")
+    requested.add("id")
+    if len(requested) == len(ASSET_FIELDS):
+        return None
+    return tuple(f for f in ASSET_FIELDS if f in requested)
+
+
+def _projection_tag(fields: tuple[str, ...] | None) -> tuple[str, ...]:
+    """Extra ETag part for projected responses; none for the full schema."""
+    return ("+".join(fields),) if fields else ()
+
+
+async def collection_etag(
+    request: Request,
+    response: Response,
+    session=Depends(get_read_session),
+    user=Depends(get_current_user),
+    fields: tuple[str, ...] | None = Depends(parse_fields),
+) -> str:
+    """
+    ETag for the asset list, from the change log head and the projection.
+
+    The version is mirrored in Redis, so a matching If-None-Match is answered
+    with a 304 before the list cache or the assets table is touched.
+    """
+    version = await get_cached_version(ASSET_COLLECTION_VERSION_KEY)
+    if version is None:
+        version = await AssetService().collection_version(session)
+        if not reads_from_replica(session):  # a lagging replica's is stale
+            await mirror_version(ASSET_COLLECTION_VERSION_KEY, version)
+    etag = make_etag("assets", version, *_projection_tag(fields))
+    check_not_modified(request, etag)
+    response.headers["ETag"] = etag
+    return etag
+
+
+async def asset_precondition(
+    asset_id: str,
+    request: Request,
+    fields: tuple[str, ...] | None = Depends(parse_fields),
+):
+    """304 straight from the Redis-mirrored asset version, when it's there."""
+    version = await get_cached_version(asset_version_key(asset_id))
+    if version is not None:
+        check_not_modified(
+            request, make_etag(asset_id, version, *_projection_tag(fields))
+        )
+
+
+def _list_cache_variant(etag: str, **kwargs) -> str:
+    # The collection ETag already encodes version and projection
+    return etag.strip('"')
+
+
+@router.get(
+    "",
+    response_model=SuccessResponse[list[AssetPartialOut]],
+    response_model_exclude_unset=True,
+)
+@cache_response(key_pattern=ASSET_LIST_KEY, expire=60, vary_on=_list_cache_variant)
 async def list_assets(
-    session=Depends(get_session),
+    session=Depends(get_read_session),
     user=Depends(get_current_user),
+    fields: tuple[str, ...] | None = Depends(parse_fields),
+    etag: str = Depends(collection_etag),
 ):
     svc = AssetService()
-    assets = await svc.list_assets(session)
+    assets = await svc.list_assets(session, fields=fields)
+    if not fields:
+        # Validate up front so the cached copy holds real JSON, not ORM reprs
+        assets = [AssetOut.model_validate(asset) for asset in assets]
     return SuccessResponse(
         message="Assets retrieved successfully", code=200, data=assets
     )
 
 
-@router.get("/{asset_id}", response_model=SuccessResponse[AssetOut])
+@router.get("/suggest", response_model=SuccessResponse[list[AssetSuggestion]])
+async def suggest_assets(
+    prefix: str = Query(..., min_length=1, max_length=64),
+    field: Literal["serial_number", "model"] | None = None,
+    limit: int = Query(10, ge=1, le=50),
+    user=Depends(get_current_user),
+):
+    """Typeahead over serial numbers and models, served from the in-memory index."""
+    svc = AssetService()
+    suggestions = svc.suggest(prefix, field=field, limit=limit)
+    return SuccessResponse(
+        message="Suggestions retrieved successfully", code=200, data=suggestions
+    )
+
+
+@router.get("/changes", response_model=SuccessResponse[AssetChangesPage])
+async def list_asset_changes(
+    since: int | None = Query(None, ge=0),
+    limit: int = Query(500, ge=1, le=1000),
+    session=Depends(get_session),
+    user=Depends(get_current_user),
+):
+    """
+    Delta sync. Without `since`, returns only the current cursor: take it,
+    fetch GET /assets once, then poll with `since=<next_cursor>`. A 410 means
+    the cursor fell out of the retention window and the client must resync.
+    """
+    svc = AssetService()
+    try:
+        changes, next_cursor, has_more = await svc.get_changes(session, since, limit)
+    except ChangeLogExpiredError as e:
+        raise HTTPException(410, str(e))
+    return SuccessResponse(
+        message="Asset changes retrieved successfully",
+        code=200,
+        data={"changes": changes, "next_cursor": next_cursor, "has_more": has_more},
+    )
+
+
+@router.get("/stats", response_model=SuccessResponse[AssetStats])
+async def get_asset_stats(
+    session=Depends(get_read_session),
+    user=Depends(get_current_user),
+):
+    """Inventory counts by type, owner and check-in status."""
+    svc = AssetService()
+    stats = await svc.get_stats(session)
+    return SuccessResponse(
+        message="Asset stats retrieved successfully", code=200, data=stats
+    )
+
+
+@router.get("/by-serial/{serial_number}", response_model=SuccessResponse[AssetOut])
+async def get_asset_by_serial(
+    serial_number: str,
+    session=Depends(get_read_session),
+    user=Depends(get_current_user),
+):
+    svc = AssetService()
+    asset = await svc.get_asset_by_serial(session, serial_number)
+    if not asset:
+        raise HTTPException(404, "Asset not found")
+    return SuccessResponse(message="Asset retrieved successfully", code=200, data=asset)
+
+
+@router.get(
+    "/{asset_id}",
+    response_model=SuccessResponse[AssetPartialOut],
+    response_model_exclude_unset=True,
+    dependencies=[Depends(asset_precondition)],
+)
 async def get_asset(
     asset_id: str,
-    session=Depends(get_session),
+    request: Request,
+    response: Response,
+    session=Depends(get_read_session),
     user=Depends(get_current_user),
+    fields: tuple[str, ...] | None = Depends(parse_fields),
 ):
     svc = AssetService()
-    asset = await svc.get_asset(session, asset_id)
+    if fields:
+        asset = await svc.get_asset_fields(session, asset_id, fields)
+        version = asset.pop("version") if asset else None
+    else:
+        asset = await svc.get_asset(session, asset_id)
+        version = asset.version if asset else None
     if not asset:
         raise HTTPException(404, "Asset not found")
+
+    if not reads_from_replica(session):
+        await mirror_version(asset_version_key(asset_id), version)
+    etag = make_etag(asset_id, version, *_projection_tag(fields))
+    check_not_modified(request, etag)
+    response.headers["ETag"] = etag
     return SuccessResponse(message="Asset retrieved successfully", code=200, data=asset)
 
 
@@ -56,7 +277,7 @@ async def create_asset(
         owner_email=data.owner_email,
         current_user=user,
     )
-    await invalidate_cache("assets:list")
+    await invalidate_asset_cache(asset.id)
     return SuccessResponse(message="Asset created successfully", code=201, data=asset)
 
 
@@ -84,7 +305,7 @@ async def update_asset(
         data.check_in_date,
         data.check_out_date,
     )
-    await invalidate_cache("assets:list")
+    await invalidate_asset_cache(asset_id)
     return SuccessResponse(
         message="Asset updated successfully", code=200, data=updated_asset
     )
@@ -102,59 +323,295 @@ async def delete_asset(
         raise HTTPException(404, "Asset not found")
 
     await svc.delete_asset(session, asset)
-    await invalidate_cache("assets:list")
+    await invalidate_asset_cache(asset_id)
+
 
+def _multipart_body(*properties: str) -> dict:
+    """OpenAPI request body for routes that parse multipart uploads themselves."""
+    schema = {
+        "type": "object",
+        "properties": {
+            name: {"type": "string", "format": "binary"} for name in properties
+        },
+    }
+    if properties:
+        schema["required"] = list(properties)
+    else:
+        schema["additionalProperties"] = {"type": "string", "format": "binary"}
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {"multipart/form-data": {"schema": schema}},
+        }
+    }
 
-@router.post("/{asset_id}/upload-image", response_model=SuccessResponse[AssetOut])
+
+async def _read_image(request: Request) -> tuple[bytes, str]:
+    """The upload's `image` part and its sniffed type, or the HTTP error."""
+    try:
+        image = await read_file_part(request, "image", MAX_IMAGE_SIZE)
+    except PartTooLargeError:
+        raise HTTPException(
+            413,
+            f"Image size exceeds maximum allowed size of {MAX_IMAGE_SIZE / 1024 / 1024:.0f} MB",
+        )
+    except MultipartError as e:
+        raise HTTPException(400, str(e))
+    if image is None:
+        raise HTTPException(400, "No image uploaded (expected an 'image' file part)")
+    try:
+        return image.data, detect_image_type(image.data, image.content_type)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+
+@router.post(
+    "/{asset_id}/upload-image",
+    response_model=SuccessResponse[ImageJobOut] | SuccessResponse[AssetOut],
+    status_code=202,
+    openapi_extra=_multipart_body("image"),
+)
 async def upload_asset_image(
     asset_id: str,
-    image: UploadFile,
+    request: Request,
+    response: Response,
+    wait: bool = Query(
+        False, description="Describe inline and return the updated asset"
+    ),
     session=Depends(get_session),
     user=Depends(get_current_user),
+    ai_service: AIService = Depends(get_ai_service),
+    jobs: ImageJobQueue = Depends(get_image_job_queue),
 ):
-    """Upload an image and generate AI description for the asset."""
-    from app.services.ai_service import (
-        AIService,
-        AIProviderError,
-        validate_image,
-        MAX_IMAGE_SIZE,
-    )
+    """
+    Upload an image and generate an AI description for the asset.
+
+    By default the image is queued and a job is returned with 202; follow it
+    at GET /jobs/{id} or /jobs/{id}/events. With `wait=true` the description
+    is generated inline and the updated asset returned.
 
+    The `image` part is read as it streams in and never buffered past
+    MAX_IMAGE_SIZE (413 beyond that); its type comes from its magic bytes.
+    """
     # Get the asset
     svc = AssetService()
     asset = await svc.get_asset(session, asset_id)
     if not asset:
         raise HTTPException(404, "Asset not found")
+    # Not needed while the body uploads, nor during the inference
+    await release_connection(session)
 
-    # Read and validate the image
-    image_bytes = await image.read()
-    try:
-        validate_image(image.content_type, len(image_bytes))
-    except ValueError as e:
-        raise HTTPException(400, str(e))
-
-    # Ensure we don't process files that are too large
-    if len(image_bytes) > MAX_IMAGE_SIZE:
-        raise HTTPException(
-            400,
-            f"Image size exceeds maximum allowed size of {MAX_IMAGE_SIZE / 1024 / 1024:.0f} MB",
+    image_bytes, mime_type = await _read_image(request)
+    if not wait:
+        try:
+            job = await jobs.submit(
+                session, asset_id, image_bytes, mime_type, user_id=user.id
+            )
+        except ImageJobQueueFullError as e:
+            raise HTTPException(503, str(e), headers={"Retry-After": "30"})
+        response.headers["Location"] = f"{API_V1_PREFIX}/jobs/{job.id}"
+        return SuccessResponse(
+            message="Asset image queued for description", code=202, data=job
         )
 
     # Generate AI description
-    ai_service = AIService()
     try:
-        description = await ai_service.describe_asset_image(
-            image_bytes, image.content_type or "image/jpeg"
+        description = await ai_service.describe_asset_image(image_bytes, mime_type)
+    except AIOverloadedError as e:
+        raise HTTPException(
+            503, f"AI service busy: {e}", headers={"Retry-After": str(e.retry_after)}
         )
     except AIProviderError as e:
         raise HTTPException(503, f"AI service unavailable: {e}")
 
+    # Re-read: the asset may have been changed or deleted in the meantime
+    session.expunge_all()
+    asset = await svc.get_asset(session, asset_id)
+    if not asset:
+        raise HTTPException(404, "Asset was deleted while the image was processed")
+
     # Update the asset with the generated description
     updated_asset = await svc.update_asset(session, asset, description=description)
-    await invalidate_cache("assets:list")
+    await invalidate_asset_cache(asset_id)
 
+    response.status_code = 200
     return SuccessResponse(
         message="Asset image processed and description updated",
         code=200,
         data=updated_asset,
     )
+
+
+@router.post(
+    "/{asset_id}/upload-image/stream",
+    response_class=StreamingResponse,
+    openapi_extra=_multipart_body("image"),
+)
+async def stream_asset_image(
+    asset_id: str,
+    request: Request,
+    session=Depends(get_session),
+    user=Depends(get_current_user),
+    session_factory=Depends(get_session_factory),
+    ai_service: AIService = Depends(get_ai_service),
+):
+    """
+    Upload an image and stream its description back as server-sent events.
+
+    `token` events carry the text as the model generates it. Once complete
+    the description is saved and a `done` event carries the updated asset;
+    an `error` event replaces it if generation fails or the asset is gone.
+    The upload itself is validated as for /upload-image, with plain HTTP
+    errors before the stream starts.
+    """
+    svc = AssetService()
+    if not await svc.get_asset(session, asset_id):
+        raise HTTPException(404, "Asset not found")
+    # The stream saves through its own short session
+    await session.close()
+
+    image_bytes, mime_type = await _read_image(request)
+
+    async def events():
+        pieces = []
+        try:
+            async for piece in ai_service.stream_asset_description(
+                image_bytes, mime_type
+            ):
+                pieces.append(piece)
+                yield f"event: token\ndata: {json.dumps({'text': piece})}\n\n"
+        except AIProviderError as e:
+            error = {"detail": f"AI service unavailable: {e}"}
+            if isinstance(e, AIOverloadedError):
+                error["retry_after"] = e.retry_after
+            yield f"event: error\ndata: {json.dumps(error)}\n\n"
+            return
+
+        async with session_factory() as save_session:
+            mark_writes_by(save_session, user.id)
+            asset = await svc.get_asset(save_session, asset_id)
+            if asset is not None:
+                asset = await svc.update_asset(
+                    save_session, asset, description="".join(pieces).strip()
+                )
+        if asset is None:
+            error = {"detail": "Asset was deleted while the image was processed"}
+            yield f"event: error\ndata: {json.dumps(error)}\n\n"
+            return
+        await invalidate_asset_cache(asset_id)
+        data = AssetOut.model_validate(asset).model_dump_json()
+        yield f"event: done\ndata: {data}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _batch_part_error(part: UploadedPart, seen: set[str], position: int) -> str | None:
+    if position > MAX_BATCH_IMAGES:
+        return f"Batch limit of {MAX_BATCH_IMAGES} images exceeded"
+    if not part.name:
+        return "Missing asset id (the part's field name)"
+    if part.filename is None:
+        return "Part is not a file"
+    if part.name in seen:
+        return "Asset appears more than once in the batch"
+    if part.too_large:
+        return f"Image too large. Max: {MAX_IMAGE_SIZE / 1024 / 1024:.0f} MB"
+    try:
+        detect_image_type(part.data, part.content_type)
+    except ValueError as e:
+        return str(e)
+    return None
+
+
+@router.post(
+    "/upload-images",
+    response_model=SuccessResponse[list[ImageUploadResult]],
+    openapi_extra=_multipart_body(),
+)
+async def upload_asset_images(
+    request: Request,
+    session=Depends(get_session),
+    user=Depends(get_current_user),
+    ai_service: AIService = Depends(get_ai_service),
+):
+    """
+    Describe many asset images in one request.
+
+    Send multipart/form-data with one file part per asset, named by asset id.
+    Each image goes to the AI service as soon as its part has arrived (the
+    service caps concurrent inferences), and all descriptions are written in
+    one transaction. Results come back per part, in request order; parts
+    the AI service turned away as overloaded say when to retry them.
+    """
+    svc = AssetService()
+    results: list[dict] = []
+    pending: dict[int, asyncio.Task] = {}
+    seen: set[str] = set()
+    # No more in flight than the service admits at once: the rest would take
+    # the shared wait queue and a large batch would overflow it by itself
+    slots = asyncio.Semaphore(admission_concurrency())
+
+    async def describe(image_bytes: bytes) -> str:
+        async with slots:
+            return await ai_service.describe_asset_image(
+                image_bytes, sniff_image_type(image_bytes)
+            )
+
+    await release_connection(session)  # auth's read; nothing else needs it yet
+
+    try:
+        async for part in iter_parts(request, MAX_IMAGE_SIZE):
+            result = {"asset_id": part.name, "filename": part.filename}
+            results.append(result)
+            error = _batch_part_error(part, seen, len(results))
+            if error is None and not await svc.get_asset_version(session, part.name):
+                error = "Asset not found"
+            # Short lookups only; no connection is held across uploads/inference
+            await release_connection(session)
+            if error is not None:
+                result.update(status="failed", error=error)
+                continue
+            seen.add(part.name)
+            pending[len(results) - 1] = asyncio.create_task(describe(part.data))
+    except MultipartError as e:
+        for task in pending.values():
+            task.cancel()
+        raise HTTPException(400, str(e))
+    except BaseException:
+        for task in pending.values():
+            task.cancel()
+        raise
+
+    descriptions = {}
+    outcomes = await asyncio.gather(*pending.values(), return_exceptions=True)
+    for i, outcome in zip(pending, outcomes):
+        if isinstance(outcome, AIOverloadedError):
+            results[i].update(
+                status="overloaded",
+                error=f"AI service busy: {outcome}",
+                retry_after=outcome.retry_after,
+            )
+        elif isinstance(outcome, AIProviderError):
+            results[i].update(
+                status="failed", error=f"AI service unavailable: {outcome}"
+            )
+        elif isinstance(outcome, BaseException):
+            raise outcome
+        else:
+            descriptions[results[i]["asset_id"]] = outcome
+
+    updated = set(await svc.bulk_update_descriptions(session, descriptions))
+    for i in pending:
+        asset_id = results[i]["asset_id"]
+        if asset_id in updated:
+            results[i].update(status="updated", description=descriptions[asset_id])
+            await invalidate_asset_cache(asset_id)
+        elif asset_id in descriptions:
+            # Deleted while its image was being described
+            results[i].update(status="failed", error="Asset not found")
+
+    return SuccessResponse(message="Asset images processed", code=200, data=results)
@@ -0,0 +1,76 @@
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+
+from app.api.deps import get_current_user
+from app.core.database import get_session, get_session_factory
+from app.models.image_job import JOB_FINISHED
+from app.schemas.image_job import ImageJobOut
+from app.schemas.response import SuccessResponse
+from app.services.image_job_service import (
+    ImageJobQueue,
+    ImageJobService,
+    get_image_job_queue,
+)
+
+router = APIRouter(prefix="/jobs")
+
+# Re-read the job at least this often, for jobs run by another process
+EVENTS_POLL_SECONDS = 15
+
+
+@router.get("/{job_id}", response_model=SuccessResponse[ImageJobOut])
+async def get_image_job(
+    job_id: str,
+    session=Depends(get_session),
+    user=Depends(get_current_user),
+):
+    job = await ImageJobService().get_job(session, job_id)
+    if not job:
+        raise HTTPException(404, "Job not found")
+    return SuccessResponse(message="Job retrieved successfully", code=200, data=job)
+
+
+@router.get("/{job_id}/events")
+async def image_job_events(
+    job_id: str,
+    session=Depends(get_session),
+    user=Depends(get_current_user),
+    session_factory=Depends(get_session_factory),
+    queue: ImageJobQueue = Depends(get_image_job_queue),
+):
+    """
+    Server-sent events: a `status` event per job state change, ending once
+    the job succeeds or fails. Each read uses its own short session, so an
+    open stream doesn't pin a pooled connection.
+    """
+    svc = ImageJobService()
+    if not await svc.get_job(session, job_id):
+        raise HTTPException(404, "Job not found")
+    await session.close()
+
+    async def events():
+        last_status = None
+        while True:
+            changed = queue.watch(job_id)
+            async with session_factory() as poll_session:
+                job = await svc.get_job(poll_session, job_id)
+            if job is None:
+                return
+            if job.status != last_status:
+                last_status = job.status
+                data = ImageJobOut.model_validate(job).model_dump_json()
+                yield f"event: status\ndata: {data}\n\n"
+            if job.status in JOB_FINISHED:
+                return
+            try:
+                await asyncio.wait_for(changed.wait(), EVENTS_POLL_SECONDS)
+            except TimeoutError:
+                yield ": keep-alive\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
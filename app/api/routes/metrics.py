@@ -0,0 +1,43 @@
+import secrets
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from app.core.config import settings
+from app.core.db_metrics import slow_queries
+from app.core.metrics import render_metrics
+
+
+def require_internal_token(authorization: str | None = Header(None)):
+    """
+    /internal is off unless INTERNAL_API_TOKEN is set, and then needs it as
+    a bearer token (Prometheus: `authorization: {credentials: ...}`).
+    """
+    if not settings.INTERNAL_API_TOKEN:
+        raise HTTPException(404, "Not Found")
+    expected = f"Bearer {settings.INTERNAL_API_TOKEN}"
+    if not secrets.compare_digest((authorization or "").encode(), expected.encode()):
+        raise HTTPException(
+            401, "Invalid internal API token", headers={"WWW-Authenticate": "Bearer"}
+        )
+
+
+router = APIRouter(
+    prefix="/internal",
+    include_in_schema=False,
+    dependencies=[Depends(require_internal_token)],
+)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus scrape target."""
+    return PlainTextResponse(
+        render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+@router.get("/slow-queries")
+async def list_slow_queries():
+    """Recent statements slower than DB_SLOW_QUERY_MS, newest first."""
+    return list(slow_queries)
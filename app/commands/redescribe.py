@@ -0,0 +1,241 @@
+"""
+Regenerate asset descriptions in bulk, e.g. after changing the prompt or model.
+
+    python -m app.commands.redescribe --images /srv/asset-images
+
+Images are looked up in a directory by asset id (`<asset id>.jpg`, .png,
+.webp or .gif); assets without one are skipped. Assets are walked in id
+order and progress is checkpointed in the redescribe_runs table with each
+batch written, so running the same command again resumes where a crashed
+or interrupted run stopped. A finished run starts over only with
+--restart, or when the provider, model or prompt has changed since.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+from sqlalchemy import select
+
+import app.core.logging  # noqa
+from app.core.cache import invalidate_asset_cache
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, engine
+from app.models.asset import Asset
+from app.models.redescribe_run import RedescribeRun
+from app.services.ai_service import (
+    PROMPT_VERSION,
+    AIOverloadedError,
+    AIProviderError,
+    AIService,
+    close_ai_service,
+    get_ai_service,
+    sniff_image_type,
+)
+from app.services.asset_service import AssetService
+
+logger = logging.getLogger(__name__)
+
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".webp", ".gif"}
+
+
+@dataclass
+class BatchResult:
+    descriptions: dict[str, str]
+    skipped: int = 0
+    failed: int = 0
+
+
+def index_images(directory: str | Path) -> dict[str, Path]:
+    """Map asset id -> image file for every image directly in `directory`."""
+    images = {}
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            path = Path(entry.path)
+            if entry.is_file() and path.suffix.lower() in IMAGE_SUFFIXES:
+                images[path.stem] = path
+    return images
+
+
+def current_target() -> str:
+    return f"{settings.AI_PROVIDER.lower()}:{settings.AI_MODEL}:{PROMPT_VERSION}"
+
+
+class Redescriber:
+    def __init__(
+        self,
+        ai_service: AIService,
+        images: dict[str, Path],
+        session_factory=AsyncSessionLocal,
+        concurrency: int = 4,
+        batch_size: int = 100,
+    ):
+        self.ai_service = ai_service
+        self.images = images
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self._slots = asyncio.Semaphore(concurrency)
+
+    async def start(self, name: str, restart: bool = False) -> RedescribeRun:
+        """Load the named run's checkpoint, or begin a fresh one."""
+        target = current_target()
+        async with self.session_factory() as session:
+            run = await session.get(RedescribeRun, name)
+            if run is not None and run.target != target:
+                logger.info(f"Run {name!r} was for {run.target}; starting over")
+                restart = True
+            if run is None:
+                run = RedescribeRun(name=name, target=target)
+                session.add(run)
+            elif restart:
+                run.target, run.last_asset_id, run.finished_at = target, None, None
+                run.processed = run.updated = run.skipped = run.failed = 0
+                run.started_at = datetime.now(timezone.utc)
+            await session.commit()
+        return run
+
+    async def run(self, run: RedescribeRun) -> RedescribeRun:
+        """Process batches from the run's checkpoint until every asset is done."""
+        if run.finished_at is not None:
+            logger.info(f"Run {run.name!r} already finished; use --restart to redo it")
+            return run
+
+        started, done = time.monotonic(), 0
+        while ids := await self._next_ids(run.last_asset_id):
+            result = await self._describe_batch(ids)
+            run = await self._save(run, ids[-1], len(ids), result)
+            done += len(result.descriptions) + result.failed
+            rate = done / (time.monotonic() - started)
+            print(
+                f"{run.processed} assets: {run.updated} updated, "
+                f"{run.skipped} without image, {run.failed} failed "
+                f"({rate:.2f} images/s)",
+                flush=True,
+            )
+
+        async with self.session_factory() as session:
+            run = await session.merge(run)
+            run.finished_at = datetime.now(timezone.utc)
+            await session.commit()
+        return run
+
+    async def _next_ids(self, after: str | None) -> list[str]:
+        # Keyset pagination: cheap at any depth, and stable while assets change
+        query = select(Asset.id).order_by(Asset.id).limit(self.batch_size)
+        if after is not None:
+            query = query.where(Asset.id > after)
+        async with self.session_factory() as session:
+            return list(await session.scalars(query))
+
+    async def _describe_batch(self, ids: list[str]) -> BatchResult:
+        """
+        Describe a batch's images. Only per-asset problems (an unreadable
+        image) count as failures; an AIProviderError means the service is
+        down, so it is raised before the checkpoint can move past the batch.
+        """
+        result = BatchResult(descriptions={})
+        with_images = [asset_id for asset_id in ids if asset_id in self.images]
+        result.skipped = len(ids) - len(with_images)
+        outcomes = await asyncio.gather(
+            *(self._describe(asset_id) for asset_id in with_images),
+            return_exceptions=True,
+        )
+        for outcome in outcomes:
+            if isinstance(outcome, AIProviderError):
+                raise outcome
+        for asset_id, outcome in zip(with_images, outcomes):
+            if isinstance(outcome, Exception):
+                logger.warning(f"Asset {asset_id} failed: {outcome}")
+                result.failed += 1
+            else:
+                result.descriptions[asset_id] = outcome
+        return result
+
+    async def _describe(self, asset_id: str) -> str:
+        async with self._slots:
+            image_bytes = await asyncio.to_thread(self.images[asset_id].read_bytes)
+            mime_type = sniff_image_type(image_bytes)
+            if mime_type is None:
+                raise ValueError("Not a supported image")
+            while True:
+                try:
+                    return await self.ai_service.describe_asset_image(
+                        image_bytes, mime_type
+                    )
+                except AIOverloadedError as e:
+                    await asyncio.sleep(e.retry_after)
+
+    async def _save(
+        self, run: RedescribeRun, last_id: str, count: int, result: BatchResult
+    ) -> RedescribeRun:
+        """Write a batch's descriptions and move the checkpoint, atomically."""
+        async with self.session_factory() as session:
+            run = await session.merge(run)
+            run.last_asset_id = last_id
+            run.processed += count
+            run.skipped += result.skipped
+            run.failed += result.failed
+            # Commits the checkpoint along with the descriptions
+            updated = await AssetService().bulk_update_descriptions(
+                session, result.descriptions
+            )
+            # Only the tally is lost if we crash between the two commits
+            run.updated += len(updated)
+            await session.commit()
+        for asset_id in updated:
+            await invalidate_asset_cache(asset_id)
+        return run
+
+
+async def main(args: argparse.Namespace) -> int:
+    images = index_images(args.images)
+    print(f"Found {len(images)} images in {args.images}", flush=True)
+    ai_service = get_ai_service()
+    if args.no_cache:
+        ai_service = AIService(provider=ai_service.provider)
+    redescriber = Redescriber(
+        ai_service, images, concurrency=args.concurrency, batch_size=args.batch_size
+    )
+    try:
+        run = await redescriber.start(args.name, restart=args.restart)
+        run = await redescriber.run(run)
+    except AIProviderError as e:
+        logger.error(f"Stopped: {e}")
+        return 1
+    finally:
+        await close_ai_service()
+        await engine.dispose()
+    print(
+        f"Run {run.name!r} done: {run.processed} assets, {run.updated} updated, "
+        f"{run.skipped} without image, {run.failed} failed"
+    )
+    return 0
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.commands.redescribe",
+        description="Regenerate asset descriptions from a directory of images.",
+    )
+    parser.add_argument(
+        "--images", required=True, help="directory of <asset id>.<ext> images"
+    )
+    parser.add_argument("--name", default="default", help="checkpoint name")
+    parser.add_argument("--concurrency", type=int, default=settings.AI_MAX_CONCURRENCY)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument(
+        "--restart", action="store_true", help="ignore the checkpoint and start over"
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true", help="don't reuse cached descriptions"
+    )
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    raise SystemExit(asyncio.run(main(parse_args())))
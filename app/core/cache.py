@@ -7,21 +7,48 @@ from app.core.redis import redis_client
 
 logger = logging.getLogger(__name__)
 
+# Asset keys shared by the routes and anything else that writes assets
+ASSET_LIST_KEY = "assets:list"
+ASSET_COLLECTION_VERSION_KEY = "assets:version"
+VERSION_EXPIRE = 300
+# Left in a version key by a write so readers holding an older version from
+# the DB can't mirror it back; see invalidate_asset_cache
+STALE_VERSION = "stale"
+STALE_VERSION_EXPIRE = 10
 
-def cache_response(key_pattern: str, expire: int = 60):
+
+def asset_version_key(asset_id: str) -> str:
+    return f"assets:version:{asset_id}"
+
+
+def user_cache_key(user_id: int) -> str:
+    return f"auth:user:{user_id}"
+
+
+def recent_write_key(user_id: int) -> str:
+    return f"db:wrote:{user_id}"
+
+
+def cache_response(
+    key_pattern: str, expire: int = 60, vary_on: Callable[..., str] | None = None
+):
     """
     Decorator to cache API responses.
 
     Args:
         key_pattern: Redis key pattern (e.g., "assets:list").
         expire: Expiration time in seconds.
+        vary_on: Optional callable given the endpoint kwargs; its result is
+            appended to the key (e.g. collection version and projection).
     """
 
     def decorator(func: Callable):
         @wraps(func)
         async def wrapper(*args, **kwargs):
-            # Form cache key (handle dynamic logic if needed later)
+            # Form cache key
             cache_key = key_pattern
+            if vary_on is not None:
+                cache_key = f"{key_pattern}:{vary_on(**kwargs)}"
 
             # Try to get from cache
             try:
@@ -71,14 +98,70 @@ def cache_response(key_pattern: str, expire: int = 60):
     return decorator
 
 
-async def invalidate_cache(key_pattern: str):
+async def invalidate_cache(*key_patterns: str):
     """
     Invalidate cache keys matching a specific pattern.
     For this assessment, we primarily assume direct key matches or simple patterns.
+    Several keys go out in a single DEL.
     """
     try:
         # If we used true wildcards we'd need SCAN, but here we likely know the key
-        await redis_client.delete(key_pattern)
-        logger.info(f"Cache invalidated: {key_pattern}")
+        await redis_client.delete(*key_patterns)
+        logger.info(f"Cache invalidated: {', '.join(key_patterns)}")
     except Exception as e:
         logger.error(f"Cache invalidation error: {e}")
+
+
+async def invalidate_asset_cache(asset_id: str):
+    """
+    Retire everything derived from an asset after it's written.
+
+    List cache keys embed the collection version, so retiring the version
+    retires every cached projection at once; the old entries just expire.
+    The version keys are overwritten with a short-lived STALE_VERSION rather
+    than deleted: a reader that loaded the version just before the write
+    committed would otherwise mirror it into the empty key, and conditional
+    requests would get 304s for changed data until it expired.
+    """
+    keys = (ASSET_COLLECTION_VERSION_KEY, asset_version_key(asset_id))
+    try:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.set(key, STALE_VERSION, ex=STALE_VERSION_EXPIRE)
+            await pipe.execute()
+        logger.info(f"Cache invalidated: {', '.join(keys)}")
+    except Exception as e:
+        logger.error(f"Cache invalidation error: {e}")
+
+
+async def get_cached_version(key: str) -> str | None:
+    """A mirrored version, or None if it's missing or was just invalidated."""
+    version = await get_cached_value(key)
+    return None if version == STALE_VERSION else version
+
+
+async def mirror_version(key: str, version):
+    """
+    Mirror a version read from the primary, unless the key holds anything,
+    in particular a newer write's STALE_VERSION.
+    """
+    try:
+        await redis_client.set(key, str(version), ex=VERSION_EXPIRE, nx=True)
+    except Exception as e:
+        logger.error(f"Cache write error: {e}")
+
+
+async def get_cached_value(key: str) -> str | None:
+    """Plain GET that treats Redis errors as a miss."""
+    try:
+        return await redis_client.get(key)
+    except Exception as e:
+        logger.error(f"Cache read error: {e}")
+        return None
+
+
+async def set_cached_value(key: str, value, expire: int = VERSION_EXPIRE):
+    try:
+        await redis_client.setex(key, expire, str(value))
+    except Exception as e:
+        logger.error(f"Cache write error: {e}")
@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 API_V1_PREFIX = "/api/v1"
@@ -11,13 +13,85 @@ class Settings(BaseSettings):
     JWT_SECRET: str
     JWT_ALGORITHM: str = "HS256"
     JWT_EXPIRE_MINUTES: int
+    # Seconds an authenticated user is served from Redis without a DB lookup (0 = off)
+    AUTH_USER_CACHE_TTL: int = 300
     ENVIRONMENT: str = "development"
+    # Adds an X-Query-Count header (SQL statements run) to every response
+    DEBUG: bool = False
+    # Bearer token for /internal (metrics, slow queries); unset = /internal is off
+    INTERNAL_API_TOKEN: str | None = None
+
+    # Database connection pool
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_RECYCLE: int = 3600  # s before a connection is replaced
+    DB_POOL_TIMEOUT: float = 30.0  # s to wait for a free connection
+    # Ping every connection on checkout, or only ones idle this many s (unset = never);
+    # either way a statement that opens a transaction is retried once on disconnect
+    DB_PRE_PING: bool = False
+    DB_PING_IDLE_AFTER: float | None = 60.0
+    # Read replicas, comma-separated; read-only endpoints use them unless the
+    # user wrote in the last DB_READ_YOUR_WRITES s
+    DATABASE_REPLICA_URLS: str | None = None
+    DB_REPLICA_STRATEGY: Literal["round_robin", "least_busy"] = "round_robin"
+    DB_READ_YOUR_WRITES: int = 5
+    # Log statements at least this slow (ms, unset = never), with their plan if EXPLAIN is on
+    DB_SLOW_QUERY_MS: float | None = 500.0
+    DB_SLOW_QUERY_EXPLAIN: bool = False
+
+    # Seconds between asset stats reconciliation runs (0 disables)
+    STATS_RECONCILE_INTERVAL: int = 3600
+    # Asset change log (delta sync) retention, pruned every CHANGE_LOG_PRUNE_INTERVAL s
+    CHANGE_LOG_RETENTION_HOURS: int = 168
+    CHANGE_LOG_PRUNE_INTERVAL: int = 3600
+    # Delta sync holds back entries this young: their seq may precede one still uncommitted
+    CHANGE_LOG_SETTLE_SECONDS: float = 5.0
 
     # AI Configuration
     AI_PROVIDER: str = "ollama"  # ollama | openai | anthropic | lmstudio
     AI_MODEL: str = "llava"
     AI_ENDPOINT: str
     AI_API_KEY: str | None = None
+    # Several inference servers, comma-separated (overrides AI_ENDPOINT)
+    AI_ENDPOINTS: str | None = None
+    # Re-send requests slower than this percentile of a server's latency to another
+    AI_HEDGE_PERCENTILE: float | None = None
+    # Consecutive failures before a server is skipped for AI_BREAKER_COOLDOWN s
+    AI_BREAKER_FAILURES: int = 3
+    AI_BREAKER_COOLDOWN: float = 30.0
+    # Shared HTTP client for the inference server
+    AI_TIMEOUT: float = 120.0
+    AI_MAX_CONNECTIONS: int = 20
+    AI_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    AI_KEEPALIVE_EXPIRY: float = 60.0
+    # Concurrent inference requests per provider, across all callers
+    AI_MAX_CONCURRENCY: int = 4
+    # Requests allowed to wait for a slot, and for how long, before failing with 503
+    AI_QUEUE_SIZE: int = 16
+    AI_QUEUE_TIMEOUT: float = 30.0
+    # How long Ollama keeps the model loaded after each request ("-1" = for ever)
+    AI_KEEP_ALIVE: str | None = "30m"
+    # Load the model during startup, and re-probe every AI_WARM_INTERVAL s (0 = off)
+    # within AI_WARM_HOURS (server local time, e.g. "mon-fri 08:00-18:00"; empty = always)
+    AI_WARMUP_ON_STARTUP: bool = False
+    AI_WARM_INTERVAL: int = 0
+    AI_WARM_HOURS: str | None = "mon-fri 08:00-18:00"
+    # Micro-batching: coalesce calls within the window into one request (1 = off)
+    AI_BATCH_MAX_SIZE: int = 1
+    AI_BATCH_WINDOW_MS: float = 25
+    # Images are fitted within this many pixels and re-encoded before inference (0 = off)
+    AI_IMAGE_MAX_EDGE: int = 1024
+    AI_IMAGE_FORMAT: Literal["JPEG", "WEBP"] = "JPEG"
+    AI_IMAGE_QUALITY: int = 85
+    # Description cache, keyed by image digest + provider + model + prompt
+    AI_CACHE_ENABLED: bool = True
+    AI_CACHE_TTL: int = 30 * 24 * 3600
+    AI_CACHE_DIR: str | None = None  # optional on-disk tier
+    # Max dHash Hamming distance (0-10) for near-duplicate hits; unset disables
+    AI_CACHE_PHASH_THRESHOLD: int | None = None
+    # Background image description jobs (in-process worker pool)
+    AI_JOB_WORKERS: int = 2
+    AI_JOB_QUEUE_SIZE: int = 32  # queued images are held in memory
 
     model_config = SettingsConfigDict(
         extra="ignore", env_file=".env", env_file_encoding="utf-8"
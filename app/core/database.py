@@ -1,32 +1,234 @@
+import itertools
 import logging
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
-from sqlalchemy import text
+import time
+
+from sqlalchemy import event, text
+from sqlalchemy.exc import DBAPIError, DisconnectionError
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    create_async_engine,
+    async_sessionmaker,
+)
+from sqlalchemy.orm import Session
+
+from app.core.cache import recent_write_key, set_cached_value
 from app.core.config import settings
+from app.core.db_metrics import TimedPool, instrument_engine
 
 logger = logging.getLogger(__name__)
 
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,
-    pool_size=5,  # Number of connections to keep open
-    max_overflow=10,  # Additional connections if pool is full
-    pool_recycle=3600,  # Recycle connections after 1 hour
-    pool_timeout=30,  # Wait 30s for connection from pool
-    echo=False,  # Set to True for SQL debugging
-)
 
-AsyncSessionLocal = async_sessionmaker(
-    engine,
-    expire_on_commit=False,
-    autoflush=False,
-)
+def create_pooled_engine(url: str, name: str = "primary") -> AsyncEngine:
+    engine = create_async_engine(
+        url,
+        poolclass=TimedPool,
+        pool_logging_name=name,
+        pool_pre_ping=settings.DB_PRE_PING,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        echo=False,  # Set to True for SQL debugging
+    )
+    if settings.DB_PING_IDLE_AFTER is not None and not settings.DB_PRE_PING:
+        ping_idle_connections(engine, settings.DB_PING_IDLE_AFTER)
+    instrument_engine(
+        engine, name, settings.DB_SLOW_QUERY_MS, settings.DB_SLOW_QUERY_EXPLAIN
+    )
+    return engine
+
+
+def ping_idle_connections(engine, idle_after: float) -> None:
+    """
+    Ping a connection on checkout only if it sat in the pool for `idle_after` s.
+
+    Connections that were in use moments ago are handed out as they are
+    (unlike pool_pre_ping, which costs a round trip per checkout); long-idle
+    ones are the ones a firewall or server timeout may have dropped. A dead
+    one is replaced before the caller sees it.
+    """
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "checkin")
+    def mark_idle(dbapi_connection, record):
+        record.info["idle_since"] = time.monotonic()
+
+    @event.listens_for(sync_engine, "checkout")
+    def ping_if_idle(dbapi_connection, record, proxy):
+        idle_since = record.info.pop("idle_since", None)
+        if idle_since is None or time.monotonic() - idle_since < idle_after:
+            return
+        try:
+            sync_engine.dialect.do_ping(dbapi_connection)
+        except Exception as e:
+            # Makes the pool discard this connection and check out another
+            raise DisconnectionError(f"Idle connection failed ping: {e}") from e
+
+
+class RetryingSession(Session):
+    """
+    Session that retries a statement once when its connection turns out dead.
+
+    Only a statement that starts a transaction, with nothing pending, is
+    retried: rolling back then loses nothing, and the pool has already
+    discarded the dead connection so the retry gets a fresh one.
+    """
+
+    def _retry_once(self, method, *args, **kwargs):
+        retriable = not self.in_transaction() and not (
+            self.new or self.dirty or self.deleted
+        )
+        try:
+            return method(*args, **kwargs)
+        except DBAPIError as e:
+            if not (retriable and e.connection_invalidated):
+                raise
+            logger.warning(f"Database connection lost, retrying: {e.orig}")
+            self.rollback()
+            return method(*args, **kwargs)
+
+    def execute(self, *args, **kwargs):
+        return self._retry_once(super().execute, *args, **kwargs)
+
+    def scalars(self, *args, **kwargs):
+        return self._retry_once(super().scalars, *args, **kwargs)
+
+    def scalar(self, *args, **kwargs):
+        return self._retry_once(super().scalar, *args, **kwargs)
+
+
+@event.listens_for(RetryingSession, "after_flush")
+def _flushed(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(RetryingSession, "do_orm_execute")
+def _executed(state):
+    if state.is_insert or state.is_update or state.is_delete:
+        state.session.info["wrote"] = True
+
+
+@event.listens_for(RetryingSession, "after_rollback")
+def _rolled_back(session):
+    session.info.pop("wrote", None)
+
+
+class AppSession(AsyncSession):
+    """
+    Async session that awaits the callbacks in info["after_write_commit"]
+    once a commit that wrote something has gone through, before commit()
+    returns. Commits that only end a read (release_connection) skip them.
+    """
+
+    async def commit(self):
+        await super().commit()  # flushes, which may set info["wrote"]
+        if self.info.pop("wrote", False):
+            for callback in self.info.get("after_write_commit", ()):
+                await callback()
+
+
+def make_session_factory(engine: AsyncEngine, **kwargs) -> async_sessionmaker:
+    return async_sessionmaker(
+        engine,
+        class_=AppSession,
+        expire_on_commit=False,
+        autoflush=False,
+        sync_session_class=RetryingSession,
+        **kwargs,
+    )
+
+
+class ReplicaRouter:
+    """
+    Hands out sessions on read replicas, picked round-robin or by fewest
+    checked-out connections ("least_busy").
+
+    Replica sessions carry info["replica"] so callers can tell their reads
+    may lag; see reads_from_replica.
+    """
+
+    def __init__(self, replicas: list[AsyncEngine], strategy: str = "round_robin"):
+        if strategy not in ("round_robin", "least_busy"):
+            raise ValueError(f"Unknown replica strategy: {strategy}")
+        self.replicas = replicas
+        self.strategy = strategy
+        self._turn = itertools.count()
+        self._factories = [
+            make_session_factory(replica, info={"replica": True})
+            for replica in replicas
+        ]
+
+    def pick(self) -> int:
+        if self.strategy == "least_busy":
+            return min(
+                range(len(self.replicas)),
+                key=lambda i: self.replicas[i].pool.checkedout(),
+            )
+        return next(self._turn) % len(self.replicas)
+
+    def session(self) -> AsyncSession:
+        return self._factories[self.pick()]()
+
+
+def reads_from_replica(session) -> bool:
+    return session.info.get("replica", False)
+
+
+def mark_writes_by(session, user_id: int) -> None:
+    """
+    Make each write `session` commits mark `user_id` as a recent writer, so
+    get_read_session keeps their reads on the primary for DB_READ_YOUR_WRITES
+    s. A no-op without replicas.
+    """
+    if replica_router.replicas:
+        session.info.setdefault("after_write_commit", []).append(
+            lambda: mark_recent_write(user_id)
+        )
+
+
+async def mark_recent_write(user_id: int):
+    await set_cached_value(
+        recent_write_key(user_id), 1, expire=settings.DB_READ_YOUR_WRITES
+    )
+
+
+engine = create_pooled_engine(settings.DATABASE_URL)
+replica_urls = [u.strip() for u in (settings.DATABASE_REPLICA_URLS or "").split(",")]
+replica_engines = [
+    create_pooled_engine(url, f"replica{i}")
+    for i, url in enumerate(filter(None, replica_urls))
+]
+replica_router = ReplicaRouter(replica_engines, settings.DB_REPLICA_STRATEGY)
+
+AsyncSessionLocal = make_session_factory(engine)
 
 
 async def get_session():
+    """
+    Request-scoped session. It checks a connection out of the pool on its first
+    query only, so a request answered from cache never touches the pool.
+    """
     async with AsyncSessionLocal() as session:
         yield session
 
 
+def get_session_factory():
+    """For handlers that open short sessions themselves instead of holding one."""
+    return AsyncSessionLocal
+
+
+async def release_connection(session):
+    """
+    End the session's transaction so its connection goes back to the pool.
+
+    Call before awaiting something slow (e.g. AI inference). Loaded objects
+    stay usable since sessions don't expire on commit, and the next query
+    checks a connection out again.
+    """
+    await session.commit()
+
+
 async def check_db_connection():
     """Test database connection"""
     try:
@@ -0,0 +1,218 @@
+"""
+Connection pool and statement metrics for the app's engines, a log of slow
+statements (optionally with their query plans), and per-request statement
+counting.
+"""
+
+import contextlib
+import logging
+import re
+import time
+from collections import deque
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.metrics import Counter, Gauge, Histogram
+
+logger = logging.getLogger(__name__)
+
+SLOW_QUERY_LOG_SIZE = 100
+# Normalized statements are metric labels; keep them readable
+MAX_STATEMENT_LENGTH = 300
+
+DB_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time to get a connection from the pool, including opening one",
+    labelnames=("engine",),
+)
+DB_QUERY_TIME = Histogram(
+    "db_query_seconds",
+    "Statement execution time by normalized SQL",
+    labelnames=("engine", "statement"),
+)
+DB_SLOW_QUERIES = Counter(
+    "db_slow_queries_total",
+    "Statements slower than DB_SLOW_QUERY_MS",
+    labelnames=("engine",),
+)
+
+_engines: dict[str, AsyncEngine] = {}
+# Most recent first; served at /internal/slow-queries
+slow_queries: deque[dict] = deque(maxlen=SLOW_QUERY_LOG_SIZE)
+
+
+def _pool_gauge(stat):
+    return lambda: {(name,): stat(engine.pool) for name, engine in _engines.items()}
+
+
+Gauge(
+    "db_pool_checked_out",
+    "Pooled connections in use",
+    read=_pool_gauge(lambda pool: pool.checkedout()),
+    labelnames=("engine",),
+)
+Gauge(
+    "db_pool_checked_in",
+    "Idle connections in the pool",
+    read=_pool_gauge(lambda pool: pool.checkedin()),
+    labelnames=("engine",),
+)
+Gauge(
+    "db_pool_overflow",
+    "Connections open beyond pool_size",
+    read=_pool_gauge(lambda pool: max(pool.overflow(), 0)),
+    labelnames=("engine",),
+)
+
+
+class TimedPool(AsyncAdaptedQueuePool):
+    """
+    Queue pool that records how long each checkout took. Pools have no
+    event before a checkout, hence the subclass; the engine label comes from
+    pool_logging_name, which survives the pool being recreated on dispose.
+    """
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            DB_CHECKOUT_WAIT.observe(
+                time.perf_counter() - started, engine=self.logging_name or "primary"
+            )
+
+
+@lru_cache(maxsize=1024)
+def normalize_sql(statement: str) -> str:
+    """Statement with literals and placeholder lists collapsed, for grouping."""
+    sql = " ".join(statement.split())
+    sql = re.sub(r"'(?:[^']|'')*'", "?", sql)
+    sql = re.sub(r"\$\d+|%\(\w+\)s|(?<![:\w]):\w+|\b\d+(?:\.\d+)?\b", "?", sql)
+    # IN (?, ?, ?) and multi-row VALUES vary in length with the data
+    sql = re.sub(r"\(\?(?:, \?)*\)", "(?)", sql)
+    sql = re.sub(r"\(\?\)(?:, \(\?\))+", "(?)", sql)
+    if len(sql) > MAX_STATEMENT_LENGTH:
+        sql = sql[: MAX_STATEMENT_LENGTH - 3] + "..."
+    return sql
+
+
+def instrument_engine(
+    engine: AsyncEngine,
+    name: str,
+    slow_query_ms: float | None = None,
+    explain: bool = False,
+) -> None:
+    """
+    Time every statement on `engine` and report its pool in the metrics.
+
+    Statements taking `slow_query_ms` or longer are logged and kept in
+    slow_queries; with `explain`, slow SELECTs also get their plan captured
+    (an extra EXPLAIN round trip, so only worth it while investigating).
+    """
+    _engines[name] = engine
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def start_timer(conn, cursor, statement, parameters, context, executemany):
+        context.query_started = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def record(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context.query_started
+        DB_QUERY_TIME.observe(elapsed, engine=name, statement=normalize_sql(statement))
+        if slow_query_ms is None or elapsed * 1000 < slow_query_ms:
+            return
+        DB_SLOW_QUERIES.inc(engine=name)
+        logger.warning(f"Slow query on {name} ({elapsed * 1000:.0f} ms): {statement}")
+        plan = None
+        if explain and not executemany:
+            plan = explain_statement(conn, statement, parameters)
+        slow_queries.appendleft(
+            {
+                "engine": name,
+                "statement": statement,
+                "duration_ms": round(elapsed * 1000, 1),
+                "at": datetime.now(timezone.utc).isoformat(),
+                "plan": plan,
+            }
+        )
+
+
+def explain_statement(conn, statement: str, parameters) -> list[str] | None:
+    """The query plan of a SELECT, on the connection that just ran it."""
+    if not statement.lstrip().upper().startswith("SELECT"):
+        return None
+    prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters)
+        return [" ".join(str(col) for col in row) for row in cursor.fetchall()]
+    except Exception as e:
+        logger.warning(f"Could not EXPLAIN slow query: {e}")
+        return None
+    finally:
+        cursor.close()
+
+
+class QueryCounter:
+    def __init__(self):
+        self.statements: list[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+
+_query_counter: ContextVar[QueryCounter | None] = ContextVar(
+    "query_counter", default=None
+)
+
+
+@contextlib.contextmanager
+def count_queries() -> Iterator[QueryCounter]:
+    """Collect the statements run in this context (a request, a test) on any engine."""
+    counter = QueryCounter()
+    token = _query_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _query_counter.reset(token)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    counter = _query_counter.get()
+    if counter is not None:
+        counter.statements.append(statement)
+
+
+class QueryCountMiddleware:
+    """
+    Adds X-Query-Count to every response: the statements the request ran
+    before its response started (later ones, e.g. in a stream, aren't in it).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        with count_queries() as counter:
+
+            async def send_with_count(message):
+                if message["type"] == "http.response.start":
+                    headers = list(message.get("headers", []))
+                    headers.append((b"x-query-count", str(counter.count).encode()))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            await self.app(scope, receive, send_with_count)
@@ -0,0 +1,22 @@
+from fastapi import HTTPException, Request
+
+
+def make_etag(*parts) -> str:
+    """Strong ETag from version parts, e.g. make_etag(asset_id, 3) -> '"<id>-3"'."""
+    return '"' + "-".join(str(p) for p in parts) + '"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """RFC 9110 If-None-Match check (weak comparison, as GET requires)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return etag in (tag.removeprefix("W/") for tag in candidates)
+
+
+def check_not_modified(request: Request, etag: str) -> None:
+    """Short-circuit with an empty 304 when the client already has this version."""
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        raise HTTPException(304, headers={"ETag": etag})
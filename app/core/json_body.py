@@ -0,0 +1,76 @@
+import base64
+import json
+import uuid
+from dataclasses import dataclass
+from typing import AsyncIterator
+
+# Raw bytes encoded per chunk; a multiple of 3 so chunks need no padding
+BASE64_CHUNK = 48 * 1024
+
+
+@dataclass(frozen=True)
+class Base64Bytes:
+    """
+    Placeholder for a JSON string holding `prefix` + base64 of `data`.
+
+    Put it anywhere in a JSONBody payload; the encoding is only done chunk
+    by chunk while the body is being sent.
+    """
+
+    data: bytes
+    prefix: str = ""
+
+
+class JSONBody:
+    """
+    A JSON request body that streams its Base64Bytes values.
+
+    The payload is rendered once with a marker in place of each Base64Bytes,
+    so the only full-size buffer is the caller's raw bytes. Iterating yields
+    the envelope pieces with the base64 encoded BASE64_CHUNK at a time in
+    between. The length is known up front, so it can go out with a
+    Content-Length instead of chunked encoding. Can be iterated more than
+    once, e.g. when a request is retried.
+    """
+
+    def __init__(self, payload):
+        marker = uuid.uuid4().hex
+        blobs: list[Base64Bytes] = []
+
+        def placeholder(value):
+            if not isinstance(value, Base64Bytes):
+                raise TypeError(f"{type(value).__name__} is not JSON serializable")
+            blobs.append(value)
+            return f"{marker}:{len(blobs) - 1}"
+
+        rendered = json.dumps(payload, default=placeholder)
+        self._pieces: list[bytes] = []
+        self._blobs = blobs
+        for i in range(len(blobs)):
+            before, rendered = rendered.split(f'"{marker}:{i}"', 1)
+            self._pieces.append(before.encode())
+        self._pieces.append(rendered.encode())
+
+        self.length = sum(len(piece) for piece in self._pieces) + sum(
+            len(self._prefix(blob)) + 4 * -(-len(blob.data) // 3) + 1 for blob in blobs
+        )
+
+    @staticmethod
+    def _prefix(blob: Base64Bytes) -> bytes:
+        return json.dumps(blob.prefix)[:-1].encode()  # opening quote + prefix
+
+    def __len__(self) -> int:
+        return self.length
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        for piece, blob in zip(self._pieces, self._blobs):
+            yield piece
+            yield self._prefix(blob)
+            data = memoryview(blob.data)
+            for start in range(0, len(data), BASE64_CHUNK):
+                yield base64.b64encode(data[start : start + BASE64_CHUNK])
+            yield b'"'
+        yield self._pieces[-1]
+
+    def headers(self) -> dict[str, str]:
+        return {"Content-Type": "application/json", "Content-Length": str(self.length)}
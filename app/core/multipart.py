@@ -0,0 +1,138 @@
+from collections import deque
+from dataclasses import dataclass
+from typing import AsyncIterator
+
+from fastapi import Request
+from python_multipart.exceptions import MultipartParseError
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+# Allowance for boundaries, part headers and small fields around a file
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+class MultipartError(ValueError):
+    """Raised for a body that isn't well-formed multipart/form-data."""
+
+    pass
+
+
+class PartTooLargeError(MultipartError):
+    """Raised by strict parsing as soon as a part passes its size cap."""
+
+    pass
+
+
+@dataclass
+class UploadedPart:
+    name: str
+    filename: str | None
+    content_type: str | None
+    data: bytes
+    size: int  # full size, even when data was dropped for being too large
+
+    @property
+    def too_large(self) -> bool:
+        return self.size > len(self.data)
+
+
+async def iter_parts(
+    request: Request, max_part_size: int, strict: bool = False
+) -> AsyncIterator[UploadedPart]:
+    """
+    Yield each part of a multipart body as soon as it has been received.
+
+    Unlike request.form(), nothing waits for the whole body, so callers can
+    start work on the first part while later ones are still uploading. Data
+    past max_part_size is never buffered: it's dropped (check `too_large`),
+    or with strict=True reading stops there with PartTooLargeError.
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type"))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise MultipartError("Expected a multipart/form-data body")
+
+    finished: deque[UploadedPart] = deque()
+    headers: dict[bytes, bytes] = {}
+    field, value = bytearray(), bytearray()
+    chunks: list[bytes] = []
+    size = 0
+
+    def on_part_begin():
+        nonlocal size
+        headers.clear()
+        chunks.clear()
+        size = 0
+
+    def on_header_field(data, start, end):
+        field.extend(data[start:end])
+
+    def on_header_value(data, start, end):
+        value.extend(data[start:end])
+
+    def on_header_end():
+        headers[bytes(field).lower()] = bytes(value)
+        field.clear()
+        value.clear()
+
+    def on_part_data(data, start, end):
+        nonlocal size
+        size += end - start
+        if size <= max_part_size:
+            chunks.append(data[start:end])
+        elif strict:
+            raise PartTooLargeError(f"Part exceeds {max_part_size} bytes")
+
+    def on_part_end():
+        _, disposition = parse_options_header(headers.get(b"content-disposition"))
+        filename = disposition.get(b"filename")
+        part_type = headers.get(b"content-type")
+        finished.append(
+            UploadedPart(
+                name=disposition.get(b"name", b"").decode("utf-8", "replace"),
+                filename=filename.decode("utf-8", "replace") if filename else None,
+                content_type=part_type.decode("latin-1") if part_type else None,
+                data=b"".join(chunks),
+                size=size,
+            )
+        )
+
+    parser = MultipartParser(
+        params[b"boundary"],
+        {
+            "on_part_begin": on_part_begin,
+            "on_header_field": on_header_field,
+            "on_header_value": on_header_value,
+            "on_header_end": on_header_end,
+            "on_part_data": on_part_data,
+            "on_part_end": on_part_end,
+        },
+    )
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+            while finished:
+                yield finished.popleft()
+        parser.finalize()
+    except MultipartParseError as e:
+        raise MultipartError(f"Malformed multipart body: {e}") from e
+    while finished:
+        yield finished.popleft()
+
+
+async def read_file_part(
+    request: Request, name: str, max_size: int
+) -> UploadedPart | None:
+    """
+    Read one file field from a multipart body, holding at most max_size bytes.
+
+    Raises PartTooLargeError from the Content-Length header alone when it
+    can, otherwise as soon as the file passes the cap. Returns None if the
+    body has no such field.
+    """
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > max_size + MULTIPART_OVERHEAD:
+        raise PartTooLargeError(f"Body of {content_length} bytes is over the limit")
+
+    async for part in iter_parts(request, max_size, strict=True):
+        if part.name == name and part.filename is not None:
+            return part
+    return None
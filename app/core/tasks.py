@@ -0,0 +1,48 @@
+import asyncio
+import logging
+from datetime import datetime, time
+from typing import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+
+async def run_periodic(name: str, interval: float, job: Callable[[], Awaitable]):
+    """
+    Run `job` every `interval` seconds until cancelled.
+
+    Failures are logged and the loop carries on, so a flaky dependency
+    doesn't kill the background task for the life of the process.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await job()
+        except Exception as e:
+            logger.error(f"{name} failed: {e}")
+
+
+DAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+
+
+def within_window(spec: str | None, now: datetime) -> bool:
+    """
+    Whether `now` falls in a window like "mon-fri 08:00-18:00".
+
+    The day range is optional ("08:00-18:00" is every day) and an empty
+    spec means always. Times are in the server's local time.
+    """
+    if not spec or not spec.strip():
+        return True
+    parts = spec.lower().split()
+    if len(parts) == 2:
+        first, _, last = parts[0].partition("-")
+        start_day, end_day = DAYS.index(first), DAYS.index(last or first)
+        if start_day <= end_day:
+            in_days = start_day <= now.weekday() <= end_day
+        else:
+            in_days = now.weekday() >= start_day or now.weekday() <= end_day
+        if not in_days:
+            return False
+    start, _, end = parts[-1].partition("-")
+    start_time, end_time = time.fromisoformat(start), time.fromisoformat(end)
+    return start_time <= now.time() < end_time
@@ -1,13 +1,34 @@
+import logging
 from fastapi import FastAPI
 from contextlib import asynccontextmanager
-from app.core.database import check_db_connection, engine
+from app.core.database import check_db_connection, engine, replica_engines
+from app.core.db_metrics import QueryCountMiddleware
 from app.core.redis import check_redis_connection
-from app.core.config import API_V1_PREFIX
+from app.core.config import API_V1_PREFIX, settings
+from app.services.ai_service import (
+    close_ai_service,
+    get_ai_service,
+    keep_ai_model_warm,
+    warm_ai_model,
+)
+from app.services.asset_index import build_asset_index
+from app.services.image_job_service import (
+    close_image_job_queue,
+    fail_interrupted_image_jobs,
+    get_image_job_queue,
+)
+from app.core.tasks import run_periodic
+from app.services.change_log_service import prune_change_log
+from app.services.stats_service import reconcile_stats
 import app.core.logging  # noqa
 
 from app.api.routes.health import router as health_router
 from app.api.routes.auth import router as auth_router
 from app.api.routes.assets import router as assets_router
+from app.api.routes.jobs import router as jobs_router
+from app.api.routes.metrics import router as metrics_router
+
+logger = logging.getLogger(__name__)
 
 
 @asynccontextmanager
@@ -16,13 +37,46 @@ async def lifespan(app: FastAPI):
 
     # Parallelize connection checks for faster startup
     await asyncio.gather(check_db_connection(), check_redis_connection())
+    await build_asset_index()
+    try:
+        # One provider (and its HTTP connection pool) for the life of the process
+        get_ai_service().provider
+    except ValueError as e:
+        logger.error(f"AI provider not configured: {e}")
+    if settings.AI_WARMUP_ON_STARTUP:
+        # Pay for loading the model here rather than in the first upload
+        await warm_ai_model()
+    # Queued images lived in the old process's memory; start the pool afresh
+    await fail_interrupted_image_jobs()
+    get_image_job_queue()
+
+    periodic_jobs = [
+        ("Asset stats reconcile", settings.STATS_RECONCILE_INTERVAL, reconcile_stats),
+        ("Change log prune", settings.CHANGE_LOG_PRUNE_INTERVAL, prune_change_log),
+        ("AI warm-up", settings.AI_WARM_INTERVAL, keep_ai_model_warm),
+    ]
+    background_tasks = [
+        asyncio.create_task(run_periodic(name, interval, job))
+        for name, interval, job in periodic_jobs
+        if interval > 0
+    ]
     yield
     # Shutdown
-    await engine.dispose()
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    await close_image_job_queue()
+    await close_ai_service()
+    for db_engine in [engine, *replica_engines]:
+        await db_engine.dispose()
 
 
 app = FastAPI(lifespan=lifespan)
+if settings.DEBUG:
+    app.add_middleware(QueryCountMiddleware)
 
 app.include_router(health_router, prefix=API_V1_PREFIX)
 app.include_router(auth_router, prefix=API_V1_PREFIX)
 app.include_router(assets_router, prefix=API_V1_PREFIX)
+app.include_router(jobs_router, prefix=API_V1_PREFIX)
+app.include_router(metrics_router)
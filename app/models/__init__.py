@@ -1,5 +1,17 @@
 from .base import Base
 from .user import User
 from .asset import Asset
+from .asset_stat import AssetStat
+from .asset_change import AssetChange
+from .image_job import ImageJob
+from .redescribe_run import RedescribeRun
 
-__all__ = ["Base", "User", "Asset"]
+__all__ = [
+    "Base",
+    "User",
+    "Asset",
+    "AssetStat",
+    "AssetChange",
+    "ImageJob",
+    "RedescribeRun",
+]
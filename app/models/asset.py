@@ -14,9 +14,11 @@ class Asset(Base):
     description: Mapped[str | None] = mapped_column(Text)
     count: Mapped[int] = mapped_column(default=1)
     model: Mapped[str | None]
-    serial_number: Mapped[str | None]
+    serial_number: Mapped[str | None] = mapped_column(index=True)
     check_in_date: Mapped[date]
     check_out_date: Mapped[date | None]
+    # Bumped on every write; drives the asset's ETag
+    version: Mapped[int] = mapped_column(default=1, server_default="1")
 
     owner_id: Mapped[int] = mapped_column(ForeignKey("users.id"), index=True)
     owner = relationship("User", back_populates="assets")
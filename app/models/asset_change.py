@@ -0,0 +1,26 @@
+from datetime import datetime, timezone
+from sqlalchemy import BigInteger, DateTime, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+from app.models.base import Base
+
+CHANGE_INSERT = "insert"
+CHANGE_UPDATE = "update"
+CHANGE_DELETE = "delete"
+
+
+class AssetChange(Base):
+    """Append-only log of asset writes; seq is the delta-sync cursor."""
+
+    __tablename__ = "asset_changes"
+
+    # SQLite only autoincrements INTEGER PRIMARY KEY
+    seq: Mapped[int] = mapped_column(
+        BigInteger().with_variant(Integer, "sqlite"), primary_key=True
+    )
+    asset_id: Mapped[str]
+    op: Mapped[str]  # insert | update | delete
+    changed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        index=True,
+    )
@@ -0,0 +1,13 @@
+from sqlalchemy.orm import Mapped, mapped_column
+from app.models.base import Base
+
+
+class AssetStat(Base):
+    """Running totals per (dimension, key), maintained by AssetService writes."""
+
+    __tablename__ = "asset_stats"
+
+    dimension: Mapped[str] = mapped_column(primary_key=True)  # total|type|owner|status
+    key: Mapped[str] = mapped_column(primary_key=True)
+    assets: Mapped[int] = mapped_column(default=0)  # number of asset rows
+    units: Mapped[int] = mapped_column(default=0)  # sum of Asset.count
@@ -0,0 +1,34 @@
+from datetime import datetime, timezone
+from uuid import uuid4
+from sqlalchemy import DateTime, Text
+from sqlalchemy.orm import Mapped, mapped_column
+from app.models.base import Base
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+JOB_FINISHED = (JOB_SUCCEEDED, JOB_FAILED)
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+class ImageJob(Base):
+    """One queued image description for an asset."""
+
+    __tablename__ = "image_jobs"
+
+    id: Mapped[str] = mapped_column(primary_key=True, default=lambda: str(uuid4()))
+    asset_id: Mapped[str] = mapped_column(index=True)
+    # Who submitted it; their reads stay on the primary once it's written
+    user_id: Mapped[int | None]
+    status: Mapped[str] = mapped_column(default=JOB_QUEUED)
+    description: Mapped[str | None] = mapped_column(Text)
+    error: Mapped[str | None]
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=_now)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=_now, onupdate=_now
+    )
@@ -0,0 +1,29 @@
+from datetime import datetime, timezone
+from sqlalchemy import DateTime
+from sqlalchemy.orm import Mapped, mapped_column
+from app.models.base import Base
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+class RedescribeRun(Base):
+    """Checkpoint of a bulk re-description run, so it can resume after a crash."""
+
+    __tablename__ = "redescribe_runs"
+
+    name: Mapped[str] = mapped_column(primary_key=True)
+    # Provider, model and prompt version the run describes with
+    target: Mapped[str]
+    # Keyset cursor: every asset id up to this one has been handled
+    last_asset_id: Mapped[str | None]
+    processed: Mapped[int] = mapped_column(default=0)
+    updated: Mapped[int] = mapped_column(default=0)
+    skipped: Mapped[int] = mapped_column(default=0)
+    failed: Mapped[int] = mapped_column(default=0)
+    started_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=_now)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=_now, onupdate=_now
+    )
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
@@ -40,3 +40,62 @@ class AssetOut(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class AssetPartialOut(BaseModel):
+    """AssetOut trimmed by `?fields=`; only the requested fields are emitted."""
+
+    id: str
+    name: str | None = None
+    type: str | None = None
+    description: str | None = None
+    count: int | None = None
+    model: str | None = None
+    serial_number: str | None = None
+    check_in_date: date | None = None
+    check_out_date: date | None = None
+    owner_id: int | None = None
+
+    class Config:
+        from_attributes = True
+
+
+class AssetSuggestion(BaseModel):
+    field: str  # serial_number | model
+    value: str
+    matches: int  # number of assets carrying this value
+
+
+class StatBucket(BaseModel):
+    assets: int  # number of asset records
+    units: int  # sum of Asset.count
+
+
+class AssetStats(BaseModel):
+    total: StatBucket
+    checked_in: StatBucket
+    checked_out: StatBucket
+    by_type: dict[str, StatBucket]
+    by_owner: dict[int, StatBucket]
+
+
+class AssetChangeOut(BaseModel):
+    seq: int
+    op: str  # insert | update | delete
+    asset_id: str
+    asset: AssetOut | None = None  # None for tombstones
+
+
+class AssetChangesPage(BaseModel):
+    changes: list[AssetChangeOut]
+    next_cursor: int
+    has_more: bool
+
+
+class ImageUploadResult(BaseModel):
+    asset_id: str
+    filename: str | None = None
+    status: str  # updated | failed | overloaded
+    description: str | None = None
+    error: str | None = None
+    retry_after: int | None = None  # seconds, when overloaded
@@ -0,0 +1,16 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class ImageJobOut(BaseModel):
+    id: str
+    asset_id: str
+    status: str  # queued | running | succeeded | failed
+    description: str | None = None
+    error: str | None = None
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
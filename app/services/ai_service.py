@@ -1,10 +1,23 @@
-import base64
+import asyncio
+import contextlib
+import hashlib
+import json
 import logging
-from typing import Protocol, runtime_checkable
+import math
+import time
+from collections import deque
+from datetime import datetime
+from typing import AsyncIterator, Protocol, runtime_checkable
 
 import httpx
 
 from app.core.config import settings
+from app.core.json_body import Base64Bytes, JSONBody
+from app.core.metrics import Counter, Gauge, Histogram
+from app.core.tasks import within_window
+from app.core.redis import redis_client
+from app.services.description_cache import DescriptionCache
+from app.services.image_processing import prepare_image
 
 logger = logging.getLogger(__name__)
 
@@ -13,6 +26,15 @@ ASSET_DESCRIPTION_PROMPT = """You are an asset management assistant. Describe th
 Include: type of device, brand/model if visible, color, condition, notable features.
 Keep it to 2-3 sentences, professional tone."""
 
+# Appended when several images go into one request
+BATCH_DESCRIPTION_PROMPT = """You will receive {count} images, each showing a different asset.
+Reply with only a JSON array of {count} strings: the description of each image, in the order given."""
+
+# Part of the description cache key, so editing a prompt retires old entries
+PROMPT_VERSION = hashlib.sha256(
+    (ASSET_DESCRIPTION_PROMPT + BATCH_DESCRIPTION_PROMPT).encode()
+).hexdigest()[:12]
+
 
 class AIProviderError(Exception):
     """Raised when an AI provider fails."""
@@ -20,64 +42,212 @@ class AIProviderError(Exception):
     pass
 
 
+class AIOverloadedError(AIProviderError):
+    """Raised instead of queueing a request that couldn't start in time."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
 @runtime_checkable
 class AIProvider(Protocol):
-    """Interface for AI providers - just needs describe_image method."""
+    """
+    Interface for AI providers - just needs describe_image method.
+
+    Providers that can take several images in one request may also define
+    `async describe_images(images: list[tuple[bytes, str]]) -> list[str]`,
+    which BatchingProvider uses when present, and
+    `stream_description(image_bytes, mime_type) -> AsyncIterator[str]`,
+    yielding the description piece by piece as the model generates it.
+    """
 
     async def describe_image(self, image_bytes: bytes, mime_type: str) -> str: ...
 
 
-class OllamaProvider:
-    """Ollama local provider. Needs ollama running with a vision model like llava."""
+def parse_batch_descriptions(text: str, count: int) -> list[str]:
+    """Pull the JSON array of descriptions out of a batch reply."""
+    start, end = text.find("["), text.rfind("]")
+    try:
+        descriptions = json.loads(text[start : end + 1]) if start != -1 else None
+    except ValueError:
+        descriptions = None
+    if (
+        not isinstance(descriptions, list)
+        or len(descriptions) != count
+        or not all(isinstance(d, str) and d.strip() for d in descriptions)
+    ):
+        raise AIProviderError(f"Batch reply didn't hold {count} descriptions")
+    return [d.strip() for d in descriptions]
+
+
+def build_http_client() -> httpx.AsyncClient:
+    """Pooled client for talking to an inference server, sized from settings."""
+    return httpx.AsyncClient(
+        timeout=settings.AI_TIMEOUT,
+        limits=httpx.Limits(
+            max_connections=settings.AI_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.AI_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.AI_KEEPALIVE_EXPIRY,
+        ),
+    )
+
+
+class HTTPProvider:
+    """
+    Base for providers that call an HTTP inference server.
+
+    Holds one long-lived pooled client so consecutive requests reuse
+    keep-alive connections instead of paying TCP setup every time.
+    """
 
-    def __init__(self, endpoint: str = "http://localhost:11434", model: str = "llava"):
+    def __init__(
+        self, endpoint: str, model: str, client: httpx.AsyncClient | None = None
+    ):
         self.endpoint = endpoint.rstrip("/")
         self.model = model
+        self._client = client
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = build_http_client()
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _post_json(self, path: str, payload: dict) -> httpx.Response:
+        """
+        POST a payload whose images are Base64Bytes placeholders.
+
+        The body is streamed (see JSONBody): a 10 MB upload isn't also held
+        as a base64 str, a payload dict and httpx's serialized copy.
+        """
+        body = JSONBody(payload)
+        return await self.client.post(
+            f"{self.endpoint}{path}", content=body, headers=body.headers()
+        )
+
+    def _stream_json(self, path: str, payload: dict):
+        """Like _post_json, as a context manager giving a streamed response."""
+        body = JSONBody(payload)
+        return self.client.stream(
+            "POST", f"{self.endpoint}{path}", content=body, headers=body.headers()
+        )
+
+
+class OllamaProvider(HTTPProvider):
+    """
+    Ollama local provider. Needs ollama running with a vision model like llava.
+
+    keep_alive (e.g. "30m", "-1" for ever) is sent with every request and
+    sets how long Ollama keeps the model loaded afterwards; its default is
+    5 minutes, after which the next request pays for a cold load.
+    """
+
+    def __init__(
+        self,
+        endpoint: str = "http://localhost:11434",
+        model: str = "llava",
+        client: httpx.AsyncClient | None = None,
+        keep_alive: str | None = None,
+    ):
+        super().__init__(endpoint, model, client)
+        self.keep_alive = keep_alive
+
+    def _payload(self, image_bytes: bytes, stream: bool) -> dict:
+        return {
+            "model": self.model,
+            "prompt": f"{ASSET_DESCRIPTION_PROMPT}\n\nDescribe this asset.",
+            "images": [Base64Bytes(image_bytes)],
+            "stream": stream,
+        }
+
+    def _with_keep_alive(self, payload: dict) -> dict:
+        if self.keep_alive is not None:
+            payload["keep_alive"] = self.keep_alive
+        return payload
+
+    async def warm_up(self) -> None:
+        """Load the model (a prompt-less generate) without generating anything."""
+        await self._generate({"model": self.model, "stream": False})
 
     async def describe_image(self, image_bytes: bytes, mime_type: str) -> str:
-        base64_image = base64.standard_b64encode(image_bytes).decode("utf-8")
+        return await self._generate(self._payload(image_bytes, stream=False))
 
+    async def stream_description(
+        self, image_bytes: bytes, mime_type: str
+    ) -> AsyncIterator[str]:
+        """Ollama streams one JSON object per line until one has done=true."""
+        try:
+            async with self._stream_json(
+                "/api/generate",
+                self._with_keep_alive(self._payload(image_bytes, stream=True)),
+            ) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line.strip():
+                        continue
+                    chunk = json.loads(line)
+                    if "error" in chunk:
+                        raise AIProviderError(f"Ollama failed: {chunk['error']}")
+                    if chunk.get("response"):
+                        yield chunk["response"]
+                    if chunk.get("done"):
+                        return
+        except httpx.HTTPStatusError as e:
+            logger.error(f"Ollama error: {e.response.status_code}")
+            raise AIProviderError(f"Ollama failed: {e.response.status_code}") from e
+        except httpx.RequestError as e:
+            logger.error(f"Can't reach Ollama: {e}")
+            raise AIProviderError(f"Can't connect to Ollama at {self.endpoint}") from e
+        except ValueError:
+            raise AIProviderError("Bad response from Ollama")
+
+    async def describe_images(self, images: list[tuple[bytes, str]]) -> list[str]:
         payload = {
             "model": self.model,
-            "prompt": f"{ASSET_DESCRIPTION_PROMPT}\n\nDescribe this asset.",
-            "images": [base64_image],
+            "prompt": f"{ASSET_DESCRIPTION_PROMPT}\n\n"
+            + BATCH_DESCRIPTION_PROMPT.format(count=len(images)),
+            "images": [Base64Bytes(image_bytes) for image_bytes, _ in images],
             "stream": False,
         }
+        return parse_batch_descriptions(await self._generate(payload), len(images))
 
-        async with httpx.AsyncClient(timeout=120.0) as client:
-            try:
-                response = await client.post(
-                    f"{self.endpoint}/api/generate",
-                    json=payload,
-                )
-                response.raise_for_status()
-                return response.json()["response"]
-            except httpx.HTTPStatusError as e:
-                logger.error(f"Ollama error: {e.response.status_code}")
-                raise AIProviderError(f"Ollama failed: {e.response.status_code}") from e
-            except httpx.RequestError as e:
-                logger.error(f"Can't reach Ollama: {e}")
-                raise AIProviderError(
-                    f"Can't connect to Ollama at {self.endpoint}"
-                ) from e
-            except KeyError:
-                raise AIProviderError("Bad response from Ollama")
-
-
-class LMStudioProvider:
+    async def _generate(self, payload: dict) -> str:
+        try:
+            response = await self._post_json(
+                "/api/generate", self._with_keep_alive(payload)
+            )
+            response.raise_for_status()
+            return response.json()["response"]
+        except httpx.HTTPStatusError as e:
+            logger.error(f"Ollama error: {e.response.status_code}")
+            raise AIProviderError(f"Ollama failed: {e.response.status_code}") from e
+        except httpx.RequestError as e:
+            logger.error(f"Can't reach Ollama: {e}")
+            raise AIProviderError(f"Can't connect to Ollama at {self.endpoint}") from e
+        except KeyError:
+            raise AIProviderError("Bad response from Ollama")
+
+
+class LMStudioProvider(HTTPProvider):
     """LMStudio local provider. Uses OpenAI-compatible API on localhost:1234."""
 
     def __init__(
-        self, endpoint: str = "http://localhost:1234", model: str = "local-model"
+        self,
+        endpoint: str = "http://localhost:1234",
+        model: str = "local-model",
+        client: httpx.AsyncClient | None = None,
     ):
-        self.endpoint = endpoint.rstrip("/")
-        self.model = model
-
-    async def describe_image(self, image_bytes: bytes, mime_type: str) -> str:
-        base64_image = base64.standard_b64encode(image_bytes).decode("utf-8")
+        super().__init__(endpoint, model, client)
 
+    def _payload(self, image_bytes: bytes, mime_type: str, stream: bool) -> dict:
         # OpenAI-compatible chat format
-        payload = {
+        return {
             "model": self.model,
             "messages": [
                 {"role": "system", "content": ASSET_DESCRIPTION_PROMPT},
@@ -87,7 +257,9 @@ class LMStudioProvider:
                         {
                             "type": "image_url",
                             "image_url": {
-                                "url": f"data:{mime_type};base64,{base64_image}"
+                                "url": Base64Bytes(
+                                    image_bytes, f"data:{mime_type};base64,"
+                                )
                             },
                         },
                         {"type": "text", "text": "Describe this asset."},
@@ -96,29 +268,422 @@ class LMStudioProvider:
             ],
             "max_tokens": 300,
             "temperature": 0.7,
+            "stream": stream,
         }
 
-        async with httpx.AsyncClient(timeout=120.0) as client:
+    async def describe_image(self, image_bytes: bytes, mime_type: str) -> str:
+        return await self._chat(self._payload(image_bytes, mime_type, stream=False))
+
+    async def warm_up(self) -> None:
+        """LM Studio loads models on demand; a one-token completion does it."""
+        await self._chat(
+            {
+                "model": self.model,
+                "messages": [{"role": "user", "content": "Hi"}],
+                "max_tokens": 1,
+            }
+        )
+
+    async def stream_description(
+        self, image_bytes: bytes, mime_type: str
+    ) -> AsyncIterator[str]:
+        """Server-sent events with content deltas, ending with `data: [DONE]`."""
+        try:
+            async with self._stream_json(
+                "/v1/chat/completions",
+                self._payload(image_bytes, mime_type, stream=True),
+            ) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == "[DONE]":
+                        return
+                    delta = json.loads(data)["choices"][0]["delta"]
+                    if delta.get("content"):
+                        yield delta["content"]
+        except httpx.HTTPStatusError as e:
+            logger.error(f"LMStudio error: {e.response.status_code}")
+            raise AIProviderError(f"LMStudio failed: {e.response.status_code}") from e
+        except httpx.RequestError as e:
+            logger.error(f"Can't reach LMStudio: {e}")
+            raise AIProviderError(
+                f"Can't connect to LMStudio at {self.endpoint}"
+            ) from e
+        except (KeyError, IndexError, ValueError):
+            raise AIProviderError("Bad response from LMStudio")
+
+    async def describe_images(self, images: list[tuple[bytes, str]]) -> list[str]:
+        content = [
+            {
+                "type": "image_url",
+                "image_url": {
+                    "url": Base64Bytes(image_bytes, f"data:{mime_type};base64,")
+                },
+            }
+            for image_bytes, mime_type in images
+        ]
+        content.append(
+            {
+                "type": "text",
+                "text": BATCH_DESCRIPTION_PROMPT.format(count=len(images)),
+            }
+        )
+        payload = {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": ASSET_DESCRIPTION_PROMPT},
+                {"role": "user", "content": content},
+            ],
+            "max_tokens": 300 * len(images),
+            "temperature": 0.7,
+        }
+        return parse_batch_descriptions(await self._chat(payload), len(images))
+
+    async def _chat(self, payload: dict) -> str:
+        try:
+            response = await self._post_json("/v1/chat/completions", payload)
+            response.raise_for_status()
+            return response.json()["choices"][0]["message"]["content"]
+        except httpx.HTTPStatusError as e:
+            logger.error(f"LMStudio error: {e.response.status_code}")
+            raise AIProviderError(f"LMStudio failed: {e.response.status_code}") from e
+        except httpx.RequestError as e:
+            logger.error(f"Can't reach LMStudio: {e}")
+            raise AIProviderError(
+                f"Can't connect to LMStudio at {self.endpoint}"
+            ) from e
+        except (KeyError, IndexError):
+            raise AIProviderError("Bad response from LMStudio")
+
+
+class BatchingProvider:
+    """
+    Micro-batches concurrent describe_image calls.
+
+    Calls arriving within max_wait_ms of each other (up to max_batch_size)
+    go to the wrapped provider as one describe_images request, so the
+    inference server can run them in a single forward pass. Results are
+    handed back to each caller. Lone calls, providers without
+    describe_images, and batches that fail or come back malformed fall back
+    to one request per image.
+
+    max_concurrency caps requests in flight, counting a batch as one.
+    """
+
+    def __init__(
+        self,
+        provider: AIProvider,
+        max_batch_size: int = 4,
+        max_wait_ms: float = 25,
+        max_concurrency: int = 4,
+    ):
+        self.provider = provider
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._pending: list[tuple[bytes, str, asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def describe_image(self, image_bytes: bytes, mime_type: str) -> str:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((image_bytes, mime_type, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        # Callers that gave up while waiting don't take a slot in the batch
+        batch = [item for item in self._pending if not item[2].done()]
+        self._pending = []
+        if batch:
+            task = asyncio.create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: list[tuple[bytes, str, asyncio.Future]]) -> None:
+        if len(batch) > 1 and hasattr(self.provider, "describe_images"):
+            try:
+                async with self._slots:
+                    descriptions = await self.provider.describe_images(
+                        [
+                            (image_bytes, mime_type)
+                            for image_bytes, mime_type, _ in batch
+                        ]
+                    )
+            except AIProviderError as e:
+                logger.warning(f"Batch of {len(batch)} failed, retrying singly: {e}")
+            except Exception as e:
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+            else:
+                for (_, _, future), description in zip(batch, descriptions):
+                    if not future.done():
+                        future.set_result(description)
+                return
+
+        await asyncio.gather(*(self._run_one(*item) for item in batch))
+
+    async def _run_one(
+        self, image_bytes: bytes, mime_type: str, future: asyncio.Future
+    ) -> None:
+        try:
+            async with self._slots:
+                description = await self.provider.describe_image(image_bytes, mime_type)
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+        else:
+            if not future.done():
+                future.set_result(description)
+
+    async def warm_up(self) -> None:
+        if hasattr(self.provider, "warm_up"):
+            await self.provider.warm_up()
+
+    async def aclose(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        for _, _, future in self._pending:
+            future.cancel()
+        self._pending = []
+        if hasattr(self.provider, "aclose"):
+            await self.provider.aclose()
+
+
+class Backend:
+    """One inference server behind a RoutingProvider, with its routing stats."""
+
+    def __init__(self, name: str, provider: AIProvider, window: int = 200):
+        self.name = name
+        self.provider = provider
+        self.ewma: float | None = None  # seconds per request
+        self.in_flight = 0
+        self.latencies: deque[float] = deque(maxlen=window)
+        self.failures = 0  # consecutive
+        self.open_until = 0.0
+        self.probing = False
+
+    def is_tripped(self, threshold: int) -> bool:
+        return self.failures >= threshold
+
+    def available(self, now: float, threshold: int) -> bool:
+        """Closed breaker, or half-open with no trial request out yet."""
+        if not self.is_tripped(threshold):
+            return True
+        return now >= self.open_until and not self.probing
+
+    def score(self) -> float:
+        # Unmeasured backends score 0 so they get sampled straight away;
+        # in-flight requests queue behind each other on the server
+        return (self.ewma or 0.0) * (self.in_flight + 1)
+
+    def percentile(self, pct: float) -> float:
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class RoutingProvider:
+    """
+    Spreads requests over several inference servers.
+
+    Each request goes to the backend with the lowest EWMA latency times
+    (in-flight + 1), so a node that slows down sheds traffic as soon as its
+    requests start piling up. A backend raising AIProviderError has the
+    request retried on the next best one; after failure_threshold errors in
+    a row its circuit opens for `cooldown` seconds, then a single trial
+    request decides whether it closes again.
+
+    With hedge_percentile set, a request still running after that
+    percentile of its backend's recent latencies is also sent to a second
+    backend, and the first answer wins.
+    """
+
+    EWMA_ALPHA = 0.3
+    HEDGE_MIN_SAMPLES = 20
+
+    def __init__(
+        self,
+        backends: list[tuple[str, AIProvider]],
+        hedge_percentile: float | None = None,
+        failure_threshold: int = 3,
+        cooldown: float = 30.0,
+    ):
+        if not backends:
+            raise ValueError("RoutingProvider needs at least one backend")
+        if hedge_percentile is not None and not 0 < hedge_percentile < 100:
+            raise ValueError("hedge_percentile must be between 0 and 100")
+        self.backends = [Backend(name, provider) for name, provider in backends]
+        self.hedge_percentile = hedge_percentile
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+
+    async def describe_image(self, image_bytes: bytes, mime_type: str) -> str:
+        return await self._route("describe_image", image_bytes, mime_type)
+
+    async def describe_images(self, images: list[tuple[bytes, str]]) -> list[str]:
+        return await self._route("describe_images", images)
+
+    async def stream_description(
+        self, image_bytes: bytes, mime_type: str
+    ) -> AsyncIterator[str]:
+        """Fails over until the first piece arrives; never hedged."""
+        tried: set[Backend] = set()
+        last_error = None
+        while (backend := self._pick(tried)) is not None:
+            tried.add(backend)
+            started, yielded = time.monotonic(), False
+            self._begin(backend)
             try:
-                response = await client.post(
-                    f"{self.endpoint}/v1/chat/completions",
-                    json=payload,
-                    headers={"Content-Type": "application/json"},
+                async for piece in backend.provider.stream_description(
+                    image_bytes, mime_type
+                ):
+                    yielded = True
+                    yield piece
+            except AIProviderError as e:
+                self._record_failure(backend, e)
+                if yielded:
+                    raise
+                last_error = e
+                continue
+            finally:
+                self._end(backend)
+            self._record_success(backend, time.monotonic() - started)
+            return
+        raise last_error or AIProviderError("No AI endpoint available")
+
+    async def warm_up(self) -> None:
+        """Warm every backend, so failover doesn't land on a cold one."""
+        results = await asyncio.gather(
+            *(
+                backend.provider.warm_up()
+                for backend in self.backends
+                if hasattr(backend.provider, "warm_up")
+            ),
+            return_exceptions=True,
+        )
+        errors = [r for r in results if isinstance(r, Exception)]
+        if errors and len(errors) == len(results):
+            raise errors[0]
+        for error in errors:
+            logger.warning(f"AI endpoint warm-up failed: {error}")
+
+    async def aclose(self) -> None:
+        for backend in self.backends:
+            if hasattr(backend.provider, "aclose"):
+                await backend.provider.aclose()
+
+    def _pick(self, exclude: set[Backend]) -> Backend | None:
+        now = time.monotonic()
+        candidates = [
+            b
+            for b in self.backends
+            if b not in exclude and b.available(now, self.failure_threshold)
+        ]
+        return min(candidates, key=Backend.score, default=None)
+
+    async def _route(self, method: str, *args):
+        tried: set[Backend] = set()
+        last_error = None
+        while (backend := self._pick(tried)) is not None:
+            tried.add(backend)
+            try:
+                return await self._hedged(backend, tried, method, args)
+            except AIProviderError as e:
+                last_error = e
+        raise last_error or AIProviderError("No AI endpoint available")
+
+    async def _hedged(self, backend: Backend, tried: set[Backend], method, args):
+        pending = {self._start(backend, method, args)}
+        try:
+            delay = self._hedge_delay(backend)
+            if delay is not None:
+                done, _ = await asyncio.wait(pending, timeout=delay)
+                hedge = None if done else self._pick(tried)
+                if hedge is not None:
+                    tried.add(hedge)
+                    logger.info(
+                        f"Hedging slow request on {backend.name} to {hedge.name}"
+                    )
+                    pending.add(self._start(hedge, method, args))
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
                 )
-                response.raise_for_status()
-                return response.json()["choices"][0]["message"]["content"]
-            except httpx.HTTPStatusError as e:
-                logger.error(f"LMStudio error: {e.response.status_code}")
-                raise AIProviderError(
-                    f"LMStudio failed: {e.response.status_code}"
-                ) from e
-            except httpx.RequestError as e:
-                logger.error(f"Can't reach LMStudio: {e}")
-                raise AIProviderError(
-                    f"Can't connect to LMStudio at {self.endpoint}"
-                ) from e
-            except (KeyError, IndexError):
-                raise AIProviderError("Bad response from LMStudio")
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def _hedge_delay(self, backend: Backend) -> float | None:
+        if (
+            self.hedge_percentile is None
+            or len(backend.latencies) < self.HEDGE_MIN_SAMPLES
+        ):
+            return None
+        return backend.percentile(self.hedge_percentile)
+
+    def _start(self, backend: Backend, method: str, args: tuple) -> asyncio.Task:
+        # Counted in flight right away, so the next pick already sees it
+        self._begin(backend)
+        task = asyncio.create_task(self._call(backend, method, args))
+        task.add_done_callback(lambda _: self._end(backend))
+        return task
+
+    async def _call(self, backend: Backend, method: str, args: tuple):
+        started = time.monotonic()
+        try:
+            result = await getattr(backend.provider, method)(*args)
+        except AIProviderError as e:
+            self._record_failure(backend, e)
+            raise
+        self._record_success(backend, time.monotonic() - started)
+        return result
+
+    def _begin(self, backend: Backend) -> None:
+        backend.in_flight += 1
+        if backend.is_tripped(self.failure_threshold):
+            backend.probing = True
+
+    def _end(self, backend: Backend) -> None:
+        backend.in_flight -= 1
+        backend.probing = False
+
+    def _record_success(self, backend: Backend, elapsed: float) -> None:
+        if backend.is_tripped(self.failure_threshold):
+            logger.info(f"AI endpoint {backend.name} recovered")
+        backend.failures = 0
+        backend.latencies.append(elapsed)
+        backend.ewma = (
+            elapsed
+            if backend.ewma is None
+            else self.EWMA_ALPHA * elapsed + (1 - self.EWMA_ALPHA) * backend.ewma
+        )
+
+    def _record_failure(self, backend: Backend, error: AIProviderError) -> None:
+        backend.failures += 1
+        if backend.is_tripped(self.failure_threshold):
+            backend.open_until = time.monotonic() + self.cooldown
+            logger.warning(
+                f"AI endpoint {backend.name} failing ({error}), "
+                f"skipping it for {self.cooldown:g}s"
+            )
 
 
 # Stubs for cloud providers - shows the architecture but not implemented
@@ -149,19 +714,28 @@ class AnthropicProvider:
 
 
 def get_ai_provider() -> AIProvider:
-    """Factory to get the configured provider based on AI_PROVIDER setting."""
-    provider_name = settings.AI_PROVIDER.lower()
+    """
+    Factory to get the configured provider based on AI_PROVIDER setting.
 
-    if provider_name == "ollama":
-        return OllamaProvider(
-            endpoint=settings.AI_ENDPOINT,
-            model=settings.AI_MODEL or "llava",
-        )
+    For the local providers, several comma-separated AI_ENDPOINTS give a
+    RoutingProvider over one provider per endpoint.
+    """
+    provider_name = settings.AI_PROVIDER.lower()
 
-    if provider_name == "lmstudio":
-        return LMStudioProvider(
-            endpoint=settings.AI_ENDPOINT or "http://localhost:1234",
-            model=settings.AI_MODEL or "local-model",
+    if provider_name in ("ollama", "lmstudio"):
+        endpoints = [
+            endpoint.strip()
+            for endpoint in (settings.AI_ENDPOINTS or "").split(",")
+            if endpoint.strip()
+        ] or [settings.AI_ENDPOINT]
+        providers = [_local_provider(provider_name, e) for e in endpoints]
+        if len(providers) == 1:
+            return providers[0]
+        return RoutingProvider(
+            list(zip(endpoints, providers)),
+            hedge_percentile=settings.AI_HEDGE_PERCENTILE,
+            failure_threshold=settings.AI_BREAKER_FAILURES,
+            cooldown=settings.AI_BREAKER_COOLDOWN,
         )
 
     if provider_name == "openai":
@@ -182,25 +756,302 @@ def get_ai_provider() -> AIProvider:
     raise ValueError(f"Unknown AI provider: {provider_name}")
 
 
+def _local_provider(provider_name: str, endpoint: str) -> HTTPProvider:
+    if provider_name == "ollama":
+        return OllamaProvider(
+            endpoint=endpoint,
+            model=settings.AI_MODEL or "llava",
+            keep_alive=settings.AI_KEEP_ALIVE,
+        )
+    return LMStudioProvider(
+        endpoint=endpoint or "http://localhost:1234",
+        model=settings.AI_MODEL or "local-model",
+    )
+
+
+def build_description_cache() -> DescriptionCache | None:
+    """Description cache for the configured provider and model, if enabled."""
+    if not settings.AI_CACHE_ENABLED:
+        return None
+    return DescriptionCache(
+        redis_client,
+        namespace=f"{settings.AI_PROVIDER.lower()}:{settings.AI_MODEL}:{PROMPT_VERSION}",
+        ttl=settings.AI_CACHE_TTL,
+        disk_dir=settings.AI_CACHE_DIR,
+        phash_threshold=settings.AI_CACHE_PHASH_THRESHOLD,
+    )
+
+
+AI_QUEUE_DEPTH = Histogram(
+    "ai_queue_depth",
+    "Requests already waiting for an inference slot when one arrives",
+    buckets=(0, 1, 2, 4, 8, 16, 32, 64),
+)
+AI_QUEUE_WAIT = Histogram(
+    "ai_queue_wait_seconds", "Time spent waiting for an inference slot"
+)
+AI_INFERENCE_TIME = Histogram("ai_inference_seconds", "Time holding an inference slot")
+AI_WARMUP_TIME = Histogram(
+    "ai_warmup_seconds", "Warm-up probe latency (a slow one was a cold load)"
+)
+AI_REJECTED = Counter(
+    "ai_rejected_total",
+    "Requests turned away by admission control",
+    labelnames=("reason",),
+)
+
+
+def admission_concurrency() -> int:
+    """
+    Inferences AIService admits at once. Inference servers queue or fail past
+    a few parallel requests; with micro-batching each carries up to a batch.
+    """
+    return settings.AI_MAX_CONCURRENCY * max(1, settings.AI_BATCH_MAX_SIZE)
+
+
+class AdmissionController:
+    """
+    Concurrency limit with a bounded, deadline-aware wait queue.
+
+    Up to max_concurrency requests run at once and up to max_queue wait
+    for a slot. Past that, or when the expected wait (queue position x the
+    recent average inference time / max_concurrency) exceeds max_wait, a
+    request fails at once with AIOverloadedError instead of timing out
+    later; so does one that has waited max_wait without getting a slot.
+    retry_after is the expected time for the queue to drain.
+    """
+
+    EWMA_ALPHA = 0.2
+
+    def __init__(self, max_concurrency: int, max_queue: int, max_wait: float):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.waiting = 0
+        self.active = 0
+        self.service_time: float | None = None  # EWMA seconds per request
+        self._slots = asyncio.Semaphore(max_concurrency)
+
+    def expected_wait(self, position: int) -> float:
+        if self.service_time is None:
+            return 0.0
+        return position * self.service_time / self.max_concurrency
+
+    def _reject(self, reason: str, message: str) -> AIOverloadedError:
+        AI_REJECTED.inc(reason=reason)
+        drain = self.expected_wait(self.waiting + 1) or self.max_wait
+        return AIOverloadedError(message, retry_after=max(1, math.ceil(drain)))
+
+    @contextlib.asynccontextmanager
+    async def slot(self):
+        AI_QUEUE_DEPTH.observe(self.waiting)
+        if self._slots.locked():
+            if self.waiting >= self.max_queue:
+                raise self._reject("queue_full", "AI request queue is full")
+            if self.expected_wait(self.waiting + 1) > self.max_wait:
+                raise self._reject("deadline", "AI requests are backed up")
+
+        self.waiting += 1
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.max_wait)
+        except TimeoutError:
+            raise self._reject("timeout", "Timed out waiting for the AI service")
+        finally:
+            self.waiting -= 1
+        AI_QUEUE_WAIT.observe(time.monotonic() - started)
+
+        self.active += 1
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._slots.release()
+            elapsed = time.monotonic() - started
+            AI_INFERENCE_TIME.observe(elapsed)
+            self.service_time = (
+                elapsed
+                if self.service_time is None
+                else self.EWMA_ALPHA * elapsed
+                + (1 - self.EWMA_ALPHA) * self.service_time
+            )
+
+
 class AIService:
     """Wraps AI providers for asset-specific operations."""
 
-    def __init__(self, provider: AIProvider | None = None):
+    def __init__(
+        self,
+        provider: AIProvider | None = None,
+        cache: DescriptionCache | None = None,
+    ):
         self._provider = provider
+        self.cache = cache
+        self.admission = AdmissionController(
+            admission_concurrency(),
+            max_queue=settings.AI_QUEUE_SIZE,
+            max_wait=settings.AI_QUEUE_TIMEOUT,
+        )
 
     @property
     def provider(self) -> AIProvider:
         if self._provider is None:
-            self._provider = get_ai_provider()
+            provider = get_ai_provider()
+            if settings.AI_BATCH_MAX_SIZE > 1:
+                provider = BatchingProvider(
+                    provider,
+                    max_batch_size=settings.AI_BATCH_MAX_SIZE,
+                    max_wait_ms=settings.AI_BATCH_WINDOW_MS,
+                    max_concurrency=settings.AI_MAX_CONCURRENCY,
+                )
+            self._provider = provider
         return self._provider
 
     async def describe_asset_image(self, image_bytes: bytes, mime_type: str) -> str:
-        """Generate description for an asset image."""
-        logger.info(f"Generating description with {settings.AI_PROVIDER}")
-        description = await self.provider.describe_image(image_bytes, mime_type)
+        """
+        Generate description for an asset image, reusing cached ones.
+
+        Cache keys use the original upload; only misses pay for the
+        downscale/re-encode, which runs in a worker thread.
+        """
+        if self.cache is not None:
+            cached, key = await self.cache.lookup(image_bytes)
+            if cached is not None:
+                return cached
+
+        image_bytes, mime_type = await self._prepare(image_bytes, mime_type)
+
+        provider = self.provider
+        async with self.admission.slot():
+            logger.info(f"Generating description with {settings.AI_PROVIDER}")
+            description = await provider.describe_image(image_bytes, mime_type)
         logger.info("Got description")
+
+        if self.cache is not None:
+            await self.cache.store(key, description)
         return description
 
+    async def stream_asset_description(
+        self, image_bytes: bytes, mime_type: str
+    ) -> AsyncIterator[str]:
+        """
+        Like describe_asset_image, yielding the text as it is generated.
+
+        A cached description comes back as one piece, as does the whole
+        description for providers that can't stream. Streams skip micro-
+        batching: the point is to get the first tokens back early.
+        """
+        provider = self.provider
+        if isinstance(provider, BatchingProvider):
+            provider = provider.provider
+        if not hasattr(provider, "stream_description"):
+            yield await self.describe_asset_image(image_bytes, mime_type)
+            return
+
+        if self.cache is not None:
+            cached, key = await self.cache.lookup(image_bytes)
+            if cached is not None:
+                yield cached
+                return
+
+        image_bytes, mime_type = await self._prepare(image_bytes, mime_type)
+
+        pieces = []
+        async with self.admission.slot():
+            logger.info(f"Streaming description with {settings.AI_PROVIDER}")
+            async for piece in provider.stream_description(image_bytes, mime_type):
+                pieces.append(piece)
+                yield piece
+        description = "".join(pieces).strip()
+        if not description:
+            raise AIProviderError("Model returned an empty description")
+
+        if self.cache is not None:
+            await self.cache.store(key, description)
+
+    async def warm_up(self) -> float | None:
+        """
+        Make sure the model is loaded; returns the seconds it took.
+
+        Skipped (None) while requests are running, which keep it loaded
+        anyway, and for providers with nothing to warm. Errors propagate.
+        """
+        provider = self.provider
+        if self.admission.active or not hasattr(provider, "warm_up"):
+            return None
+        started = time.monotonic()
+        await provider.warm_up()
+        elapsed = time.monotonic() - started
+        AI_WARMUP_TIME.observe(elapsed)
+        return elapsed
+
+    async def _prepare(self, image_bytes: bytes, mime_type: str) -> tuple[bytes, str]:
+        """Downscale/re-encode for the model (in a worker thread) if enabled."""
+        if not settings.AI_IMAGE_MAX_EDGE:
+            return image_bytes, mime_type
+        return await asyncio.to_thread(
+            prepare_image,
+            image_bytes,
+            mime_type,
+            max_edge=settings.AI_IMAGE_MAX_EDGE,
+            fmt=settings.AI_IMAGE_FORMAT,
+            quality=settings.AI_IMAGE_QUALITY,
+        )
+
+    async def aclose(self) -> None:
+        """Release the provider's pooled connections, if it has any."""
+        if self._provider is not None and hasattr(self._provider, "aclose"):
+            await self._provider.aclose()
+
+
+# One service (and so one provider and connection pool) per process
+_ai_service: AIService | None = None
+
+
+def get_ai_service() -> AIService:
+    """Process-wide AIService; created by the app lifespan or on first use."""
+    global _ai_service
+    if _ai_service is None:
+        _ai_service = AIService(cache=build_description_cache())
+    return _ai_service
+
+
+Gauge(
+    "ai_queue_waiting",
+    "Requests waiting for an inference slot",
+    read=lambda: _ai_service.admission.waiting if _ai_service else 0,
+)
+Gauge(
+    "ai_in_flight",
+    "Requests holding an inference slot",
+    read=lambda: _ai_service.admission.active if _ai_service else 0,
+)
+
+
+async def warm_ai_model() -> None:
+    """Probe the provider so the model is loaded; failures are only logged."""
+    try:
+        elapsed = await get_ai_service().warm_up()
+    except (AIProviderError, ValueError) as e:
+        logger.warning(f"AI warm-up failed: {e}")
+        return
+    if elapsed is not None:
+        logger.info(f"AI model {settings.AI_MODEL} warm ({elapsed:.2f}s)")
+
+
+async def keep_ai_model_warm() -> None:
+    """Periodic warm-up, only within AI_WARM_HOURS."""
+    if within_window(settings.AI_WARM_HOURS, datetime.now()):
+        await warm_ai_model()
+
+
+async def close_ai_service() -> None:
+    global _ai_service
+    if _ai_service is not None:
+        await _ai_service.aclose()
+        _ai_service = None
+
 
 # Image validation
 SUPPORTED_IMAGE_TYPES = {
@@ -211,6 +1062,41 @@ SUPPORTED_IMAGE_TYPES = {
     "image/gif",
 }
 MAX_IMAGE_SIZE = 10 * 1024 * 1024  # 10 MB
+MAX_BATCH_IMAGES = 50  # per batch upload request
+
+
+# Leading bytes of each supported format (WebP is checked separately)
+IMAGE_SIGNATURES = (
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+)
+
+
+def sniff_image_type(data: bytes) -> str | None:
+    """Detect the image format from magic bytes, None if it isn't supported."""
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    for signature, mime_type in IMAGE_SIGNATURES:
+        if data.startswith(signature):
+            return mime_type
+    return None
+
+
+def detect_image_type(data: bytes, declared: str | None) -> str:
+    """
+    The upload's real type, from its content.
+
+    The client's content type is only echoed in the error; a file claiming
+    to be image/jpeg still has to start like one.
+    """
+    mime_type = sniff_image_type(data)
+    if mime_type is None:
+        raise ValueError(
+            f"Unsupported image type: {declared}. Use: {', '.join(SUPPORTED_IMAGE_TYPES)}"
+        )
+    return mime_type
 
 
 def validate_image(content_type: str | None, size: int) -> None:
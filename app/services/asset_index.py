@@ -0,0 +1,157 @@
+import bisect
+import logging
+
+from sqlalchemy import select
+
+from app.core.database import AsyncSessionLocal
+from app.models.asset import Asset
+
+logger = logging.getLogger(__name__)
+
+# Asset columns served by the typeahead
+INDEXED_FIELDS = ("serial_number", "model")
+
+
+class PrefixIndex:
+    """
+    Sorted array of distinct values, searched with bisect.
+
+    Values are matched case-insensitively. Each value keeps a count of the
+    assets carrying it, so duplicates (e.g. a common model name) only take
+    one slot in the array.
+    """
+
+    def __init__(self):
+        self._keys: list[tuple[str, str]] = []  # (folded value, value), sorted
+        self._counts: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def build(self, values) -> None:
+        """Replace the contents with the given values in one sort."""
+        self._counts = {}
+        for value in values:
+            self._counts[value] = self._counts.get(value, 0) + 1
+        self._keys = sorted((value.casefold(), value) for value in self._counts)
+
+    def add(self, value: str) -> None:
+        count = self._counts.get(value, 0)
+        if count == 0:
+            bisect.insort(self._keys, (value.casefold(), value))
+        self._counts[value] = count + 1
+
+    def remove(self, value: str) -> None:
+        count = self._counts.get(value, 0)
+        if count == 0:
+            return
+        if count > 1:
+            self._counts[value] = count - 1
+            return
+
+        del self._counts[value]
+        key = (value.casefold(), value)
+        i = bisect.bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            del self._keys[i]
+
+    def search(self, prefix: str, limit: int = 10) -> list[tuple[str, int]]:
+        """Return up to `limit` (value, asset count) pairs starting with prefix."""
+        folded = prefix.casefold()
+        results = []
+        i = bisect.bisect_left(self._keys, (folded, ""))
+        while i < len(self._keys) and len(results) < limit:
+            key, value = self._keys[i]
+            if not key.startswith(folded):
+                break
+            results.append((value, self._counts[value]))
+            i += 1
+        return results
+
+
+class AssetIndex:
+    """
+    Per-worker prefix index over asset serial numbers and models.
+
+    Built once at startup and kept current by AssetService writes, so
+    typeahead lookups never hit the database.
+    """
+
+    def __init__(self):
+        self._fields = {field: PrefixIndex() for field in INDEXED_FIELDS}
+        # asset_id -> indexed values, needed to unindex on update/delete
+        self._assets: dict[str, tuple[str | None, ...]] = {}
+
+    def __len__(self) -> int:
+        return len(self._assets)
+
+    def clear(self) -> None:
+        self.build([])
+
+    def build(self, rows) -> None:
+        """Rebuild from (asset_id, serial_number, model) rows."""
+        self._assets = {row[0]: tuple(row[1:]) for row in rows}
+        for i, field in enumerate(INDEXED_FIELDS):
+            self._fields[field].build(
+                values[i] for values in self._assets.values() if values[i]
+            )
+
+    async def load(self, session) -> None:
+        """Rebuild from the assets table."""
+        result = await session.execute(
+            select(Asset.id, *(getattr(Asset, f) for f in INDEXED_FIELDS))
+        )
+        self.build(result.all())
+        logger.info(f"Asset index built with {len(self)} assets")
+
+    def upsert(self, asset: Asset) -> None:
+        values = tuple(getattr(asset, field) for field in INDEXED_FIELDS)
+        previous = self._assets.get(asset.id)
+        if previous == values:
+            return
+        if previous is not None:
+            self._unindex(previous)
+        self._assets[asset.id] = values
+        for field, value in zip(INDEXED_FIELDS, values):
+            if value:
+                self._fields[field].add(value)
+
+    def discard(self, asset_id: str) -> None:
+        previous = self._assets.pop(asset_id, None)
+        if previous is not None:
+            self._unindex(previous)
+
+    def _unindex(self, values: tuple[str | None, ...]) -> None:
+        for field, value in zip(INDEXED_FIELDS, values):
+            if value:
+                self._fields[field].remove(value)
+
+    def suggest(
+        self, prefix: str, field: str | None = None, limit: int = 10
+    ) -> list[dict]:
+        """Suggest indexed values starting with prefix, across one or all fields."""
+        fields = (field,) if field else INDEXED_FIELDS
+        suggestions = []
+        for name in fields:
+            remaining = limit - len(suggestions)
+            if remaining <= 0:
+                break
+            suggestions.extend(
+                {"field": name, "value": value, "matches": matches}
+                for value, matches in self._fields[name].search(prefix, remaining)
+            )
+        return suggestions
+
+
+asset_index = AssetIndex()
+
+
+async def build_asset_index():
+    """Load the asset index at startup"""
+    try:
+        async with AsyncSessionLocal() as session:
+            await asset_index.load(session)
+        return True
+    except Exception as e:
+        logger.error(f"Asset index build failed: {e}")
+        return False
@@ -2,20 +2,79 @@ from sqlalchemy import select
 from sqlalchemy.exc import SQLAlchemyError
 from datetime import date
 from app.models.asset import Asset
+from app.models.asset_change import CHANGE_DELETE, CHANGE_INSERT, CHANGE_UPDATE
 from app.models.user import User
 from app.core.security import hash_password
+from app.services.asset_index import asset_index
+from app.services.change_log_service import ChangeLogService
+from app.services.stats_service import StatsService, asset_snapshot
 import uuid
 
 
+def _columns(fields: tuple[str, ...]):
+    return [getattr(Asset, field) for field in fields]
+
+
 class AssetService:
-    async def list_assets(self, session):
-        """List all assets"""
+    def __init__(self):
+        self.stats = StatsService()
+        self.changes = ChangeLogService()
+
+    async def list_assets(self, session, fields: tuple[str, ...] | None = None):
+        """
+        List all assets.
+
+        With `fields`, only those columns are selected and rows come back as
+        plain dicts, skipping ORM object construction entirely.
+        """
+        if fields:
+            result = await session.execute(select(*_columns(fields)))
+            return [dict(row) for row in result.mappings()]
         return (await session.scalars(select(Asset))).all()
 
+    async def get_asset_fields(self, session, asset_id: str, fields: tuple[str, ...]):
+        """Selected columns of one asset plus its version, as a dict"""
+        result = await session.execute(
+            select(Asset.version, *_columns(fields)).where(Asset.id == asset_id)
+        )
+        row = result.mappings().first()
+        return dict(row) if row else None
+
     async def get_asset(self, session, asset_id: str):
         """Get a single asset by ID"""
         return await session.scalar(select(Asset).where(Asset.id == asset_id))
 
+    async def get_asset_by_serial(self, session, serial_number: str):
+        """Get an asset by exact serial number (uses ix_assets_serial_number)"""
+        return await session.scalar(
+            select(Asset)
+            .where(Asset.serial_number == serial_number)
+            .order_by(Asset.id)
+            .limit(1)
+        )
+
+    async def get_asset_version(self, session, asset_id: str) -> int | None:
+        """Just the version column, for conditional requests"""
+        return await session.scalar(select(Asset.version).where(Asset.id == asset_id))
+
+    async def collection_version(self, session) -> str:
+        """Version of the whole collection, from the change log"""
+        return await self.changes.version(session)
+
+    def suggest(self, prefix: str, field: str | None = None, limit: int = 10):
+        """Typeahead suggestions from the in-memory index"""
+        return asset_index.suggest(prefix, field=field, limit=limit)
+
+    async def get_stats(self, session):
+        """Inventory summary from the incrementally maintained stats table"""
+        return await self.stats.get_stats(session)
+
+    async def get_changes(self, session, since: int | None, limit: int = 500):
+        """Delta sync: changes after cursor `since`, or just the head cursor"""
+        if since is None:
+            return [], await self.changes.sync_cursor(session), False
+        return await self.changes.changes_since(session, since, limit)
+
     async def resolve_owner(
         self, session, owner_id: int | None, owner_email: str | None, current_user
     ):
@@ -79,6 +138,7 @@ class AssetService:
             )
 
             asset = Asset(
+                id=str(uuid.uuid4()),  # needed up front for the change log
                 name=name,
                 type=type,
                 description=description,
@@ -90,8 +150,10 @@ class AssetService:
                 owner_id=resolved_owner_id,
             )
             session.add(asset)
+            await self.stats.record(session, None, asset_snapshot(asset))
+            self.changes.record(session, asset.id, CHANGE_INSERT)
             await session.commit()
-            await session.refresh(asset)
+            asset_index.upsert(asset)
             return asset
         except SQLAlchemyError:
             await session.rollback()
@@ -112,6 +174,7 @@ class AssetService:
     ):
         """Update an asset"""
         try:
+            before = asset_snapshot(asset)
             if name is not None:
                 asset.name = name
             if type is not None:
@@ -128,18 +191,54 @@ class AssetService:
                 asset.check_in_date = check_in_date
             if check_out_date is not None:
                 asset.check_out_date = check_out_date
+            await self.stats.record(session, before, asset_snapshot(asset))
+            if session.is_modified(asset):
+                asset.version = Asset.version + 1
+                self.changes.record(session, asset.id, CHANGE_UPDATE)
             await session.commit()
             await session.refresh(asset)
+            asset_index.upsert(asset)
             return asset
         except SQLAlchemyError:
             await session.rollback()
             raise
 
+    async def bulk_update_descriptions(
+        self, session, descriptions: dict[str, str]
+    ) -> list[str]:
+        """
+        Set the description of many assets in a single transaction.
+
+        Returns the ids that were found and written; missing assets are
+        skipped.
+        """
+        if not descriptions:
+            return []
+        try:
+            assets = (
+                await session.scalars(
+                    select(Asset).where(Asset.id.in_(list(descriptions)))
+                )
+            ).all()
+            for asset in assets:
+                asset.description = descriptions[asset.id]
+                if session.is_modified(asset):
+                    asset.version = Asset.version + 1
+                    self.changes.record(session, asset.id, CHANGE_UPDATE)
+            await session.commit()
+            return [asset.id for asset in assets]
+        except SQLAlchemyError:
+            await session.rollback()
+            raise
+
     async def delete_asset(self, session, asset: Asset):
         """Delete an asset"""
         try:
+            await self.stats.record(session, asset_snapshot(asset), None)
+            self.changes.record(session, asset.id, CHANGE_DELETE)
             await session.delete(asset)
             await session.commit()
+            asset_index.discard(asset.id)
             return True
         except SQLAlchemyError:
             await session.rollback()
@@ -1,4 +1,5 @@
 from sqlalchemy import select
+from app.core.cache import invalidate_cache, user_cache_key
 from app.models.user import User
 from app.core.security import hash_password, verify_password, create_token
 
@@ -35,6 +36,7 @@ class AuthService:
             user.last_ip = ip_address
             session.add(user)
             await session.commit()
+            await invalidate_cache(user_cache_key(user.id))
 
         token = create_token(str(user.id))
         return token, user
@@ -0,0 +1,160 @@
+import logging
+import sys
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, func, select
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.asset import Asset
+from app.models.asset_change import AssetChange, CHANGE_DELETE
+
+logger = logging.getLogger(__name__)
+
+
+class ChangeLogExpiredError(Exception):
+    """Raised when a cursor points at changes already pruned from the log."""
+
+    pass
+
+
+class ChangeLogService:
+    def record(self, session, asset_id: str, op: str):
+        """
+        Append a change to the caller's transaction.
+
+        Nothing is sent until the caller commits, so the entry goes out in the
+        same flush (and round trip batch) as the asset write it describes.
+        """
+        session.add(AssetChange(asset_id=asset_id, op=op))
+
+    async def head(self, session) -> int:
+        """Latest sequence number, 0 for an empty log."""
+        return await session.scalar(select(func.max(AssetChange.seq))) or 0
+
+    def _first_unsettled(self, since: int = 0):
+        """
+        Lowest seq written within the last CHANGE_LOG_SETTLE_SECONDS.
+
+        seq is taken at insert, not at commit, so a lower seq can still become
+        visible after a higher one. Cursors never move past a recent entry:
+        every change is delivered as long as its transaction commits within
+        the settle window of being logged.
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(
+            seconds=settings.CHANGE_LOG_SETTLE_SECONDS
+        )
+        return (
+            select(func.min(AssetChange.seq))
+            .where(AssetChange.seq > since, AssetChange.changed_at > cutoff)
+            .scalar_subquery()
+        )
+
+    def _sync_cursor(self):
+        return func.coalesce(
+            self._first_unsettled() - 1,
+            select(func.max(AssetChange.seq)).scalar_subquery(),
+            0,
+        )
+
+    async def sync_cursor(self, session) -> int:
+        """Cursor to start a delta sync from: the head, held back past unsettled entries."""
+        return await session.scalar(select(self._sync_cursor())) or 0
+
+    async def version(self, session) -> str:
+        """
+        Version of the whole log, for the collection ETag: head and sync cursor.
+
+        The head alone doesn't move when a lower seq commits after a higher
+        one; the sync cursor does, since it's held back behind the newly
+        visible entry (within the settle window, as for delta sync).
+        """
+        head, cursor = (
+            await session.execute(
+                select(func.coalesce(func.max(AssetChange.seq), 0), self._sync_cursor())
+            )
+        ).one()
+        return f"{head}.{cursor}"
+
+    async def changes_since(self, session, since: int, limit: int = 500):
+        """
+        Changes after cursor `since`, collapsed to the latest entry per asset.
+
+        Inserts and updates carry the asset's current state; deletes (and assets
+        deleted after the entry was written) come back as tombstones with no
+        asset. Entries younger than the settle window are held back until a
+        later call. Returns (changes, next_cursor, has_more).
+        """
+        oldest = await session.scalar(select(func.min(AssetChange.seq)))
+        if oldest is not None and since < oldest - 1:
+            raise ChangeLogExpiredError(
+                f"Cursor {since} is older than the retained change log"
+            )
+
+        rows = (
+            await session.scalars(
+                select(AssetChange)
+                .where(
+                    AssetChange.seq > since,
+                    AssetChange.seq
+                    < func.coalesce(self._first_unsettled(since), sys.maxsize),
+                )
+                .order_by(AssetChange.seq)
+                .limit(limit + 1)
+            )
+        ).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        latest = {row.asset_id: row for row in rows}
+        live_ids = [aid for aid, row in latest.items() if row.op != CHANGE_DELETE]
+        assets = {}
+        if live_ids:
+            assets = {
+                a.id: a
+                for a in (
+                    await session.scalars(select(Asset).where(Asset.id.in_(live_ids)))
+                ).all()
+            }
+
+        changes = []
+        for row in sorted(latest.values(), key=lambda r: r.seq):
+            asset = assets.get(row.asset_id)
+            changes.append(
+                {
+                    "seq": row.seq,
+                    "op": row.op if asset is not None else CHANGE_DELETE,
+                    "asset_id": row.asset_id,
+                    "asset": asset,
+                }
+            )
+
+        next_cursor = rows[-1].seq if rows else since
+        return changes, next_cursor, has_more
+
+    async def prune(self, session, retention: timedelta) -> int:
+        """
+        Drop entries older than the retention window.
+
+        The newest entry is always kept so the log's lower bound (and therefore
+        expired-cursor detection) survives quiet periods.
+        """
+        cutoff = datetime.now(timezone.utc) - retention
+        newest = select(func.max(AssetChange.seq)).scalar_subquery()
+        result = await session.execute(
+            delete(AssetChange).where(
+                AssetChange.changed_at < cutoff, AssetChange.seq < newest
+            )
+        )
+        await session.commit()
+        if result.rowcount:
+            logger.info(f"Pruned {result.rowcount} asset change log entries")
+        return result.rowcount
+
+
+async def prune_change_log():
+    """Periodic job: apply CHANGE_LOG_RETENTION_HOURS."""
+    async with AsyncSessionLocal() as session:
+        await ChangeLogService().prune(
+            session, timedelta(hours=settings.CHANGE_LOG_RETENTION_HOURS)
+        )
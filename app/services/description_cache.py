@@ -0,0 +1,187 @@
+import asyncio
+import hashlib
+import logging
+from dataclasses import dataclass
+from io import BytesIO
+from pathlib import Path
+
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+PHASH_BITS = 64
+MAX_PHASH_THRESHOLD = 10
+
+
+def dhash(image_bytes: bytes) -> int | None:
+    """
+    64-bit difference hash: grayscale 9x8 thumbnail, one bit per horizontal
+    gradient sign. Re-encodes, resizes and small edits barely move it.
+    Returns None when the bytes don't decode as an image.
+    """
+    try:
+        with Image.open(BytesIO(image_bytes)) as img:
+            img.draft("L", (64, 64))  # cheap JPEG downscale while decoding
+            pixels = img.convert("L").resize((9, 8), Image.Resampling.LANCZOS)
+            data = pixels.tobytes()
+    except Exception:
+        return None
+
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            left, right = data[row * 9 + col], data[row * 9 + col + 1]
+            bits = (bits << 1) | (left > right)
+    return bits
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def phash_bands(value: int, bands: int) -> list[int]:
+    """Split a hash into `bands` near-equal bit ranges."""
+    out, start = [], 0
+    for i in range(bands):
+        width = PHASH_BITS // bands + (i < PHASH_BITS % bands)
+        out.append((value >> start) & ((1 << width) - 1))
+        start += width
+    return out
+
+
+@dataclass
+class ImageKey:
+    digest: str
+    phash: int | None = None
+
+
+class DescriptionCache:
+    """
+    Content-addressed cache of generated descriptions.
+
+    Keys are the image's SHA-256 within a namespace of provider, model and
+    prompt version, so changing any of those naturally misses. Lookups go
+    Redis, then the optional disk tier, then (if enabled) perceptual-hash
+    near duplicates.
+
+    Near-duplicate search splits the 64-bit dHash into threshold + 1 bands:
+    two hashes within the threshold must agree exactly on at least one band,
+    so one SUNION over the band sets yields every candidate.
+    """
+
+    def __init__(
+        self,
+        redis,
+        namespace: str,
+        ttl: int,
+        disk_dir: str | None = None,
+        phash_threshold: int | None = None,
+    ):
+        if phash_threshold is not None and not (
+            0 <= phash_threshold <= MAX_PHASH_THRESHOLD
+        ):
+            raise ValueError(
+                f"Perceptual hash threshold must be 0-{MAX_PHASH_THRESHOLD} bits"
+            )
+        self.redis = redis
+        self.namespace = namespace
+        self.ttl = ttl
+        self.phash_threshold = phash_threshold
+        ns_digest = hashlib.sha256(namespace.encode()).hexdigest()[:16]
+        self._prefix = f"ai:desc:{ns_digest}"
+        self._disk_dir = Path(disk_dir) / ns_digest if disk_dir else None
+
+    async def lookup(self, image_bytes: bytes) -> tuple[str | None, ImageKey]:
+        """Return (cached description or None, key to store the result under)."""
+        key = ImageKey(digest=hashlib.sha256(image_bytes).hexdigest())
+
+        description = await self._redis_get(f"{self._prefix}:sha:{key.digest}")
+        if description is None and self._disk_dir is not None:
+            description = await asyncio.to_thread(self._disk_read, key.digest)
+            if description is not None:
+                await self._redis_set(f"{self._prefix}:sha:{key.digest}", description)
+        if description is not None:
+            logger.info("Description cache hit (exact)")
+            return description, key
+
+        if self.phash_threshold is not None:
+            key.phash = await asyncio.to_thread(dhash, image_bytes)
+            if key.phash is not None:
+                description = await self._phash_lookup(key.phash)
+                if description is not None:
+                    logger.info("Description cache hit (near duplicate)")
+        return description, key
+
+    async def store(self, key: ImageKey, description: str) -> None:
+        await self._redis_set(f"{self._prefix}:sha:{key.digest}", description)
+        if self._disk_dir is not None:
+            try:
+                await asyncio.to_thread(self._disk_write, key.digest, description)
+            except OSError as e:
+                logger.error(f"Description cache disk write error: {e}")
+        if key.phash is not None:
+            await self._phash_store(key.phash, description)
+
+    async def _phash_lookup(self, phash: int) -> str | None:
+        bands = phash_bands(phash, self.phash_threshold + 1)
+        try:
+            candidates = await self.redis.sunion(
+                [self._band_key(i, band) for i, band in enumerate(bands)]
+            )
+        except Exception as e:
+            logger.error(f"Description cache read error: {e}")
+            return None
+
+        matches = sorted(
+            (hamming(phash, int(c, 16)), c)
+            for c in candidates
+            if hamming(phash, int(c, 16)) <= self.phash_threshold
+        )
+        for _, candidate in matches:
+            description = await self._redis_get(f"{self._prefix}:phash:{candidate}")
+            if description is not None:
+                return description
+        return None
+
+    async def _phash_store(self, phash: int, description: str) -> None:
+        member = f"{phash:016x}"
+        await self._redis_set(f"{self._prefix}:phash:{member}", description)
+        try:
+            for i, band in enumerate(phash_bands(phash, self.phash_threshold + 1)):
+                band_key = self._band_key(i, band)
+                await self.redis.sadd(band_key, member)
+                await self.redis.expire(band_key, self.ttl)
+        except Exception as e:
+            logger.error(f"Description cache write error: {e}")
+
+    def _band_key(self, i: int, band: int) -> str:
+        return f"{self._prefix}:band:{self.phash_threshold}:{i}:{band:x}"
+
+    async def _redis_get(self, key: str) -> str | None:
+        try:
+            return await self.redis.get(key)
+        except Exception as e:
+            logger.error(f"Description cache read error: {e}")
+            return None
+
+    async def _redis_set(self, key: str, value: str) -> None:
+        try:
+            await self.redis.setex(key, self.ttl, value)
+        except Exception as e:
+            logger.error(f"Description cache write error: {e}")
+
+    def _disk_path(self, digest: str) -> Path:
+        return self._disk_dir / digest[:2] / f"{digest}.txt"
+
+    def _disk_read(self, digest: str) -> str | None:
+        try:
+            return self._disk_path(digest).read_text(encoding="utf-8")
+        except OSError:
+            return None
+
+    def _disk_write(self, digest: str, description: str) -> None:
+        path = self._disk_path(digest)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(description, encoding="utf-8")
+        tmp.replace(path)  # atomic, so readers never see a partial file
@@ -0,0 +1,238 @@
+import asyncio
+import logging
+
+from sqlalchemy import update
+
+from app.core.cache import invalidate_asset_cache
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, mark_writes_by
+from app.models.image_job import (
+    ImageJob,
+    JOB_FAILED,
+    JOB_QUEUED,
+    JOB_RUNNING,
+    JOB_SUCCEEDED,
+)
+from app.services.ai_service import (
+    AIOverloadedError,
+    AIProviderError,
+    AIService,
+    get_ai_service,
+)
+from app.services.asset_service import AssetService
+
+logger = logging.getLogger(__name__)
+
+
+class ImageJobQueueFullError(Exception):
+    """Raised when the job queue is at AI_JOB_QUEUE_SIZE."""
+
+    pass
+
+
+class ImageJobService:
+    async def create_job(
+        self, session, asset_id: str, user_id: int | None = None
+    ) -> ImageJob:
+        job = ImageJob(asset_id=asset_id, user_id=user_id, status=JOB_QUEUED)
+        session.add(job)
+        await session.commit()
+        return job
+
+    async def get_job(self, session, job_id: str) -> ImageJob | None:
+        return await session.get(ImageJob, job_id)
+
+    async def fail_unfinished(self, session, reason: str) -> int:
+        """Fail every queued or running job, e.g. ones a restart orphaned."""
+        result = await session.execute(
+            update(ImageJob)
+            .where(ImageJob.status.in_((JOB_QUEUED, JOB_RUNNING)))
+            .values(status=JOB_FAILED, error=reason)
+        )
+        await session.commit()
+        return result.rowcount
+
+
+class ImageJobQueue:
+    """
+    In-process worker pool for image description jobs.
+
+    Image bytes wait in a bounded asyncio.Queue; job state lives in the
+    image_jobs table. Workers only open a session to flip the job's status
+    and to write the result, never while the model is running.
+
+    Queued images are held in memory, so jobs don't survive a restart: the
+    lifespan fails any left unfinished before starting the workers.
+    """
+
+    def __init__(
+        self,
+        ai_service: AIService,
+        session_factory=AsyncSessionLocal,
+        workers: int = 2,
+        maxsize: int = 32,
+    ):
+        self.ai_service = ai_service
+        self.session_factory = session_factory
+        self.workers = workers
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self._tasks: list[asyncio.Task] = []
+        self._watchers: dict[str, asyncio.Event] = {}
+        self.jobs = ImageJobService()
+
+    def start(self) -> None:
+        if not self._tasks:
+            self._tasks = [
+                asyncio.create_task(self._worker(), name=f"image-job-worker-{i}")
+                for i in range(self.workers)
+            ]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def join(self) -> None:
+        """Wait until every queued job has been processed."""
+        await self._queue.join()
+
+    async def submit(
+        self,
+        session,
+        asset_id: str,
+        image_bytes: bytes,
+        mime_type: str,
+        user_id: int | None = None,
+    ) -> ImageJob:
+        """Record a job and queue it; raises ImageJobQueueFullError when full."""
+        if self._queue.full():
+            raise ImageJobQueueFullError("Image description queue is full")
+        job = await self.jobs.create_job(session, asset_id, user_id)
+        try:
+            self._queue.put_nowait((job.id, asset_id, image_bytes, mime_type))
+        except asyncio.QueueFull:
+            # Filled up while the job row was being written
+            job.status, job.error = JOB_FAILED, "Image description queue is full"
+            await session.commit()
+            raise ImageJobQueueFullError(job.error)
+        return job
+
+    def watch(self, job_id: str) -> asyncio.Event:
+        """Event set on this job's next status change (in this process)."""
+        return self._watchers.setdefault(job_id, asyncio.Event())
+
+    def _notify(self, job_id: str) -> None:
+        event = self._watchers.pop(job_id, None)
+        if event is not None:
+            event.set()
+
+    async def _worker(self) -> None:
+        while True:
+            item = await self._queue.get()
+            try:
+                await self._run(*item)
+            except Exception:
+                logger.exception(f"Image job {item[0]} crashed")
+                try:
+                    await self._finish(item[0], error="Internal error")
+                except Exception:
+                    # e.g. the database is down too; the job is left for
+                    # fail_unfinished, but this worker must keep going
+                    logger.exception(f"Could not mark image job {item[0]} failed")
+                    self._notify(item[0])
+            finally:
+                self._queue.task_done()
+
+    async def _run(
+        self, job_id: str, asset_id: str, image_bytes: bytes, mime_type: str
+    ) -> None:
+        async with self.session_factory() as session:
+            job = await session.get(ImageJob, job_id)
+            if job is None or job.status != JOB_QUEUED:
+                return
+            job.status = JOB_RUNNING
+            await session.commit()
+        self._notify(job_id)
+
+        while True:
+            try:
+                description = await self.ai_service.describe_asset_image(
+                    image_bytes, mime_type
+                )
+                break
+            except AIOverloadedError as e:
+                # The job is already queued; wait our turn rather than fail it
+                await asyncio.sleep(e.retry_after)
+            except AIProviderError as e:
+                await self._finish(job_id, error=f"AI service unavailable: {e}")
+                return
+        await self._finish(job_id, asset_id=asset_id, description=description)
+
+    async def _finish(
+        self,
+        job_id: str,
+        asset_id: str | None = None,
+        description: str | None = None,
+        error: str | None = None,
+    ) -> None:
+        updated = False
+        async with self.session_factory() as session:
+            job = await session.get(ImageJob, job_id)
+            if job is None:
+                return
+            if job.user_id is not None:
+                mark_writes_by(session, job.user_id)
+            if error is None:
+                # The asset may have been deleted while the model was running
+                svc = AssetService()
+                asset = await svc.get_asset(session, asset_id)
+                if asset is None:
+                    error = "Asset not found"
+                else:
+                    job.status, job.description = JOB_SUCCEEDED, description
+                    await svc.update_asset(session, asset, description=description)
+                    updated = True
+            if error is not None:
+                job.status, job.error = JOB_FAILED, error
+                await session.commit()
+
+        if updated:
+            await invalidate_asset_cache(asset_id)
+        self._notify(job_id)
+
+
+_image_job_queue: ImageJobQueue | None = None
+
+
+def get_image_job_queue() -> ImageJobQueue:
+    """Process-wide job queue; started by the app lifespan or on first use."""
+    global _image_job_queue
+    if _image_job_queue is None:
+        _image_job_queue = ImageJobQueue(
+            get_ai_service(),
+            workers=settings.AI_JOB_WORKERS,
+            maxsize=settings.AI_JOB_QUEUE_SIZE,
+        )
+        _image_job_queue.start()
+    return _image_job_queue
+
+
+async def close_image_job_queue() -> None:
+    global _image_job_queue
+    if _image_job_queue is not None:
+        await _image_job_queue.stop()
+        _image_job_queue = None
+
+
+async def fail_interrupted_image_jobs():
+    """Startup: jobs queued or running in a previous process are gone."""
+    try:
+        async with AsyncSessionLocal() as session:
+            failed = await ImageJobService().fail_unfinished(
+                session, "Interrupted by a restart, please upload again"
+            )
+        if failed:
+            logger.warning(f"Marked {failed} interrupted image jobs as failed")
+    except Exception as e:
+        logger.error(f"Image job cleanup failed: {e}")
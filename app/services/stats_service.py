@@ -0,0 +1,191 @@
+import logging
+from collections import defaultdict
+
+from sqlalchemy import (
+    String,
+    case,
+    cast,
+    delete,
+    func,
+    literal,
+    literal_column,
+    select,
+    text,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.core.database import AsyncSessionLocal
+from app.models.asset import Asset
+from app.models.asset_stat import AssetStat
+
+logger = logging.getLogger(__name__)
+
+CHECKED_IN = "checked_in"
+CHECKED_OUT = "checked_out"
+
+_UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def asset_snapshot(asset) -> tuple | None:
+    """The asset fields that feed the stats: (type, owner_id, status, count)."""
+    if asset is None:
+        return None
+    status = CHECKED_OUT if asset.check_out_date is not None else CHECKED_IN
+    return (asset.type, asset.owner_id, status, asset.count or 0)
+
+
+def _buckets(snapshot: tuple) -> list[tuple[str, str]]:
+    type_, owner_id, status, _ = snapshot
+    return [
+        ("total", "all"),
+        ("type", type_),
+        ("owner", str(owner_id)),
+        ("status", status),
+    ]
+
+
+def stat_deltas(before: tuple | None, after: tuple | None) -> dict:
+    """(dimension, key) -> (assets delta, units delta) for a change of one asset."""
+    deltas = defaultdict(lambda: [0, 0])
+    for snapshot, sign in ((before, -1), (after, 1)):
+        if snapshot is None:
+            continue
+        for bucket in _buckets(snapshot):
+            deltas[bucket][0] += sign
+            deltas[bucket][1] += sign * snapshot[3]
+    return {k: tuple(v) for k, v in deltas.items() if v != [0, 0]}
+
+
+class StatsService:
+    async def record(self, session, before: tuple | None, after: tuple | None):
+        """
+        Apply the stats change for one asset write inside the caller's transaction.
+
+        Snapshots come from asset_snapshot(); pass None for before on create and
+        for after on delete. All touched buckets go out as a single upsert.
+        """
+        deltas = stat_deltas(before, after)
+        if not deltas:
+            return
+
+        dialect = session.get_bind().dialect.name
+        insert = _UPSERT_INSERTS.get(dialect)
+        if insert is None:
+            raise RuntimeError(f"Asset stats need an upsert for dialect {dialect}")
+
+        stmt = insert(AssetStat).values(
+            [
+                {"dimension": dim, "key": key, "assets": assets, "units": units}
+                for (dim, key), (assets, units) in deltas.items()
+            ]
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[AssetStat.dimension, AssetStat.key],
+            set_={
+                "assets": AssetStat.assets + stmt.excluded.assets,
+                "units": AssetStat.units + stmt.excluded.units,
+            },
+        )
+        await session.execute(stmt)
+
+    async def get_stats(self, session) -> dict:
+        """Read the summary table (one small query, independent of asset count)."""
+        rows = (
+            await session.scalars(select(AssetStat).where(AssetStat.assets > 0))
+        ).all()
+
+        empty = {"assets": 0, "units": 0}
+        stats = {
+            "total": dict(empty),
+            CHECKED_IN: dict(empty),
+            CHECKED_OUT: dict(empty),
+            "by_type": {},
+            "by_owner": {},
+        }
+        for row in rows:
+            bucket = {"assets": row.assets, "units": row.units}
+            if row.dimension == "total":
+                stats["total"] = bucket
+            elif row.dimension == "status":
+                stats[row.key] = bucket
+            elif row.dimension == "type":
+                stats["by_type"][row.key] = bucket
+            elif row.dimension == "owner":
+                stats["by_owner"][int(row.key)] = bucket
+        return stats
+
+    async def compute_stats(self, session) -> dict:
+        """Recompute every bucket from the assets table. O(rows) - reconcile only."""
+        # Inline literals: PostgreSQL only matches the GROUP BY expression to
+        # the selected CASE when neither side carries bind parameters.
+        status = case(
+            (Asset.check_out_date.is_(None), literal_column(f"'{CHECKED_IN}'")),
+            else_=literal_column(f"'{CHECKED_OUT}'"),
+        )
+        groups = [
+            ("total", None),
+            ("type", Asset.type),
+            ("owner", cast(Asset.owner_id, String)),
+            ("status", status),
+        ]
+        truth = {}
+        for dimension, key in groups:
+            stmt = select(
+                key if key is not None else literal("all"),
+                func.count(),
+                func.coalesce(func.sum(Asset.count), 0),
+            )
+            if key is not None:
+                stmt = stmt.group_by(key)
+            for k, assets, units in (await session.execute(stmt)).all():
+                if assets:
+                    truth[(dimension, k)] = (assets, int(units))
+        return truth
+
+    async def reconcile(self, session) -> int:
+        """
+        Rewrite buckets that drifted from the assets table.
+
+        Returns the number of buckets corrected. On PostgreSQL the stats table is
+        locked for the duration so concurrent writers queue behind the rewrite
+        instead of racing it.
+        """
+        if session.get_bind().dialect.name == "postgresql":
+            await session.execute(
+                text("LOCK TABLE asset_stats IN SHARE ROW EXCLUSIVE MODE")
+            )
+
+        truth = await self.compute_stats(session)
+        current = {
+            (row.dimension, row.key): (row.assets, row.units)
+            for row in (await session.scalars(select(AssetStat))).all()
+        }
+
+        fixed = 0
+        for bucket, values in current.items():
+            if bucket not in truth:
+                await session.execute(
+                    delete(AssetStat).where(
+                        AssetStat.dimension == bucket[0], AssetStat.key == bucket[1]
+                    )
+                )
+                fixed += values != (0, 0)
+        for bucket, (assets, units) in truth.items():
+            if current.get(bucket) != (assets, units):
+                await session.merge(
+                    AssetStat(
+                        dimension=bucket[0], key=bucket[1], assets=assets, units=units
+                    )
+                )
+                fixed += 1
+
+        await session.commit()
+        if fixed:
+            logger.warning(f"Asset stats reconciled, {fixed} buckets corrected")
+        return fixed
+
+
+async def reconcile_stats():
+    """Periodic job: reconcile the stats table with its own session."""
+    async with AsyncSessionLocal() as session:
+        await StatsService().reconcile(session)
@@ -0,0 +1,220 @@
+"""
+Load test of the image upload path against the mock vision server.
+
+By default everything runs in one process: the real app (on a throwaway
+SQLite database) with its AI provider wired to benchmarks.mock_vision_server
+through an in-memory transport, so the numbers cover the app's own
+overhead and concurrency limits rather than a network. Reports latency
+percentiles, throughput, and peak Python heap / RSS.
+
+    python -m benchmarks.ai_throughput --requests 200 --concurrency 32 \\
+        --latency lognormal:0.8,0.4 --ai-concurrency 8
+
+With --base-url it drives an already running app instead (start the mock
+server separately and point the app's AI_ENDPOINT at it); memory is then
+only reported for the driver, so watch the app's own.
+"""
+
+import argparse
+import asyncio
+import os
+import resource
+import statistics
+import tempfile
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+from io import BytesIO
+
+import httpx
+
+
+def make_jpeg(edge: int) -> bytes:
+    """A noisy photo-sized JPEG, so preprocessing does realistic work."""
+    from PIL import Image
+
+    img = Image.effect_noise((edge, edge * 3 // 4), 64).convert("RGB")
+    out = BytesIO()
+    img.save(out, format="JPEG", quality=90)
+    return out.getvalue()
+
+
+async def in_process_app(args, workdir: str):
+    """The app on a scratch database, its AI provider talking to the mock."""
+    os.environ.update(
+        DATABASE_URL=f"sqlite+aiosqlite:///{workdir}/bench.db",
+        AI_MAX_CONCURRENCY=str(args.ai_concurrency),
+        AI_PROVIDER=args.provider,
+        AI_CACHE_ENABLED="false",  # every upload should reach the model
+    )
+    for name, value in {
+        "REDIS_URL": "redis://127.0.0.1:6379/15",
+        "JWT_SECRET": "benchmark",
+        "JWT_EXPIRE_MINUTES": "60",
+        "AI_ENDPOINT": "http://mock",
+    }.items():
+        os.environ.setdefault(name, value)
+
+    from app.core.database import engine
+    from app.main import app
+    from app.models.base import Base
+    from app.services.ai_service import (
+        AIService,
+        LMStudioProvider,
+        OllamaProvider,
+        get_ai_service,
+    )
+    from app.services.image_job_service import ImageJobQueue, get_image_job_queue
+    from benchmarks.mock_vision_server import MockVisionServer
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    mock = MockVisionServer(args.latency, args.error_rate, seed=args.seed)
+    mock_client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=mock.app), timeout=None
+    )
+    provider_class = OllamaProvider if args.provider == "ollama" else LMStudioProvider
+    ai_service = AIService(
+        provider=provider_class(endpoint="http://mock", client=mock_client)
+    )
+    app.dependency_overrides[get_ai_service] = lambda: ai_service
+    # Normally created by the lifespan, which ASGITransport doesn't run
+    jobs = ImageJobQueue(ai_service)
+    jobs.start()
+    app.dependency_overrides[get_image_job_queue] = lambda: jobs
+    return httpx.ASGITransport(app=app), mock
+
+
+async def sign_up(client: httpx.AsyncClient) -> dict:
+    response = await client.post(
+        "/api/v1/auth/register",
+        json={"email": f"bench-{uuid.uuid4().hex[:8]}@example.com", "password": "pw"},
+    )
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['data']['access_token']}"}
+
+
+async def create_assets(client, headers, count: int) -> list[str]:
+    ids = []
+    for i in range(count):
+        response = await client.post(
+            "/api/v1/assets",
+            json={
+                "name": f"Bench laptop {i}",
+                "type": "Hardware",
+                "check_in_date": "2024-01-01",
+            },
+            headers=headers,
+        )
+        response.raise_for_status()
+        ids.append(response.json()["data"]["id"])
+    return ids
+
+
+async def upload(client, headers, asset_id, image, mode) -> tuple[int, float, float]:
+    """(status, seconds to first byte, seconds to last byte) for one upload."""
+    path = f"/api/v1/assets/{asset_id}/upload-image"
+    params = {"wait": "true"}
+    if mode == "stream":
+        path, params = path + "/stream", {}
+    started = time.perf_counter()
+    first_byte = None
+    async with client.stream(
+        "POST",
+        path,
+        params=params,
+        files={"image": ("bench.jpg", image, "image/jpeg")},
+        headers=headers,
+    ) as response:
+        async for _ in response.aiter_raw():
+            first_byte = first_byte or time.perf_counter() - started
+    total = time.perf_counter() - started
+    return response.status_code, first_byte or total, total
+
+
+def percentiles(values: list[float]) -> str:
+    if len(values) < 2:
+        return "n/a"
+    cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return (
+        " ".join(f"p{p}={cuts[p - 1] * 1000:.0f}ms" for p in (50, 95, 99))
+        + f" max={max(values) * 1000:.0f}ms"
+    )
+
+
+async def run(args) -> None:
+    image = make_jpeg(args.image_edge)
+    with tempfile.TemporaryDirectory() as workdir:
+        mock = None
+        if args.base_url:
+            transport, base_url = None, args.base_url
+        else:
+            transport, mock = await in_process_app(args, workdir)
+            base_url = "http://bench"
+
+        async with httpx.AsyncClient(
+            transport=transport, base_url=base_url, timeout=None
+        ) as client:
+            headers = await sign_up(client)
+            asset_ids = await create_assets(
+                client, headers, min(args.requests, args.concurrency)
+            )
+
+            statuses: Counter[int] = Counter()
+            first_bytes, totals = [], []
+            remaining = iter(range(args.requests))
+
+            async def worker(asset_id):
+                for _ in remaining:
+                    status, first, total = await upload(
+                        client, headers, asset_id, image, args.mode
+                    )
+                    statuses[status] += 1
+                    first_bytes.append(first)
+                    totals.append(total)
+
+            tracemalloc.start()
+            started = time.perf_counter()
+            await asyncio.gather(*(worker(asset_id) for asset_id in asset_ids))
+            elapsed = time.perf_counter() - started
+            _, peak_heap = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+    ok = statuses.get(200, 0)
+    print(
+        f"{args.requests} uploads ({len(image) // 1024} KB, mode={args.mode}), "
+        f"concurrency {args.concurrency}, model latency {args.latency}"
+    )
+    print(f"  status    {dict(sorted(statuses.items()))}")
+    print(f"  time      {elapsed:.2f}s, {ok / elapsed:.2f} successful uploads/s")
+    print(f"  latency   {percentiles(totals)}")
+    if args.base_url and args.mode == "stream":
+        print(f"  1st byte  {percentiles(first_bytes)}")
+    print(
+        f"  memory    peak heap {peak_heap / 2**20:.1f} MB, "
+        f"max RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB"
+    )
+    if mock is not None:
+        print(f"  model     {mock.stats}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--mode", choices=("wait", "stream"), default="wait")
+    parser.add_argument("--image-edge", type=int, default=1600)
+    parser.add_argument("--base-url", help="drive a running app instead")
+    # In-process only
+    parser.add_argument("--provider", choices=("ollama", "lmstudio"), default="ollama")
+    parser.add_argument("--latency", default="lognormal:0.8,0.4")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--ai-concurrency", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=1)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+Stand-in vision model server for load tests.
+
+Speaks enough of Ollama's /api/generate and the OpenAI-style
+/v1/chat/completions (as LM Studio serves it) for the app's providers,
+streaming included, with a configurable latency distribution, error rate
+and cold-start load time. GET /stats returns request counts.
+
+    python -m benchmarks.mock_vision_server --port 11500 --latency lognormal:0.8,0.4
+
+then point the app at it with AI_ENDPOINT=http://127.0.0.1:11500.
+
+Latency specs: fixed:SECONDS, uniform:MIN,MAX or lognormal:MEDIAN,SIGMA.
+Streamed replies spend a fifth of the latency before the first token.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import math
+import random
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+DESCRIPTION = (
+    "A grey 14-inch laptop with a backlit keyboard and a silver aluminium lid, "
+    "in good condition with light wear on the palm rest."
+)
+
+
+def parse_latency(spec: str):
+    """Sampler for a latency spec, see the module docstring."""
+    kind, _, params = spec.partition(":")
+    values = [float(v) for v in params.split(",")] if params else []
+    if kind == "fixed" and len(values) == 1:
+        return lambda rng: values[0]
+    if kind == "uniform" and len(values) == 2:
+        return lambda rng: rng.uniform(*values)
+    if kind == "lognormal" and len(values) == 2:
+        median, sigma = values
+        return lambda rng: rng.lognormvariate(math.log(median), sigma)
+    raise ValueError(f"Bad latency spec: {spec!r}")
+
+
+class MockVisionServer:
+    def __init__(
+        self,
+        latency: str = "fixed:0.5",
+        error_rate: float = 0.0,
+        load_time: float = 0.0,
+        seed: int | None = None,
+    ):
+        self.sample_latency = parse_latency(latency)
+        self.error_rate = error_rate
+        self.load_time = load_time
+        self.rng = random.Random(seed)
+        self.loaded = load_time == 0
+        self.stats = {"requests": 0, "errors": 0, "in_flight": 0, "peak_in_flight": 0}
+        self.app = Starlette(
+            routes=[
+                Route("/api/generate", self.ollama_generate, methods=["POST"]),
+                Route("/v1/chat/completions", self.chat_completions, methods=["POST"]),
+                Route("/stats", self.get_stats),
+            ]
+        )
+
+    async def ollama_generate(self, request: Request):
+        payload = await request.json()
+        count = len(payload.get("images", []))
+        if "prompt" not in payload:  # warm-up: load the model, generate nothing
+            await self._load()
+            return JSONResponse(
+                {"model": payload["model"], "response": "", "done": True}
+            )
+
+        def chunk(text, done=False):
+            return json.dumps({"response": text, "done": done}) + "\n"
+
+        return await self._reply(
+            count,
+            payload.get("stream", True),  # Ollama streams unless told not to
+            lambda text: {"response": text, "done": True},
+            chunk,
+            "application/x-ndjson",
+            lambda: chunk("", done=True),
+        )
+
+    async def chat_completions(self, request: Request):
+        payload = await request.json()
+        count = sum(
+            1
+            for message in payload.get("messages", [])
+            if isinstance(message["content"], list)
+            for part in message["content"]
+            if part.get("type") == "image_url"
+        )
+
+        def event(text):
+            data = {"choices": [{"index": 0, "delta": {"content": text}}]}
+            return f"data: {json.dumps(data)}\n\n"
+
+        return await self._reply(
+            count,
+            payload.get("stream", False),
+            lambda text: {
+                "choices": [{"index": 0, "message": {"content": text}}],
+            },
+            event,
+            "text/event-stream",
+            lambda: "data: [DONE]\n\n",
+        )
+
+    async def get_stats(self, request: Request):
+        return JSONResponse(self.stats)
+
+    async def _reply(self, count, stream, body, chunk, media_type, end):
+        self.stats["requests"] += 1
+        if self.rng.random() < self.error_rate:
+            self.stats["errors"] += 1
+            return JSONResponse({"error": "simulated failure"}, status_code=500)
+
+        text = self._text(count)
+        latency = self.sample_latency(self.rng)
+        await self._load()
+        if not stream:
+            with self._in_flight():
+                await asyncio.sleep(latency)
+            return JSONResponse(body(text))
+
+        async def pieces():
+            words = text.split(" ")
+            with self._in_flight():
+                await asyncio.sleep(latency / 5)
+                for i, word in enumerate(words):
+                    yield chunk(word if i == 0 else " " + word)
+                    await asyncio.sleep(latency * 4 / 5 / len(words))
+            yield end()
+
+        return StreamingResponse(pieces(), media_type=media_type)
+
+    def _text(self, count: int) -> str:
+        if count <= 1:
+            return DESCRIPTION
+        return json.dumps([f"Image {i + 1}: {DESCRIPTION}" for i in range(count)])
+
+    async def _load(self) -> None:
+        if not self.loaded:
+            await asyncio.sleep(self.load_time)
+            self.loaded = True
+
+    @contextlib.contextmanager
+    def _in_flight(self):
+        self.stats["in_flight"] += 1
+        self.stats["peak_in_flight"] = max(
+            self.stats["peak_in_flight"], self.stats["in_flight"]
+        )
+        try:
+            yield
+        finally:
+            self.stats["in_flight"] -= 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11500)
+    parser.add_argument("--latency", default="lognormal:0.8,0.4")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--load-time", type=float, default=0.0)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    server = MockVisionServer(args.latency, args.error_rate, args.load_time, args.seed)
+    print(f"Mock vision server on {args.host}:{args.port}, latency {args.latency}")
+    uvicorn.run(server.app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
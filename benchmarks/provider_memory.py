@@ -0,0 +1,82 @@
+"""
+Peak memory of sending concurrent image uploads to an inference server.
+
+Compares building the request the old way (base64 str in a payload dict,
+serialized by httpx's json=) with the streamed JSONBody the providers use.
+The transport drains each body without keeping it, like a real socket.
+
+    python -m benchmarks.provider_memory --size-mb 10 --concurrency 8
+"""
+
+import argparse
+import asyncio
+import base64
+import os
+import tracemalloc
+
+import httpx
+
+from app.core.json_body import Base64Bytes, JSONBody
+
+
+class DrainTransport(httpx.AsyncBaseTransport):
+    async def handle_async_request(self, request):
+        async for _ in request.stream:
+            await asyncio.sleep(0)  # let the other uploads interleave
+        return httpx.Response(200, json={"response": "ok"})
+
+
+async def send_inline(client, image):
+    payload = {
+        "model": "llava",
+        "prompt": "Describe this asset.",
+        "images": [base64.standard_b64encode(image).decode("utf-8")],
+    }
+    await client.post("http://inference/api/generate", json=payload)
+
+
+async def send_streamed(client, image):
+    body = JSONBody(
+        {
+            "model": "llava",
+            "prompt": "Describe this asset.",
+            "images": [Base64Bytes(image)],
+        }
+    )
+    await client.post(
+        "http://inference/api/generate", content=body, headers=body.headers()
+    )
+
+
+async def measure(send, images) -> int:
+    async with httpx.AsyncClient(transport=DrainTransport()) as client:
+        tracemalloc.start()
+        await asyncio.gather(*(send(client, image) for image in images))
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size-mb", type=float, default=10)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    images = [
+        os.urandom(int(args.size_mb * 1024 * 1024)) for _ in range(args.concurrency)
+    ]
+    held = sum(len(image) for image in images)
+    print(
+        f"{args.concurrency} x {args.size_mb:g} MB uploads ({held / 2**20:.0f} MB of images)"
+    )
+    for name, send in (("inline json=", send_inline), ("streamed", send_streamed)):
+        peak = asyncio.run(measure(send, images))
+        print(
+            f"  {name:<14} peak {peak / 2**20:8.1f} MB extra"
+            f"  ({peak / held:.2f}x the image bytes)"
+        )
+
+
+if __name__ == "__main__":
+    main()
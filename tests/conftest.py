@@ -1,45 +1,63 @@
+import contextlib
+
 import pytest
+from unittest.mock import patch
 from httpx import AsyncClient, ASGITransport
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlalchemy.pool import StaticPool
 
 from app.main import app
+from app.core.config import settings
 from app.models.base import Base
 
 from app.models import User, Asset  # noqa
-from app.core.database import get_session
+from app.core.database import (
+    ReplicaRouter,
+    get_session,
+    get_session_factory,
+    make_session_factory,
+)
+from app.services.asset_index import asset_index
+from app.core.db_metrics import count_queries
 
 # I use in-memory SQLite for tests
 TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
 
 
-@pytest.fixture(name="session")
-async def session_fixture():
+@pytest.fixture(name="session_factory")
+async def session_factory_fixture():
     engine = create_async_engine(
         TEST_DATABASE_URL,
         connect_args={"check_same_thread": False},
         poolclass=StaticPool,
     )
-    TestingSessionLocal = async_sessionmaker(
-        autocommit=False, autoflush=False, bind=engine, expire_on_commit=False
-    )
+    TestingSessionLocal = make_session_factory(engine)
 
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
 
-    async with TestingSessionLocal() as session:
-        yield session
+    yield TestingSessionLocal
 
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
 
+    # Process-wide state fed by AssetService writes
+    asset_index.clear()
+
+
+@pytest.fixture(name="session")
+async def session_fixture(session_factory):
+    async with session_factory() as session:
+        yield session
+
 
 @pytest.fixture(name="client")
-async def client_fixture(session):
+async def client_fixture(session, session_factory):
     async def get_session_override():
         yield session
 
     app.dependency_overrides[get_session] = get_session_override
+    app.dependency_overrides[get_session_factory] = lambda: session_factory
 
     async with AsyncClient(
         transport=ASGITransport(app=app), base_url="http://test"
@@ -76,3 +94,106 @@ async def auth_token(test_user):
 @pytest.fixture
 async def auth_headers(auth_token):
     return {"Authorization": f"Bearer {auth_token}"}
+
+
+class FakeRedis:
+    """Just enough of redis.asyncio for the cache helpers and description cache."""
+
+    def __init__(self):
+        self.store = {}
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def setex(self, key, expire, value):
+        self.store[key] = value
+
+    async def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.store:
+            return None
+        self.store[key] = value
+        return True
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.store.pop(key, None)
+
+    async def sadd(self, key, *members):
+        self.store.setdefault(key, set()).update(members)
+
+    async def sunion(self, keys):
+        return set().union(*(self.store.get(key, set()) for key in keys))
+
+    async def expire(self, key, seconds):
+        pass
+
+
+class FakePipeline:
+    """Queues FakeRedis calls until execute(), like a redis.asyncio pipeline."""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+    def __getattr__(self, name):
+        method = getattr(self.redis, name)
+        return lambda *args, **kwargs: self.calls.append(method(*args, **kwargs))
+
+    async def execute(self):
+        return [await call for call in self.calls]
+
+
+@pytest.fixture
+def fake_redis():
+    redis = FakeRedis()
+    with patch("app.core.cache.redis_client", redis):
+        yield redis
+
+
+@pytest.fixture
+async def lagging_replica(tmp_path):
+    """A read replica that hasn't caught up with anything yet."""
+    replica = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/replica.db")
+    async with replica.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    router = ReplicaRouter([replica])
+    with (
+        patch("app.core.database.replica_router", router),
+        patch("app.api.deps.replica_router", router),
+    ):
+        yield replica
+    await replica.dispose()
+
+
+@pytest.fixture
+def internal_headers(monkeypatch):
+    """Enables /internal for the test and authenticates to it."""
+    monkeypatch.setattr(settings, "INTERNAL_API_TOKEN", "internal-token")
+    return {"Authorization": "Bearer internal-token"}
+
+
+@pytest.fixture
+def assert_max_queries():
+    """
+    `with assert_max_queries(n): ...` fails if the block runs more than n
+    SQL statements, listing them, e.g. to lock in a route's query budget.
+    """
+
+    @contextlib.contextmanager
+    def check(limit: int):
+        with count_queries() as counter:
+            yield counter
+        assert (
+            counter.count <= limit
+        ), f"{counter.count} queries, budget {limit}:\n" + "\n".join(counter.statements)
+
+    return check
@@ -1,7 +1,43 @@
+import asyncio
+import json
 import pytest
-from unittest.mock import patch, AsyncMock
+from unittest.mock import AsyncMock
 from io import BytesIO
 
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from app.main import app
+from app.core.database import get_session
+from app.core.config import settings
+from app.models.base import Base
+from app.services.ai_service import (
+    AIOverloadedError,
+    AIProviderError,
+    AIService,
+    get_ai_service,
+)
+from app.services.image_job_service import ImageJobQueue, get_image_job_queue
+
+
+@pytest.fixture
+def mock_ai(client):
+    """AIService stand-in injected through the get_ai_service dependency."""
+    mock = AsyncMock()
+    app.dependency_overrides[get_ai_service] = lambda: mock
+    yield mock
+    app.dependency_overrides.pop(get_ai_service, None)
+
+
+@pytest.fixture(autouse=True)
+async def jobs(mock_ai, session_factory):
+    """Job queue on the test database, running jobs through mock_ai."""
+    queue = ImageJobQueue(mock_ai, session_factory=session_factory, workers=1)
+    queue.start()
+    app.dependency_overrides[get_image_job_queue] = lambda: queue
+    yield queue
+    await queue.stop()
+    app.dependency_overrides.pop(get_image_job_queue, None)
+
 
 @pytest.fixture
 def sample_jpeg():
@@ -32,20 +68,20 @@ async def test_asset(client, auth_headers):
 
 
 @pytest.mark.asyncio
-async def test_upload_image_success(client, auth_headers, test_asset, sample_jpeg):
+async def test_upload_image_success(
+    client, auth_headers, test_asset, sample_jpeg, mock_ai
+):
     """Should successfully upload an image and update asset description."""
     mock_description = "A silver MacBook Pro laptop. The device appears to be in good condition with stickers on the lid."
 
-    with patch("app.services.ai_service.AIService") as mock_ai_class:
-        mock_ai = AsyncMock()
-        mock_ai.describe_asset_image.return_value = mock_description
-        mock_ai_class.return_value = mock_ai
+    mock_ai.describe_asset_image.return_value = mock_description
 
-        response = await client.post(
-            f"/api/v1/assets/{test_asset['id']}/upload-image",
-            files={"image": ("laptop.jpg", BytesIO(sample_jpeg), "image/jpeg")},
-            headers=auth_headers,
-        )
+    response = await client.post(
+        f"/api/v1/assets/{test_asset['id']}/upload-image",
+        params={"wait": "true"},
+        files={"image": ("laptop.jpg", BytesIO(sample_jpeg), "image/jpeg")},
+        headers=auth_headers,
+    )
 
     assert response.status_code == 200
     data = response.json()
@@ -55,18 +91,16 @@ async def test_upload_image_success(client, auth_headers, test_asset, sample_jpe
 
 
 @pytest.mark.asyncio
-async def test_upload_image_png(client, auth_headers, test_asset, sample_png):
+async def test_upload_image_png(client, auth_headers, test_asset, sample_png, mock_ai):
     """Should accept PNG images."""
-    with patch("app.services.ai_service.AIService") as mock_ai_class:
-        mock_ai = AsyncMock()
-        mock_ai.describe_asset_image.return_value = "A test device."
-        mock_ai_class.return_value = mock_ai
+    mock_ai.describe_asset_image.return_value = "A test device."
 
-        response = await client.post(
-            f"/api/v1/assets/{test_asset['id']}/upload-image",
-            files={"image": ("device.png", BytesIO(sample_png), "image/png")},
-            headers=auth_headers,
-        )
+    response = await client.post(
+        f"/api/v1/assets/{test_asset['id']}/upload-image",
+        params={"wait": "true"},
+        files={"image": ("device.png", BytesIO(sample_png), "image/png")},
+        headers=auth_headers,
+    )
 
     assert response.status_code == 200
 
@@ -100,6 +134,65 @@ async def test_upload_image_invalid_file_type(client, auth_headers, test_asset):
     assert "Unsupported image type" in response.json()["detail"]
 
 
+@pytest.mark.asyncio
+async def test_upload_image_checks_content_not_declared_type(
+    client, auth_headers, test_asset, mock_ai
+):
+    """A PDF labelled image/jpeg is still rejected."""
+    response = await client.post(
+        f"/api/v1/assets/{test_asset['id']}/upload-image?wait=true",
+        files={"image": ("laptop.jpg", BytesIO(b"%PDF-1.4 fake"), "image/jpeg")},
+        headers=auth_headers,
+    )
+
+    assert response.status_code == 400
+    assert "Unsupported image type" in response.json()["detail"]
+    mock_ai.describe_asset_image.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_upload_image_uses_sniffed_type(
+    client, auth_headers, test_asset, sample_png, mock_ai
+):
+    mock_ai.describe_asset_image.return_value = "A device"
+
+    response = await client.post(
+        f"/api/v1/assets/{test_asset['id']}/upload-image?wait=true",
+        files={"image": ("device.jpg", BytesIO(sample_png), "image/jpeg")},
+        headers=auth_headers,
+    )
+
+    assert response.status_code == 200
+    mock_ai.describe_asset_image.assert_called_once_with(sample_png, "image/png")
+
+
+@pytest.mark.asyncio
+async def test_upload_image_too_large(
+    client, auth_headers, test_asset, sample_jpeg, mock_ai, monkeypatch
+):
+    monkeypatch.setattr("app.api.routes.assets.MAX_IMAGE_SIZE", 1024)
+
+    response = await client.post(
+        f"/api/v1/assets/{test_asset['id']}/upload-image?wait=true",
+        files={"image": ("laptop.jpg", BytesIO(sample_jpeg * 100), "image/jpeg")},
+        headers=auth_headers,
+    )
+
+    assert response.status_code == 413
+    mock_ai.describe_asset_image.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_upload_image_missing_part(client, auth_headers, test_asset):
+    response = await client.post(
+        f"/api/v1/assets/{test_asset['id']}/upload-image",
+        files={"photo": ("laptop.jpg", BytesIO(b"\xff\xd8\xff"), "image/jpeg")},
+        headers=auth_headers,
+    )
+
+    assert response.status_code == 400
+
+
 @pytest.mark.asyncio
 async def test_upload_image_unauthorized(client, test_asset, sample_jpeg):
     """Should return 401 without authentication."""
@@ -114,41 +207,86 @@ async def test_upload_image_unauthorized(client, test_asset, sample_jpeg):
 
 @pytest.mark.asyncio
 async def test_upload_image_ai_service_failure(
-    client, auth_headers, test_asset, sample_jpeg
+    client, auth_headers, test_asset, sample_jpeg, mock_ai
 ):
     """Should return 503 when AI service fails."""
     from app.services.ai_service import AIProviderError
 
-    with patch("app.services.ai_service.AIService") as mock_ai_class:
-        mock_ai = AsyncMock()
-        mock_ai.describe_asset_image.side_effect = AIProviderError("Connection refused")
-        mock_ai_class.return_value = mock_ai
+    mock_ai.describe_asset_image.side_effect = AIProviderError("Connection refused")
 
-        response = await client.post(
-            f"/api/v1/assets/{test_asset['id']}/upload-image",
-            files={"image": ("laptop.jpg", BytesIO(sample_jpeg), "image/jpeg")},
-            headers=auth_headers,
-        )
+    response = await client.post(
+        f"/api/v1/assets/{test_asset['id']}/upload-image",
+        params={"wait": "true"},
+        files={"image": ("laptop.jpg", BytesIO(sample_jpeg), "image/jpeg")},
+        headers=auth_headers,
+    )
 
     assert response.status_code == 503
     assert "AI service unavailable" in response.json()["detail"]
 
 
+@pytest.mark.asyncio
+async def test_upload_image_ai_overloaded(
+    client, auth_headers, test_asset, sample_jpeg, mock_ai
+):
+    """Admission control rejections come back as 503 with Retry-After."""
+    mock_ai.describe_asset_image.side_effect = AIOverloadedError("queue is full", 12)
+
+    response = await client.post(
+        f"/api/v1/assets/{test_asset['id']}/upload-image",
+        params={"wait": "true"},
+        files={"image": ("laptop.jpg", BytesIO(sample_jpeg), "image/jpeg")},
+        headers=auth_headers,
+    )
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "12"
+    assert "busy" in response.json()["detail"]
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint(client, internal_headers):
+    response = await client.get("/internal/metrics", headers=internal_headers)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "# TYPE ai_queue_wait_seconds histogram" in response.text
+    assert "ai_queue_waiting " in response.text
+    assert "# TYPE db_pool_checkout_wait_seconds histogram" in response.text
+    assert 'db_pool_checked_out{engine="primary"} 0' in response.text
+
+
+@pytest.mark.asyncio
+async def test_slow_queries_endpoint(client, internal_headers):
+    response = await client.get("/internal/slow-queries", headers=internal_headers)
+
+    assert response.status_code == 200
+    assert response.json() == []
+
+
+@pytest.mark.asyncio
+async def test_internal_routes_need_token(client, monkeypatch):
+    assert (await client.get("/internal/metrics")).status_code == 404  # disabled
+
+    monkeypatch.setattr(settings, "INTERNAL_API_TOKEN", "internal-token")
+    for headers in ({}, {"Authorization": "Bearer wrong"}):
+        response = await client.get("/internal/slow-queries", headers=headers)
+        assert response.status_code == 401
+
+
 @pytest.mark.asyncio
 async def test_upload_image_preserves_other_asset_fields(
-    client, auth_headers, test_asset, sample_jpeg
+    client, auth_headers, test_asset, sample_jpeg, mock_ai
 ):
     """Should only update description, preserving other fields."""
-    with patch("app.services.ai_service.AIService") as mock_ai_class:
-        mock_ai = AsyncMock()
-        mock_ai.describe_asset_image.return_value = "New AI description"
-        mock_ai_class.return_value = mock_ai
+    mock_ai.describe_asset_image.return_value = "New AI description"
 
-        response = await client.post(
-            f"/api/v1/assets/{test_asset['id']}/upload-image",
-            files={"image": ("laptop.jpg", BytesIO(sample_jpeg), "image/jpeg")},
-            headers=auth_headers,
-        )
+    response = await client.post(
+        f"/api/v1/assets/{test_asset['id']}/upload-image",
+        params={"wait": "true"},
+        files={"image": ("laptop.jpg", BytesIO(sample_jpeg), "image/jpeg")},
+        headers=auth_headers,
+    )
 
     assert response.status_code == 200
     data = response.json()["data"]
@@ -161,3 +299,540 @@ async def test_upload_image_preserves_other_asset_fields(
 
     # Description should be updated
     assert data["description"] == "New AI description"
+
+
+async def upload(client, headers, asset_id, image):
+    return await client.post(
+        f"/api/v1/assets/{asset_id}/upload-image",
+        files={"image": ("laptop.jpg", BytesIO(image), "image/jpeg")},
+        headers=headers,
+    )
+
+
+@pytest.mark.asyncio
+async def test_upload_image_queues_job(
+    client, auth_headers, test_asset, sample_jpeg, mock_ai, jobs
+):
+    """Should return 202 with a job, and the worker should fill in the description."""
+    mock_ai.describe_asset_image.return_value = "A queued laptop."
+
+    response = await upload(client, auth_headers, test_asset["id"], sample_jpeg)
+
+    assert response.status_code == 202
+    job = response.json()["data"]
+    assert job["status"] == "queued"
+    assert job["asset_id"] == test_asset["id"]
+    assert response.headers["location"] == f"/api/v1/jobs/{job['id']}"
+
+    await jobs.join()
+
+    response = await client.get(f"/api/v1/jobs/{job['id']}", headers=auth_headers)
+    assert response.json()["data"]["status"] == "succeeded"
+    assert response.json()["data"]["description"] == "A queued laptop."
+
+    response = await client.get(
+        f"/api/v1/assets/{test_asset['id']}", headers=auth_headers
+    )
+    assert response.json()["data"]["description"] == "A queued laptop."
+
+
+@pytest.mark.asyncio
+async def test_job_records_ai_failure(
+    client, auth_headers, test_asset, sample_jpeg, mock_ai, jobs
+):
+    """A provider error should fail the job, not the upload."""
+    from app.services.ai_service import AIProviderError
+
+    mock_ai.describe_asset_image.side_effect = AIProviderError("Connection refused")
+
+    response = await upload(client, auth_headers, test_asset["id"], sample_jpeg)
+    assert response.status_code == 202
+    await jobs.join()
+
+    response = await client.get(
+        f"/api/v1/jobs/{response.json()['data']['id']}", headers=auth_headers
+    )
+    data = response.json()["data"]
+    assert data["status"] == "failed"
+    assert "AI service unavailable" in data["error"]
+
+
+@pytest.mark.asyncio
+async def test_job_fails_when_asset_deleted_during_inference(
+    client, auth_headers, test_asset, sample_jpeg, mock_ai, jobs
+):
+    """The asset is re-checked when the description is written back."""
+    release = asyncio.Event()
+
+    async def slow_describe(image_bytes, mime_type):
+        await release.wait()
+        return "Too late."
+
+    mock_ai.describe_asset_image.side_effect = slow_describe
+
+    response = await upload(client, auth_headers, test_asset["id"], sample_jpeg)
+    job_id = response.json()["data"]["id"]
+    await client.delete(f"/api/v1/assets/{test_asset['id']}", headers=auth_headers)
+    release.set()
+    await jobs.join()
+
+    response = await client.get(f"/api/v1/jobs/{job_id}", headers=auth_headers)
+    assert response.json()["data"]["status"] == "failed"
+    assert response.json()["data"]["error"] == "Asset not found"
+
+
+@pytest.mark.asyncio
+async def test_upload_image_queue_full(
+    client, auth_headers, test_asset, sample_jpeg, mock_ai, session_factory
+):
+    """Should return 503 with Retry-After when no more jobs can be queued."""
+    queue = ImageJobQueue(mock_ai, session_factory=session_factory, maxsize=1)
+    app.dependency_overrides[get_image_job_queue] = lambda: queue  # not started
+
+    first = await upload(client, auth_headers, test_asset["id"], sample_jpeg)
+    second = await upload(client, auth_headers, test_asset["id"], sample_jpeg)
+
+    assert first.status_code == 202
+    assert second.status_code == 503
+    assert "retry-after" in second.headers
+
+
+@pytest.mark.asyncio
+async def test_job_events_stream(
+    client, auth_headers, test_asset, sample_jpeg, mock_ai, jobs
+):
+    """The SSE stream should report each status change and end when done."""
+    started, release = asyncio.Event(), asyncio.Event()
+
+    async def slow_describe(image_bytes, mime_type):
+        started.set()
+        await release.wait()
+        return "Streamed laptop."
+
+    mock_ai.describe_asset_image.side_effect = slow_describe
+
+    response = await upload(client, auth_headers, test_asset["id"], sample_jpeg)
+    job_id = response.json()["data"]["id"]
+    await started.wait()
+
+    events = asyncio.create_task(
+        client.get(f"/api/v1/jobs/{job_id}/events", headers=auth_headers)
+    )
+    await asyncio.sleep(0.05)
+    release.set()
+    response = await events
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    body = response.text
+    assert body.count("event: status") >= 2
+    assert body.index('"running"') < body.index('"succeeded"')
+    assert "Streamed laptop." in body
+
+
+def sse_events(body: str) -> list[tuple[str, dict]]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+async def stream_upload(client, headers, asset_id, image):
+    return await client.post(
+        f"/api/v1/assets/{asset_id}/upload-image/stream",
+        files={"image": ("laptop.jpg", BytesIO(image), "image/jpeg")},
+        headers=headers,
+    )
+
+
+@pytest.mark.asyncio
+async def test_stream_upload_relays_tokens_and_saves(
+    client, auth_headers, test_asset, sample_jpeg, mock_ai
+):
+    async def stream(image_bytes, mime_type):
+        for piece in ["A grey", " laptop."]:
+            yield piece
+
+    mock_ai.stream_asset_description = stream
+
+    response = await stream_upload(client, auth_headers, test_asset["id"], sample_jpeg)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = sse_events(response.text)
+    assert events[:2] == [
+        ("token", {"text": "A grey"}),
+        ("token", {"text": " laptop."}),
+    ]
+    assert events[2][0] == "done"
+    assert events[2][1]["description"] == "A grey laptop."
+
+    response = await client.get(
+        f"/api/v1/assets/{test_asset['id']}", headers=auth_headers
+    )
+    assert response.json()["data"]["description"] == "A grey laptop."
+
+
+@pytest.mark.asyncio
+async def test_stream_upload_reports_ai_failure(
+    client, auth_headers, test_asset, sample_jpeg, mock_ai
+):
+    async def stream(image_bytes, mime_type):
+        yield "A grey"
+        raise AIProviderError("Connection lost")
+
+    mock_ai.stream_asset_description = stream
+
+    response = await stream_upload(client, auth_headers, test_asset["id"], sample_jpeg)
+
+    events = sse_events(response.text)
+    assert [name for name, _ in events] == ["token", "error"]
+    assert "Connection lost" in events[1][1]["detail"]
+
+    response = await client.get(
+        f"/api/v1/assets/{test_asset['id']}", headers=auth_headers
+    )
+    assert response.json()["data"]["description"] != "A grey"
+
+
+@pytest.mark.asyncio
+async def test_stream_upload_validates_before_streaming(
+    client, auth_headers, test_asset, sample_jpeg
+):
+    response = await stream_upload(client, auth_headers, "missing", sample_jpeg)
+    assert response.status_code == 404
+
+    response = await stream_upload(
+        client, auth_headers, test_asset["id"], b"%PDF-1.4 fake"
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_get_job_not_found(client, auth_headers):
+    response = await client.get("/api/v1/jobs/missing", headers=auth_headers)
+    assert response.status_code == 404
+
+
+@pytest.fixture
+async def one_connection_pool(client, tmp_path):
+    """
+    A file database behind a single-connection pool, with a fresh session
+    per request as in production. Anything holding the connection across
+    an await starves every other request.
+    """
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path}/pool.db",
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=2,
+    )
+    factory = async_sessionmaker(engine, expire_on_commit=False, autoflush=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async def get_session_override():
+        async with factory() as session:
+            yield session
+
+    app.dependency_overrides[get_session] = get_session_override
+    yield engine
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_upload_releases_connection_during_inference(
+    client, one_connection_pool, sample_jpeg, mock_ai
+):
+    """Inline uploads must not hold a pooled connection while the model runs."""
+    register = await client.post(
+        "/api/v1/auth/register",
+        json={"email": "pool@example.com", "password": "password"},
+    )
+    token = register.json()["data"]["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    asset = (
+        await client.post(
+            "/api/v1/assets",
+            json={"name": "Pool", "type": "Hardware", "check_in_date": "2024-01-01"},
+            headers=headers,
+        )
+    ).json()["data"]
+
+    checked_out, lookups = [], []
+
+    async def describe(image_bytes, mime_type):
+        checked_out.append(one_connection_pool.pool.checkedout())
+        # The only connection must be free for other requests meanwhile
+        response = await client.get(f"/api/v1/assets/{asset['id']}", headers=headers)
+        lookups.append(response.status_code)
+        return "Described without holding a connection."
+
+    mock_ai.describe_asset_image.side_effect = describe
+
+    response = await client.post(
+        f"/api/v1/assets/{asset['id']}/upload-image",
+        params={"wait": "true"},
+        files={"image": ("laptop.jpg", BytesIO(sample_jpeg), "image/jpeg")},
+        headers=headers,
+    )
+
+    assert response.status_code == 200
+    assert response.json()["data"]["description"].startswith("Described")
+    assert checked_out == [0]
+    assert lookups == [200]
+
+
+@pytest.mark.asyncio
+async def test_upload_inline_asset_deleted_during_inference(
+    client, auth_headers, test_asset, sample_jpeg, mock_ai
+):
+    """The asset is re-validated before the description is written."""
+
+    async def describe(image_bytes, mime_type):
+        await client.delete(f"/api/v1/assets/{test_asset['id']}", headers=auth_headers)
+        return "Too late."
+
+    mock_ai.describe_asset_image.side_effect = describe
+
+    response = await client.post(
+        f"/api/v1/assets/{test_asset['id']}/upload-image",
+        params={"wait": "true"},
+        files={"image": ("laptop.jpg", BytesIO(sample_jpeg), "image/jpeg")},
+        headers=auth_headers,
+    )
+
+    assert response.status_code == 404
+
+
+async def create_assets(client, headers, n):
+    ids = []
+    for i in range(n):
+        response = await client.post(
+            "/api/v1/assets",
+            json={
+                "name": f"Asset {i}",
+                "type": "Hardware",
+                "check_in_date": "2024-01-01",
+            },
+            headers=headers,
+        )
+        ids.append(response.json()["data"]["id"])
+    return ids
+
+
+@pytest.mark.asyncio
+async def test_batch_upload_per_item_results(
+    client, auth_headers, sample_jpeg, mock_ai
+):
+    """Each part is reported on; good ones are written, bad ones don't stop the batch."""
+    first, second = await create_assets(client, auth_headers, 2)
+    mock_ai.describe_asset_image.side_effect = (
+        lambda data, mime: f"Seen {len(data)} bytes"
+    )
+
+    response = await client.post(
+        "/api/v1/assets/upload-images",
+        files=[
+            (first, ("one.jpg", BytesIO(sample_jpeg), "image/jpeg")),
+            ("no-such-asset", ("ghost.jpg", BytesIO(sample_jpeg), "image/jpeg")),
+            (second, ("doc.pdf", BytesIO(b"%PDF-1.4"), "application/pdf")),
+            (first, ("again.jpg", BytesIO(sample_jpeg), "image/jpeg")),
+        ],
+        headers=auth_headers,
+    )
+
+    assert response.status_code == 200
+    results = response.json()["data"]
+    assert [(r["asset_id"], r["status"]) for r in results] == [
+        (first, "updated"),
+        ("no-such-asset", "failed"),
+        (second, "failed"),
+        (first, "failed"),
+    ]
+    assert results[0]["description"] == f"Seen {len(sample_jpeg)} bytes"
+    assert results[1]["error"] == "Asset not found"
+    assert "Unsupported image type" in results[2]["error"]
+    assert "more than once" in results[3]["error"]
+    assert mock_ai.describe_asset_image.call_count == 1
+
+    response = await client.get(f"/api/v1/assets/{first}", headers=auth_headers)
+    assert response.json()["data"]["description"] == results[0]["description"]
+
+
+@pytest.mark.asyncio
+async def test_batch_upload_reports_ai_failures(
+    client, auth_headers, sample_jpeg, mock_ai
+):
+    from app.services.ai_service import AIProviderError
+
+    ok, broken = await create_assets(client, auth_headers, 2)
+
+    async def describe(data, mime):
+        if data.endswith(b"!"):
+            raise AIProviderError("Connection refused")
+        return "Fine."
+
+    mock_ai.describe_asset_image.side_effect = describe
+
+    response = await client.post(
+        "/api/v1/assets/upload-images",
+        files=[
+            (ok, ("ok.jpg", BytesIO(sample_jpeg), "image/jpeg")),
+            (broken, ("bad.jpg", BytesIO(sample_jpeg + b"!"), "image/jpeg")),
+        ],
+        headers=auth_headers,
+    )
+
+    results = response.json()["data"]
+    assert results[0]["status"] == "updated"
+    assert results[1]["status"] == "failed"
+    assert "AI service unavailable" in results[1]["error"]
+
+
+@pytest.mark.asyncio
+async def test_batch_upload_bounds_concurrent_inference(
+    client, auth_headers, sample_jpeg, monkeypatch
+):
+    """Inference fans out, but never past AI_MAX_CONCURRENCY at once."""
+    monkeypatch.setattr(settings, "AI_MAX_CONCURRENCY", 2)
+    in_flight, peak = 0, 0
+
+    class SlowProvider:
+        async def describe_image(self, image_bytes, mime_type):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.02)
+            in_flight -= 1
+            return "Slow but sure."
+
+    app.dependency_overrides[get_ai_service] = lambda: AIService(SlowProvider())
+    ids = await create_assets(client, auth_headers, 5)
+
+    response = await client.post(
+        "/api/v1/assets/upload-images",
+        files=[
+            (asset_id, (f"{asset_id}.jpg", BytesIO(sample_jpeg), "image/jpeg"))
+            for asset_id in ids
+        ],
+        headers=auth_headers,
+    )
+
+    assert [r["status"] for r in response.json()["data"]] == ["updated"] * 5
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_batch_larger_than_admission_queue(
+    client, auth_headers, sample_jpeg, monkeypatch
+):
+    """A batch can't overflow the shared wait queue with its own parts."""
+    monkeypatch.setattr(settings, "AI_MAX_CONCURRENCY", 2)
+    monkeypatch.setattr(settings, "AI_QUEUE_SIZE", 1)
+
+    class SlowProvider:
+        async def describe_image(self, image_bytes, mime_type):
+            await asyncio.sleep(0.01)
+            return "Slow but sure."
+
+    app.dependency_overrides[get_ai_service] = lambda: AIService(SlowProvider())
+    ids = await create_assets(client, auth_headers, 6)
+
+    response = await client.post(
+        "/api/v1/assets/upload-images",
+        files=[
+            (asset_id, (f"{asset_id}.jpg", BytesIO(sample_jpeg), "image/jpeg"))
+            for asset_id in ids
+        ],
+        headers=auth_headers,
+    )
+
+    assert [r["status"] for r in response.json()["data"]] == ["updated"] * 6
+
+
+@pytest.mark.asyncio
+async def test_batch_upload_reports_overload(
+    client, auth_headers, sample_jpeg, mock_ai
+):
+    (asset_id,) = await create_assets(client, auth_headers, 1)
+    mock_ai.describe_asset_image.side_effect = AIOverloadedError("queue is full", 7)
+
+    response = await client.post(
+        "/api/v1/assets/upload-images",
+        files=[(asset_id, ("a.jpg", BytesIO(sample_jpeg), "image/jpeg"))],
+        headers=auth_headers,
+    )
+
+    (result,) = response.json()["data"]
+    assert result["status"] == "overloaded"
+    assert result["retry_after"] == 7
+    assert "busy" in result["error"]
+
+
+@pytest.mark.asyncio
+async def test_batch_upload_requires_multipart(client, auth_headers):
+    response = await client.post(
+        "/api/v1/assets/upload-images", json={"not": "multipart"}, headers=auth_headers
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_stream_upload_marks_writer(
+    client,
+    auth_headers,
+    test_user,
+    fake_redis,
+    lagging_replica,
+    test_asset,
+    mock_ai,
+    sample_jpeg,
+):
+    async def stream(image_bytes, mime_type):
+        yield "A grey laptop."
+
+    mock_ai.stream_asset_description = stream
+    del fake_redis.store[f"db:wrote:{test_user.id}"]  # from creating the asset
+
+    await stream_upload(client, auth_headers, test_asset["id"], sample_jpeg)
+
+    assert f"db:wrote:{test_user.id}" in fake_redis.store
+    response = await client.get(
+        f"/api/v1/assets/{test_asset['id']}", headers=auth_headers
+    )
+    assert response.json()["data"]["description"] == "A grey laptop."
+
+
+@pytest.mark.asyncio
+async def test_job_marks_submitter(
+    client,
+    auth_headers,
+    test_user,
+    fake_redis,
+    lagging_replica,
+    test_asset,
+    mock_ai,
+    jobs,
+    sample_jpeg,
+):
+    release = asyncio.Event()
+
+    async def describe(image_bytes, mime_type):
+        await release.wait()
+        return "A queued laptop."
+
+    mock_ai.describe_asset_image.side_effect = describe
+    await upload(client, auth_headers, test_asset["id"], sample_jpeg)
+    # Only the job's own write is left to mark the user
+    del fake_redis.store[f"db:wrote:{test_user.id}"]
+
+    release.set()
+    await jobs.join()
+
+    assert f"db:wrote:{test_user.id}" in fake_redis.store
+    response = await client.get(
+        f"/api/v1/assets/{test_asset['id']}", headers=auth_headers
+    )
+    assert response.json()["data"]["description"] == "A queued laptop."
@@ -1,4 +1,7 @@
 import pytest
+from app.core.cache import asset_version_key, mirror_version
+from app.core.config import settings
+from app.schemas.asset import AssetOut
 
 
 @pytest.mark.asyncio
@@ -52,3 +55,337 @@ async def test_get_assets_api(client, auth_headers):
 async def test_unauthorized_access(client):
     response = await client.get("/api/v1/assets")
     assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_suggest_assets_api(client, auth_headers):
+    for serial in ("SCAN-001", "SCAN-002", "OTHER-1"):
+        payload = {
+            "name": "Scanner",
+            "type": "Hardware",
+            "check_in_date": "2023-04-01",
+            "model": "Zebra DS2208",
+            "serial_number": serial,
+        }
+        await client.post("/api/v1/assets", json=payload, headers=auth_headers)
+
+    response = await client.get(
+        "/api/v1/assets/suggest", params={"prefix": "scan"}, headers=auth_headers
+    )
+    assert response.status_code == 200
+    values = [s["value"] for s in response.json()["data"]]
+    assert values == ["SCAN-001", "SCAN-002"]
+
+    response = await client.get(
+        "/api/v1/assets/suggest",
+        params={"prefix": "zeb", "field": "model"},
+        headers=auth_headers,
+    )
+    assert response.json()["data"] == [
+        {"field": "model", "value": "Zebra DS2208", "matches": 3}
+    ]
+
+
+@pytest.mark.asyncio
+async def test_suggest_follows_deletes(client, auth_headers):
+    payload = {
+        "name": "Phone",
+        "type": "Hardware",
+        "check_in_date": "2023-04-01",
+        "serial_number": "GONE-1",
+    }
+    created = await client.post("/api/v1/assets", json=payload, headers=auth_headers)
+    await client.delete(
+        f"/api/v1/assets/{created.json()['data']['id']}", headers=auth_headers
+    )
+
+    response = await client.get(
+        "/api/v1/assets/suggest", params={"prefix": "gone"}, headers=auth_headers
+    )
+    assert response.json()["data"] == []
+
+
+@pytest.mark.asyncio
+async def test_get_asset_by_serial_api(client, auth_headers):
+    payload = {
+        "name": "Monitor",
+        "type": "Hardware",
+        "check_in_date": "2023-04-01",
+        "serial_number": "DELL-999",
+    }
+    await client.post("/api/v1/assets", json=payload, headers=auth_headers)
+
+    response = await client.get(
+        "/api/v1/assets/by-serial/DELL-999", headers=auth_headers
+    )
+    assert response.status_code == 200
+    assert response.json()["data"]["serial_number"] == "DELL-999"
+
+    response = await client.get("/api/v1/assets/by-serial/DELL", headers=auth_headers)
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_asset_stats_api(client, auth_headers, test_user):
+    for name, count in (("Laptop", 2), ("Dock", 3)):
+        payload = {
+            "name": name,
+            "type": "Hardware",
+            "check_in_date": "2023-04-01",
+            "count": count,
+        }
+        await client.post("/api/v1/assets", json=payload, headers=auth_headers)
+
+    response = await client.get("/api/v1/assets/stats", headers=auth_headers)
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert data["total"] == {"assets": 2, "units": 5}
+    assert data["by_type"] == {"Hardware": {"assets": 2, "units": 5}}
+    assert data["by_owner"] == {str(test_user.id): {"assets": 2, "units": 5}}
+    assert data["checked_out"] == {"assets": 0, "units": 0}
+
+
+@pytest.mark.asyncio
+async def test_asset_changes_api(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(settings, "CHANGE_LOG_SETTLE_SECONDS", 0)
+    response = await client.get("/api/v1/assets/changes", headers=auth_headers)
+    assert response.status_code == 200
+    cursor = response.json()["data"]["next_cursor"]
+
+    payload = {"name": "Tablet", "type": "Hardware", "check_in_date": "2023-03-01"}
+    created = await client.post("/api/v1/assets", json=payload, headers=auth_headers)
+    asset_id = created.json()["data"]["id"]
+    await client.delete(f"/api/v1/assets/{asset_id}", headers=auth_headers)
+
+    response = await client.get(
+        "/api/v1/assets/changes", params={"since": cursor}, headers=auth_headers
+    )
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert data["changes"] == [
+        {"seq": cursor + 2, "op": "delete", "asset_id": asset_id, "asset": None}
+    ]
+    assert data["next_cursor"] == cursor + 2
+    assert data["has_more"] is False
+
+
+@pytest.mark.asyncio
+async def test_get_asset_conditional(client, auth_headers):
+    payload = {"name": "Dock", "type": "Hardware", "check_in_date": "2023-03-01"}
+    created = await client.post("/api/v1/assets", json=payload, headers=auth_headers)
+    asset_id = created.json()["data"]["id"]
+
+    response = await client.get(f"/api/v1/assets/{asset_id}", headers=auth_headers)
+    etag = response.headers["etag"]
+    assert etag == f'"{asset_id}-1"'
+
+    response = await client.get(
+        f"/api/v1/assets/{asset_id}",
+        headers={**auth_headers, "If-None-Match": etag},
+    )
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+    await client.put(
+        f"/api/v1/assets/{asset_id}", json={"name": "Dock 2"}, headers=auth_headers
+    )
+    response = await client.get(
+        f"/api/v1/assets/{asset_id}",
+        headers={**auth_headers, "If-None-Match": etag},
+    )
+    assert response.status_code == 200
+    assert response.headers["etag"] == f'"{asset_id}-2"'
+
+
+@pytest.mark.asyncio
+async def test_late_reader_cannot_mirror_stale_version(
+    client, auth_headers, fake_redis
+):
+    payload = {"name": "Dock", "type": "Hardware", "check_in_date": "2023-03-01"}
+    created = await client.post("/api/v1/assets", json=payload, headers=auth_headers)
+    asset_id = created.json()["data"]["id"]
+    await client.put(
+        f"/api/v1/assets/{asset_id}", json={"name": "Dock 2"}, headers=auth_headers
+    )
+
+    # A read that loaded version 1 before the update committed finishes now
+    await mirror_version(asset_version_key(asset_id), 1)
+
+    response = await client.get(
+        f"/api/v1/assets/{asset_id}",
+        headers={**auth_headers, "If-None-Match": f'"{asset_id}-1"'},
+    )
+    assert response.status_code == 200
+    assert response.headers["etag"] == f'"{asset_id}-2"'
+
+
+@pytest.mark.asyncio
+async def test_list_assets_conditional(client, auth_headers):
+    response = await client.get("/api/v1/assets", headers=auth_headers)
+    etag = response.headers["etag"]
+
+    response = await client.get(
+        "/api/v1/assets", headers={**auth_headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 304
+
+    payload = {"name": "Dock", "type": "Hardware", "check_in_date": "2023-03-01"}
+    await client.post("/api/v1/assets", json=payload, headers=auth_headers)
+
+    response = await client.get(
+        "/api/v1/assets", headers={**auth_headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+@pytest.mark.asyncio
+async def test_list_etag_changes_when_lower_seq_commits_late(
+    client, auth_headers, session
+):
+    from sqlalchemy import delete
+
+    from app.models.asset_change import AssetChange
+
+    payload = {"name": "Dock", "type": "Hardware", "check_in_date": "2023-03-01"}
+    for _ in range(2):
+        await client.post("/api/v1/assets", json=payload, headers=auth_headers)
+    # As if seq 1's transaction were still open while seq 2 is visible
+    late = await session.get(AssetChange, 1)
+    await session.execute(delete(AssetChange).where(AssetChange.seq == 1))
+    await session.commit()
+    etag = (await client.get("/api/v1/assets", headers=auth_headers)).headers["etag"]
+
+    session.add(AssetChange(seq=1, asset_id=late.asset_id, op=late.op))
+    await session.commit()
+
+    response = await client.get(
+        "/api/v1/assets", headers={**auth_headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+@pytest.mark.asyncio
+async def test_sparse_fieldsets(client, auth_headers):
+    payload = {
+        "name": "Laptop",
+        "type": "Hardware",
+        "check_in_date": "2023-03-01",
+        "description": "A long AI generated description.",
+    }
+    created = await client.post("/api/v1/assets", json=payload, headers=auth_headers)
+    asset_id = created.json()["data"]["id"]
+
+    response = await client.get(
+        "/api/v1/assets", params={"fields": "name,type"}, headers=auth_headers
+    )
+    assert response.status_code == 200
+    assert response.json()["data"] == [
+        {"id": asset_id, "name": "Laptop", "type": "Hardware"}
+    ]
+    full_etag = (await client.get("/api/v1/assets", headers=auth_headers)).headers[
+        "etag"
+    ]
+    assert response.headers["etag"] != full_etag
+
+    response = await client.get(
+        f"/api/v1/assets/{asset_id}",
+        params={"fields": "description"},
+        headers=auth_headers,
+    )
+    assert response.json()["data"] == {
+        "id": asset_id,
+        "description": "A long AI generated description.",
+    }
+    assert response.headers["etag"] == f'"{asset_id}-1-id+description"'
+
+    response = await client.get(
+        "/api/v1/assets", params={"fields": "name,secret"}, headers=auth_headers
+    )
+    assert response.status_code == 400
+    assert "secret" in response.json()["detail"]
+
+
+@pytest.mark.asyncio
+async def test_list_cache_varies_by_projection(client, auth_headers, fake_redis):
+    payload = {"name": "Laptop", "type": "Hardware", "check_in_date": "2023-03-01"}
+    await client.post("/api/v1/assets", json=payload, headers=auth_headers)
+
+    for _ in range(2):  # miss, then hit
+        full = await client.get("/api/v1/assets", headers=auth_headers)
+        trimmed = await client.get(
+            "/api/v1/assets", params={"fields": "name"}, headers=auth_headers
+        )
+        assert full.status_code == trimmed.status_code == 200
+        assert set(full.json()["data"][0]) == set(AssetOut.model_fields)
+        assert set(trimmed.json()["data"][0]) == {"id", "name"}
+
+    list_keys = [k for k in fake_redis.store if k.startswith("assets:list:")]
+    assert len(list_keys) == 2
+
+
+@pytest.mark.asyncio
+async def test_cache_hit_checks_out_no_connection(
+    client, session_factory, auth_headers, fake_redis
+):
+    from sqlalchemy import event
+
+    from app.core.database import get_session
+    from app.main import app
+
+    async def fresh_session():  # one session per request, as in production
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_session] = fresh_session
+    payload = {"name": "Laptop", "type": "Hardware", "check_in_date": "2023-03-01"}
+    await client.post("/api/v1/assets", json=payload, headers=auth_headers)
+    del fake_redis.store["assets:version"]  # the write's stale marker expires
+    await client.get("/api/v1/assets", headers=auth_headers)  # fills the caches
+
+    checkouts = []
+    engine = session_factory.kw["bind"].sync_engine
+    event.listen(engine, "checkout", lambda *args: checkouts.append(args))
+    response = await client.get("/api/v1/assets", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.json()["data"][0]["name"] == "Laptop"
+    assert checkouts == []
+
+
+@pytest.mark.asyncio
+async def test_login_refreshes_cached_user(client, test_user, auth_headers, fake_redis):
+    await client.get("/api/v1/assets", headers=auth_headers)
+    assert f"auth:user:{test_user.id}" in fake_redis.store
+
+    await client.post(
+        "/api/v1/auth/login",
+        json={"email": "test@example.com", "password": "password"},
+    )
+
+    assert f"auth:user:{test_user.id}" not in fake_redis.store
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("auth_cached", [False, True])
+async def test_reads_go_to_replica_except_after_a_write(
+    client, auth_headers, test_user, fake_redis, lagging_replica, auth_cached
+):
+    if auth_cached:
+        await client.get("/api/v1/assets", headers=auth_headers)
+        assert f"auth:user:{test_user.id}" in fake_redis.store
+    payload = {"name": "Laptop", "type": "Hardware", "check_in_date": "2023-03-01"}
+    created = await client.post("/api/v1/assets", json=payload, headers=auth_headers)
+    asset_id = created.json()["data"]["id"]
+    assert f"db:wrote:{test_user.id}" in fake_redis.store
+
+    # The writer reads its own write from the primary...
+    response = await client.get(f"/api/v1/assets/{asset_id}", headers=auth_headers)
+    assert response.status_code == 200
+
+    # ...and the lagging replica once the window is over
+    del fake_redis.store[f"db:wrote:{test_user.id}"]
+    response = await client.get(f"/api/v1/assets/{asset_id}", headers=auth_headers)
+    assert response.status_code == 404
@@ -0,0 +1,295 @@
+"""
+Statement budgets for every route, so an added query (or an N+1) fails a
+test instead of slipping into production. Requests get their own session,
+as in production, and authenticated routes are measured both with the user
+in the Redis auth cache and without it (one more statement).
+"""
+
+from io import BytesIO
+from unittest.mock import AsyncMock
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.core.config import settings
+from app.core.database import get_session
+from app.core.db_metrics import QueryCountMiddleware
+from app.main import app
+from app.services.ai_service import get_ai_service
+from app.services.image_job_service import ImageJobQueue, get_image_job_queue
+
+JPEG = b"\xff\xd8\xff\xe0\x00\x10JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00"
+ASSET = {
+    "name": "Laptop",
+    "type": "Hardware",
+    "check_in_date": "2024-01-01",
+    "serial_number": "SN-1",
+}
+
+
+@pytest.fixture(autouse=True)
+def session_per_request(client, session_factory, fake_redis):
+    async def fresh_session():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_session] = fresh_session
+
+
+@pytest.fixture(params=[True, False], ids=["auth-cached", "auth-uncached"])
+async def auth(request, client, auth_headers, monkeypatch):
+    """Statements authentication adds: none on a Redis hit, else the user lookup."""
+    if not request.param:
+        monkeypatch.setattr(settings, "AUTH_USER_CACHE_TTL", 0)
+        return 1
+    # Logging in dropped the cached user; any authenticated request caches it
+    await client.get(
+        "/api/v1/assets/suggest", params={"prefix": "x"}, headers=auth_headers
+    )
+    return 0
+
+
+@pytest.fixture
+def mock_ai(client):
+    mock = AsyncMock()
+    mock.describe_asset_image.return_value = "A laptop."
+    app.dependency_overrides[get_ai_service] = lambda: mock
+    yield mock
+    app.dependency_overrides.pop(get_ai_service, None)
+
+
+@pytest.fixture
+async def jobs(mock_ai, session_factory):
+    queue = ImageJobQueue(mock_ai, session_factory=session_factory, workers=1)
+    queue.start()
+    app.dependency_overrides[get_image_job_queue] = lambda: queue
+    yield queue
+    await queue.stop()
+    app.dependency_overrides.pop(get_image_job_queue, None)
+
+
+@pytest.fixture
+async def asset(client, auth_headers):
+    response = await client.post("/api/v1/assets", json=ASSET, headers=auth_headers)
+    return response.json()["data"]
+
+
+def image(name="laptop.jpg"):
+    return (name, BytesIO(JPEG), "image/jpeg")
+
+
+@pytest.mark.asyncio
+async def test_health(client, assert_max_queries):
+    with assert_max_queries(0):
+        response = await client.get("/api/v1/health")
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_internal_endpoints(client, internal_headers, assert_max_queries):
+    with assert_max_queries(0):
+        for path in ("/internal/metrics", "/internal/slow-queries"):
+            response = await client.get(path, headers=internal_headers)
+            assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_register(client, assert_max_queries):
+    with assert_max_queries(3):
+        response = await client.post(
+            "/api/v1/auth/register",
+            json={"email": "new@example.com", "password": "password"},
+        )
+    assert response.status_code == 201
+
+
+@pytest.mark.asyncio
+async def test_login(client, test_user, assert_max_queries):
+    with assert_max_queries(2):
+        response = await client.post(
+            "/api/v1/auth/login",
+            json={"email": "test@example.com", "password": "password"},
+        )
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("params", [{}, {"fields": "name"}])
+async def test_list_assets(
+    auth, client, auth_headers, asset, assert_max_queries, params
+):
+    await client.post(
+        "/api/v1/assets", json={**ASSET, "serial_number": "SN-2"}, headers=auth_headers
+    )
+    with assert_max_queries(2 + auth):
+        response = await client.get(
+            "/api/v1/assets", params=params, headers=auth_headers
+        )
+    assert len(response.json()["data"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_suggest(auth, client, auth_headers, asset, assert_max_queries):
+    with assert_max_queries(auth):
+        response = await client.get(
+            "/api/v1/assets/suggest", params={"prefix": "SN"}, headers=auth_headers
+        )
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("params, budget", [({}, 1), ({"since": 0}, 3)])
+async def test_changes(
+    auth, client, auth_headers, asset, assert_max_queries, params, budget, monkeypatch
+):
+    monkeypatch.setattr(settings, "CHANGE_LOG_SETTLE_SECONDS", 0)
+    with assert_max_queries(budget + auth):
+        response = await client.get(
+            "/api/v1/assets/changes", params=params, headers=auth_headers
+        )
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_stats(auth, client, auth_headers, asset, assert_max_queries):
+    with assert_max_queries(1 + auth):
+        response = await client.get("/api/v1/assets/stats", headers=auth_headers)
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_get_by_serial(auth, client, auth_headers, asset, assert_max_queries):
+    with assert_max_queries(1 + auth):
+        response = await client.get(
+            "/api/v1/assets/by-serial/SN-1", headers=auth_headers
+        )
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("params", [{}, {"fields": "name"}])
+async def test_get_asset(auth, client, auth_headers, asset, assert_max_queries, params):
+    with assert_max_queries(1 + auth):
+        response = await client.get(
+            f"/api/v1/assets/{asset['id']}", params=params, headers=auth_headers
+        )
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_create_asset(auth, client, auth_headers, test_user, assert_max_queries):
+    with assert_max_queries(3 + auth):
+        response = await client.post("/api/v1/assets", json=ASSET, headers=auth_headers)
+    assert response.status_code == 201
+
+
+@pytest.mark.asyncio
+async def test_update_asset(auth, client, auth_headers, asset, assert_max_queries):
+    with assert_max_queries(4 + auth):
+        response = await client.put(
+            f"/api/v1/assets/{asset['id']}",
+            json={"name": "Renamed"},
+            headers=auth_headers,
+        )
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_delete_asset(auth, client, auth_headers, asset, assert_max_queries):
+    with assert_max_queries(4 + auth):
+        response = await client.delete(
+            f"/api/v1/assets/{asset['id']}", headers=auth_headers
+        )
+    assert response.status_code == 204
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("wait, budget", [(True, 5), (False, 2)])
+async def test_upload_image(
+    auth, client, auth_headers, asset, jobs, assert_max_queries, wait, budget
+):
+    with assert_max_queries(budget + auth):
+        response = await client.post(
+            f"/api/v1/assets/{asset['id']}/upload-image",
+            params={"wait": str(wait).lower()},
+            files={"image": image()},
+            headers=auth_headers,
+        )
+    assert response.status_code in (200, 202)
+
+
+@pytest.mark.asyncio
+async def test_upload_image_stream(
+    auth, client, auth_headers, asset, mock_ai, jobs, assert_max_queries
+):
+    async def stream(image_bytes, mime_type):
+        yield "A laptop."
+
+    mock_ai.stream_asset_description = stream
+    with assert_max_queries(5 + auth):
+        response = await client.post(
+            f"/api/v1/assets/{asset['id']}/upload-image/stream",
+            files={"image": image()},
+            headers=auth_headers,
+        )
+    assert "event: done" in response.text
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("count", [1, 4])
+async def test_batch_upload(
+    auth, client, auth_headers, mock_ai, jobs, assert_max_queries, count
+):
+    ids = []
+    for i in range(count):
+        response = await client.post(
+            "/api/v1/assets",
+            json={**ASSET, "serial_number": f"SN-{i}"},
+            headers=auth_headers,
+        )
+        ids.append(response.json()["data"]["id"])
+
+    # Each part is looked up as it arrives, before inference, then the writes
+    # are one SELECT plus an UPDATE and a change row per asset
+    with assert_max_queries(1 + 3 * count + auth):
+        response = await client.post(
+            "/api/v1/assets/upload-images",
+            files=[(asset_id, image()) for asset_id in ids],
+            headers=auth_headers,
+        )
+    assert [r["status"] for r in response.json()["data"]] == ["updated"] * count
+
+
+@pytest.mark.asyncio
+async def test_job_routes(auth, client, auth_headers, asset, jobs, assert_max_queries):
+    response = await client.post(
+        f"/api/v1/assets/{asset['id']}/upload-image",
+        files={"image": image()},
+        headers=auth_headers,
+    )
+    job_id = response.json()["data"]["id"]
+    await jobs.join()
+
+    with assert_max_queries(1 + auth):
+        response = await client.get(f"/api/v1/jobs/{job_id}", headers=auth_headers)
+    assert response.json()["data"]["status"] == "succeeded"
+
+    with assert_max_queries(2 + auth):
+        response = await client.get(
+            f"/api/v1/jobs/{job_id}/events", headers=auth_headers
+        )
+    assert "event: status" in response.text
+
+
+@pytest.mark.asyncio
+async def test_query_count_header(client, auth_headers, asset):
+    async with AsyncClient(
+        transport=ASGITransport(app=QueryCountMiddleware(app)), base_url="http://test"
+    ) as debug_client:
+        response = await debug_client.get(
+            f"/api/v1/assets/{asset['id']}", headers=auth_headers
+        )
+        health = await debug_client.get("/api/v1/health")
+
+    assert response.headers["x-query-count"] == "1"
+    assert health.headers["x-query-count"] == "0"
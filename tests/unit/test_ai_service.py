@@ -1,17 +1,37 @@
+import asyncio
+import base64
+import json
+
+import httpx
 import pytest
 from unittest.mock import AsyncMock, patch, MagicMock
 
 from app.services.ai_service import (
+    AdmissionController,
+    AIOverloadedError,
     AIService,
     AIProviderError,
+    BatchingProvider,
     OpenAIProvider,
     AnthropicProvider,
     OllamaProvider,
     LMStudioProvider,
+    RoutingProvider,
+    close_ai_service,
     get_ai_provider,
+    get_ai_service,
+    keep_ai_model_warm,
+    parse_batch_descriptions,
     validate_image,
     MAX_IMAGE_SIZE,
 )
+from app.services.description_cache import DescriptionCache
+
+
+async def sent_payload(post):
+    """Decode the streamed JSON body of a mocked client.post call."""
+    body = post.call_args.kwargs["content"]
+    return json.loads(b"".join([chunk async for chunk in body]))
 
 
 class TestValidateImage:
@@ -237,8 +257,10 @@ class TestLMStudioProvider:
 
             call_args = mock.post.call_args
             assert "/v1/chat/completions" in call_args[0][0]
-            payload = call_args.kwargs["json"]
+            payload = await sent_payload(mock.post)
             assert "messages" in payload
+            url = payload["messages"][1]["content"][0]["image_url"]["url"]
+            assert url == "data:image/jpeg;base64," + base64.b64encode(image).decode()
 
 
 class TestStubProviders:
@@ -283,3 +305,636 @@ class TestAIService:
 
         with pytest.raises(AIProviderError, match="Failed"):
             await svc.describe_asset_image(b"data", "image/jpeg")
+
+    async def test_cached_description_skips_provider(self, fake_redis):
+        mock_provider = AsyncMock()
+        mock_provider.describe_image.return_value = "A laptop."
+        cache = DescriptionCache(fake_redis, namespace="test", ttl=60)
+
+        svc = AIService(provider=mock_provider, cache=cache)
+        first = await svc.describe_asset_image(b"data", "image/jpeg")
+        second = await svc.describe_asset_image(b"data", "image/jpeg")
+
+        assert first == second == "A laptop."
+        mock_provider.describe_image.assert_called_once()
+
+    async def test_provider_gets_preprocessed_image(self):
+        mock_provider = AsyncMock()
+        mock_provider.describe_image.return_value = "A laptop."
+
+        with patch(
+            "app.services.ai_service.prepare_image",
+            return_value=(b"small", "image/webp"),
+        ) as prepare:
+            svc = AIService(provider=mock_provider)
+            await svc.describe_asset_image(b"large", "image/png")
+
+        prepare.assert_called_once()
+        mock_provider.describe_image.assert_called_once_with(b"small", "image/webp")
+
+    async def test_preprocessing_disabled(self):
+        mock_provider = AsyncMock()
+        mock_provider.describe_image.return_value = "A laptop."
+
+        with (
+            patch("app.services.ai_service.settings.AI_IMAGE_MAX_EDGE", 0),
+            patch("app.services.ai_service.prepare_image") as prepare,
+        ):
+            svc = AIService(provider=mock_provider)
+            await svc.describe_asset_image(b"large", "image/png")
+
+        prepare.assert_not_called()
+
+    async def test_failed_description_not_cached(self, fake_redis):
+        mock_provider = AsyncMock()
+        mock_provider.describe_image.side_effect = AIProviderError("Failed")
+        cache = DescriptionCache(fake_redis, namespace="test", ttl=60)
+
+        svc = AIService(provider=mock_provider, cache=cache)
+        with pytest.raises(AIProviderError):
+            await svc.describe_asset_image(b"data", "image/jpeg")
+
+        assert fake_redis.store == {}
+
+
+class TestSharedClient:
+    async def test_provider_reuses_one_client(self):
+        mock_resp = MagicMock()
+        mock_resp.json.return_value = {"response": "A phone."}
+        mock_resp.raise_for_status = MagicMock()
+
+        with patch("httpx.AsyncClient") as mock_client:
+            mock = AsyncMock()
+            mock.post.return_value = mock_resp
+            mock_client.return_value = mock
+
+            p = OllamaProvider(endpoint="http://localhost:11434", model="llava")
+            await p.describe_image(b"img", "image/png")
+            await p.describe_image(b"img", "image/png")
+
+            mock_client.assert_called_once()
+            assert mock.post.call_count == 2
+
+            await p.aclose()
+            mock.aclose.assert_awaited_once()
+
+    async def test_injected_client_is_used(self):
+        client = AsyncMock()
+        p = LMStudioProvider(endpoint="http://localhost:1234", client=client)
+        assert p.client is client
+
+    async def test_service_closes_provider(self):
+        provider = AsyncMock()
+        svc = AIService(provider=provider)
+        await svc.aclose()
+        provider.aclose.assert_awaited_once()
+
+    async def test_get_ai_service_is_shared(self):
+        await close_ai_service()
+        assert get_ai_service() is get_ai_service()
+        await close_ai_service()
+
+
+class SingleProvider:
+    """Provider without describe_images."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def describe_image(self, image_bytes, mime_type):
+        self.calls += 1
+        return f"single {image_bytes.decode()}"
+
+
+def batch_provider():
+    provider = AsyncMock()
+    provider.describe_images.side_effect = lambda images: [
+        f"batch {data.decode()}" for data, _ in images
+    ]
+    provider.describe_image.side_effect = lambda data, mime: f"single {data.decode()}"
+    return provider
+
+
+class TestBatchingProvider:
+    async def test_concurrent_calls_share_one_request(self):
+        provider = batch_provider()
+        batching = BatchingProvider(provider, max_batch_size=8, max_wait_ms=10)
+
+        results = await asyncio.gather(
+            *(batching.describe_image(f"{i}".encode(), "image/png") for i in range(3))
+        )
+
+        assert results == ["batch 0", "batch 1", "batch 2"]
+        provider.describe_images.assert_awaited_once()
+        provider.describe_image.assert_not_called()
+
+    async def test_full_batch_goes_without_waiting(self):
+        provider = batch_provider()
+        batching = BatchingProvider(provider, max_batch_size=2, max_wait_ms=10_000)
+
+        results = await asyncio.wait_for(
+            asyncio.gather(
+                *(
+                    batching.describe_image(f"{i}".encode(), "image/png")
+                    for i in range(4)
+                )
+            ),
+            timeout=1,
+        )
+
+        assert results == ["batch 0", "batch 1", "batch 2", "batch 3"]
+        assert provider.describe_images.await_count == 2
+
+    async def test_lone_call_uses_single_request(self):
+        provider = batch_provider()
+        batching = BatchingProvider(provider, max_batch_size=8, max_wait_ms=1)
+
+        assert await batching.describe_image(b"0", "image/png") == "single 0"
+        provider.describe_images.assert_not_called()
+
+    async def test_provider_without_batch_support(self):
+        provider = SingleProvider()
+        batching = BatchingProvider(provider, max_batch_size=8, max_wait_ms=10)
+
+        results = await asyncio.gather(
+            batching.describe_image(b"0", "image/png"),
+            batching.describe_image(b"1", "image/png"),
+        )
+
+        assert results == ["single 0", "single 1"]
+        assert provider.calls == 2
+
+    async def test_failed_batch_falls_back_to_singles(self):
+        provider = batch_provider()
+        provider.describe_images.side_effect = AIProviderError("Bad batch reply")
+        batching = BatchingProvider(provider, max_batch_size=8, max_wait_ms=10)
+
+        results = await asyncio.gather(
+            batching.describe_image(b"0", "image/png"),
+            batching.describe_image(b"1", "image/png"),
+        )
+
+        assert results == ["single 0", "single 1"]
+        assert provider.describe_image.await_count == 2
+
+    async def test_single_failure_reaches_its_caller_only(self):
+        provider = batch_provider()
+        provider.describe_images.side_effect = AIProviderError("Bad batch reply")
+
+        def describe(data, mime):
+            if data == b"1":
+                raise AIProviderError("Failed")
+            return "ok"
+
+        provider.describe_image.side_effect = describe
+        batching = BatchingProvider(provider, max_batch_size=8, max_wait_ms=10)
+
+        results = await asyncio.gather(
+            batching.describe_image(b"0", "image/png"),
+            batching.describe_image(b"1", "image/png"),
+            return_exceptions=True,
+        )
+
+        assert results[0] == "ok"
+        assert isinstance(results[1], AIProviderError)
+
+    async def test_service_wraps_provider_when_enabled(self):
+        with (
+            patch("app.services.ai_service.get_ai_provider") as mock_get,
+            patch("app.services.ai_service.settings.AI_BATCH_MAX_SIZE", 4),
+        ):
+            mock_get.return_value = batch_provider()
+            svc = AIService()
+
+            assert isinstance(svc.provider, BatchingProvider)
+            assert await svc.describe_asset_image(b"7", "image/png") == "single 7"
+
+
+class TestParseBatchDescriptions:
+    def test_array(self):
+        assert parse_batch_descriptions('["A laptop.", "A phone."]', 2) == [
+            "A laptop.",
+            "A phone.",
+        ]
+
+    def test_array_inside_chatter(self):
+        text = 'Sure! Here you go:\n["A laptop.", " A phone. "]\nAnything else?'
+        assert parse_batch_descriptions(text, 2) == ["A laptop.", "A phone."]
+
+    def test_wrong_count(self):
+        with pytest.raises(AIProviderError):
+            parse_batch_descriptions('["A laptop."]', 2)
+
+    def test_not_json(self):
+        with pytest.raises(AIProviderError):
+            parse_batch_descriptions("A laptop and a phone.", 2)
+
+    async def test_ollama_sends_all_images_in_one_request(self):
+        mock_resp = MagicMock()
+        mock_resp.json.return_value = {"response": '["A laptop.", "A phone."]'}
+        client = AsyncMock()
+        client.post.return_value = mock_resp
+
+        p = OllamaProvider(client=client)
+        result = await p.describe_images([(b"a", "image/png"), (b"b", "image/jpeg")])
+
+        assert result == ["A laptop.", "A phone."]
+        payload = await sent_payload(client.post)
+        assert payload["images"] == ["YQ==", "Yg=="]
+        assert "2 strings" in payload["prompt"]
+
+    async def test_lmstudio_sends_all_images_in_one_request(self):
+        mock_resp = MagicMock()
+        mock_resp.json.return_value = {
+            "choices": [{"message": {"content": '["A laptop.", "A phone."]'}}]
+        }
+        client = AsyncMock()
+        client.post.return_value = mock_resp
+
+        p = LMStudioProvider(client=client)
+        result = await p.describe_images([(b"a", "image/png"), (b"b", "image/jpeg")])
+
+        assert result == ["A laptop.", "A phone."]
+        content = (await sent_payload(client.post))["messages"][1]["content"]
+        assert [c["type"] for c in content] == ["image_url", "image_url", "text"]
+
+
+def streaming_client(body: bytes, status_code: int = 200):
+    def handler(request):
+        return httpx.Response(status_code, content=body)
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+async def collect(stream):
+    return [piece async for piece in stream]
+
+
+class FakeStreamingProvider:
+    def __init__(self, *pieces):
+        self.pieces = pieces
+        self.calls = 0
+
+    async def describe_image(self, image_bytes, mime_type):
+        raise AssertionError("should stream")
+
+    async def stream_description(self, image_bytes, mime_type):
+        self.calls += 1
+        for piece in self.pieces:
+            yield piece
+
+
+class TestStreaming:
+    async def test_ollama_ndjson(self):
+        body = (
+            b'{"response": "A grey", "done": false}\n'
+            b'{"response": " laptop.", "done": false}\n'
+            b'{"response": "", "done": true}\n'
+        )
+        p = OllamaProvider(client=streaming_client(body))
+        assert await collect(p.stream_description(b"img", "image/png")) == [
+            "A grey",
+            " laptop.",
+        ]
+
+    async def test_ollama_error_line(self):
+        p = OllamaProvider(client=streaming_client(b'{"error": "model not found"}\n'))
+        with pytest.raises(AIProviderError, match="model not found"):
+            await collect(p.stream_description(b"img", "image/png"))
+
+    async def test_ollama_http_error(self):
+        p = OllamaProvider(client=streaming_client(b"", status_code=500))
+        with pytest.raises(AIProviderError, match="Ollama failed: 500"):
+            await collect(p.stream_description(b"img", "image/png"))
+
+    async def test_lmstudio_sse(self):
+        body = (
+            b'data: {"choices": [{"delta": {"role": "assistant"}}]}\n\n'
+            b'data: {"choices": [{"delta": {"content": "A grey"}}]}\n\n'
+            b": keep-alive\n\n"
+            b'data: {"choices": [{"delta": {"content": " laptop."}}]}\n\n'
+            b"data: [DONE]\n\n"
+        )
+        p = LMStudioProvider(client=streaming_client(body))
+        assert await collect(p.stream_description(b"img", "image/jpeg")) == [
+            "A grey",
+            " laptop.",
+        ]
+
+    async def test_lmstudio_bad_event(self):
+        p = LMStudioProvider(client=streaming_client(b"data: {}\n\n"))
+        with pytest.raises(AIProviderError, match="Bad response"):
+            await collect(p.stream_description(b"img", "image/jpeg"))
+
+    async def test_service_streams_and_caches(self, fake_redis):
+        provider = FakeStreamingProvider("A grey", " laptop. ")
+        cache = DescriptionCache(fake_redis, namespace="test", ttl=60)
+        svc = AIService(provider=provider, cache=cache)
+
+        assert await collect(svc.stream_asset_description(b"data", "image/png")) == [
+            "A grey",
+            " laptop. ",
+        ]
+        # The cached, complete description comes back in one piece
+        assert await collect(svc.stream_asset_description(b"data", "image/png")) == [
+            "A grey laptop."
+        ]
+        assert provider.calls == 1
+
+    async def test_service_rejects_empty_stream(self):
+        svc = AIService(provider=FakeStreamingProvider(" "))
+        with pytest.raises(AIProviderError, match="empty"):
+            await collect(svc.stream_asset_description(b"data", "image/png"))
+
+    async def test_non_streaming_provider_yields_whole_description(self):
+        class PlainProvider:
+            async def describe_image(self, image_bytes, mime_type):
+                return "A laptop."
+
+        svc = AIService(provider=PlainProvider())
+        assert await collect(svc.stream_asset_description(b"data", "image/png")) == [
+            "A laptop."
+        ]
+
+
+class FakeBackend:
+    """Provider with a fixed delay that can be told to fail."""
+
+    def __init__(self, name, delay=0.0, fail=False):
+        self.name = name
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+        self.cancelled = 0
+
+    async def describe_image(self, image_bytes, mime_type):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.fail:
+            raise AIProviderError(f"{self.name} is down")
+        return f"from {self.name}"
+
+
+def router(*backends, **kwargs):
+    return RoutingProvider([(b.name, b) for b in backends], **kwargs)
+
+
+class TestRoutingProvider:
+    async def test_prefers_faster_backend(self):
+        fast, slow = FakeBackend("fast", 0.001), FakeBackend("slow", 0.03)
+        p = router(slow, fast)
+
+        for _ in range(10):
+            await p.describe_image(b"img", "image/png")
+
+        # Each is sampled once, then the faster one takes the traffic
+        assert fast.calls == 9
+        assert slow.calls == 1
+
+    async def test_in_flight_spreads_concurrent_requests(self):
+        a, b = FakeBackend("a", 0.02), FakeBackend("b", 0.02)
+        p = router(a, b)
+        await p.describe_image(b"img", "image/png")
+        await p.describe_image(b"img", "image/png")
+
+        await asyncio.gather(*(p.describe_image(b"img", "image/png") for _ in range(8)))
+
+        assert abs(a.calls - b.calls) <= 2
+
+    async def test_fails_over_and_opens_breaker(self):
+        down, up = FakeBackend("down", fail=True), FakeBackend("up", 0.01)
+        p = router(down, up, failure_threshold=2, cooldown=60)
+
+        results = [await p.describe_image(b"img", "image/png") for _ in range(6)]
+
+        assert results == ["from up"] * 6
+        # Unmeasured "down" keeps winning the pick until its breaker opens
+        assert down.calls == 2
+
+    async def test_half_open_trial_closes_breaker(self):
+        flaky, up = FakeBackend("flaky", fail=True), FakeBackend("up", 0.01)
+        p = router(flaky, up, failure_threshold=1, cooldown=0.01)
+        await p.describe_image(b"img", "image/png")
+        assert flaky.calls == 1
+
+        flaky.fail = False
+        await asyncio.sleep(0.02)
+        assert await p.describe_image(b"img", "image/png") == "from flaky"
+        assert p.backends[0].failures == 0
+
+    async def test_all_backends_down(self):
+        p = router(FakeBackend("a", fail=True), FakeBackend("b", fail=True))
+        with pytest.raises(AIProviderError, match="is down"):
+            await p.describe_image(b"img", "image/png")
+        with pytest.raises(AIProviderError):
+            await p.describe_image(b"img", "image/png")
+
+    async def test_hedges_slow_request(self):
+        primary, spare = FakeBackend("primary", 0.001), FakeBackend("spare", 0.001)
+        p = router(primary, spare, hedge_percentile=90)
+        # Give primary a latency history, then make it stall
+        for _ in range(RoutingProvider.HEDGE_MIN_SAMPLES):
+            p._record_success(p.backends[0], 0.001)
+        p.backends[1].ewma = 1.0
+        primary.delay = 1.0
+
+        result = await asyncio.wait_for(p.describe_image(b"img", "image/png"), 0.5)
+
+        assert result == "from spare"
+        await asyncio.sleep(0.01)
+        assert primary.cancelled == 1
+        assert p.backends[0].in_flight == 0
+
+    async def test_no_hedge_without_history(self):
+        primary, spare = FakeBackend("primary", 0.02), FakeBackend("spare")
+        p = router(primary, spare, hedge_percentile=50)
+        p.backends[1].ewma = 1.0
+
+        assert await p.describe_image(b"img", "image/png") == "from primary"
+        assert spare.calls == 0
+
+    async def test_stream_fails_over_before_first_piece(self):
+        class Streaming(FakeBackend):
+            async def stream_description(self, image_bytes, mime_type):
+                self.calls += 1
+                if self.fail:
+                    raise AIProviderError("down")
+                yield self.name
+
+        p = router(Streaming("a", fail=True), Streaming("b"))
+        assert await collect(p.stream_description(b"img", "image/png")) == ["b"]
+
+    def test_built_from_endpoint_list(self):
+        with (
+            patch("app.services.ai_service.settings.AI_PROVIDER", "ollama"),
+            patch(
+                "app.services.ai_service.settings.AI_ENDPOINTS",
+                "http://gpu1:11434, http://gpu2:11434",
+            ),
+        ):
+            p = get_ai_provider()
+
+        assert isinstance(p, RoutingProvider)
+        assert [b.name for b in p.backends] == [
+            "http://gpu1:11434",
+            "http://gpu2:11434",
+        ]
+        assert all(isinstance(b.provider, OllamaProvider) for b in p.backends)
+
+    def test_rejects_bad_percentile(self):
+        with pytest.raises(ValueError):
+            router(FakeBackend("a"), hedge_percentile=100)
+
+
+class TestAdmissionController:
+    async def hold(self, admission, release):
+        async with admission.slot():
+            await release.wait()
+
+    async def test_rejects_when_queue_full(self):
+        admission = AdmissionController(max_concurrency=1, max_queue=1, max_wait=5)
+        release = asyncio.Event()
+        running = asyncio.create_task(self.hold(admission, release))
+        queued = asyncio.create_task(self.hold(admission, release))
+        await asyncio.sleep(0)
+        assert (admission.active, admission.waiting) == (1, 1)
+
+        with pytest.raises(AIOverloadedError, match="queue is full") as exc:
+            async with admission.slot():
+                pass
+        assert exc.value.retry_after >= 1
+
+        release.set()
+        await asyncio.gather(running, queued)
+        assert (admission.active, admission.waiting) == (0, 0)
+
+    async def test_rejects_when_deadline_would_be_missed(self):
+        admission = AdmissionController(max_concurrency=1, max_queue=10, max_wait=5)
+        admission.service_time = 4.0
+        release = asyncio.Event()
+        running = asyncio.create_task(self.hold(admission, release))
+        queued = asyncio.create_task(self.hold(admission, release))
+        await asyncio.sleep(0)
+
+        # Third in line: about 8 s to wait, past the 5 s deadline
+        with pytest.raises(AIOverloadedError, match="backed up") as exc:
+            async with admission.slot():
+                pass
+        assert exc.value.retry_after == 8
+
+        release.set()
+        await asyncio.gather(running, queued)
+
+    async def test_times_out_waiting(self):
+        admission = AdmissionController(max_concurrency=1, max_queue=10, max_wait=0.01)
+        release = asyncio.Event()
+        running = asyncio.create_task(self.hold(admission, release))
+        await asyncio.sleep(0)
+
+        with pytest.raises(AIOverloadedError, match="Timed out"):
+            async with admission.slot():
+                pass
+        assert admission.waiting == 0
+
+        release.set()
+        await running
+
+    async def test_tracks_service_time(self):
+        admission = AdmissionController(max_concurrency=2, max_queue=1, max_wait=5)
+        async with admission.slot():
+            await asyncio.sleep(0.01)
+        assert admission.service_time >= 0.01
+        assert admission.expected_wait(4) == pytest.approx(2 * admission.service_time)
+
+    async def test_service_limits_concurrent_inference(self):
+        active, peak = 0, 0
+
+        class SlowProvider:
+            async def describe_image(self, image_bytes, mime_type):
+                nonlocal active, peak
+                active += 1
+                peak = max(peak, active)
+                await asyncio.sleep(0.01)
+                active -= 1
+                return "A laptop."
+
+        with (
+            patch("app.services.ai_service.settings.AI_MAX_CONCURRENCY", 2),
+            patch("app.services.ai_service.settings.AI_IMAGE_MAX_EDGE", 0),
+        ):
+            svc = AIService(provider=SlowProvider())
+        await asyncio.gather(
+            *(svc.describe_asset_image(b"img", "image/png") for _ in range(6))
+        )
+        assert peak == 2
+
+
+def recording_client(reply: dict, sent: list):
+    def handler(request):
+        sent.append(json.loads(request.content))
+        return httpx.Response(200, json=reply)
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+class TestWarmUp:
+    async def test_ollama_sends_keep_alive(self):
+        sent = []
+        client = recording_client({"response": "A laptop."}, sent)
+        p = OllamaProvider(client=client, keep_alive="30m")
+
+        await p.describe_image(b"img", "image/png")
+        await p.warm_up()
+
+        assert [payload.get("keep_alive") for payload in sent] == ["30m", "30m"]
+        assert "prompt" not in sent[1] and "images" not in sent[1]
+
+    async def test_ollama_without_keep_alive(self):
+        sent = []
+        p = OllamaProvider(client=recording_client({"response": "A laptop."}, sent))
+        await p.describe_image(b"img", "image/png")
+        assert "keep_alive" not in sent[0]
+
+    async def test_lmstudio_warm_up_is_one_token(self):
+        sent = []
+        reply = {"choices": [{"message": {"content": "H"}}]}
+        p = LMStudioProvider(client=recording_client(reply, sent))
+        await p.warm_up()
+        assert sent[0]["max_tokens"] == 1
+
+    async def test_service_times_warm_up(self):
+        provider = AsyncMock()
+        svc = AIService(provider=provider)
+        assert await svc.warm_up() >= 0
+        provider.warm_up.assert_awaited_once()
+
+    async def test_skipped_while_requests_run(self):
+        provider = AsyncMock()
+        svc = AIService(provider=provider)
+        svc.admission.active = 1
+        assert await svc.warm_up() is None
+        provider.warm_up.assert_not_called()
+
+    async def test_routing_warms_every_backend(self):
+        up, down = AsyncMock(), AsyncMock()
+        down.warm_up.side_effect = AIProviderError("down")
+        p = RoutingProvider([("up", up), ("down", down)])
+
+        await p.warm_up()
+        up.warm_up.assert_awaited_once()
+
+        up.warm_up.side_effect = AIProviderError("down too")
+        with pytest.raises(AIProviderError):
+            await p.warm_up()
+
+    async def test_periodic_warm_up_respects_hours(self):
+        with (
+            patch("app.services.ai_service.within_window", return_value=False),
+            patch("app.services.ai_service.warm_ai_model") as warm,
+        ):
+            await keep_ai_model_warm()
+        warm.assert_not_called()
@@ -0,0 +1,73 @@
+from types import SimpleNamespace
+
+from app.services.asset_index import AssetIndex, PrefixIndex
+
+
+def make_asset(id, serial_number=None, model=None):
+    return SimpleNamespace(id=id, serial_number=serial_number, model=model)
+
+
+class TestPrefixIndex:
+    def test_search_is_case_insensitive_and_sorted(self):
+        idx = PrefixIndex()
+        idx.build(["SN-200", "sn-100", "XY-1"])
+
+        assert idx.search("sn") == [("sn-100", 1), ("SN-200", 1)]
+        assert idx.search("SN-2") == [("SN-200", 1)]
+        assert idx.search("zz") == []
+
+    def test_duplicates_share_one_slot(self):
+        idx = PrefixIndex()
+        idx.add("Dell")
+        idx.add("Dell")
+
+        assert len(idx) == 1
+        assert idx.search("de") == [("Dell", 2)]
+
+        idx.remove("Dell")
+        assert idx.search("de") == [("Dell", 1)]
+        idx.remove("Dell")
+        assert idx.search("de") == []
+
+    def test_limit(self):
+        idx = PrefixIndex()
+        idx.build([f"A{i:03}" for i in range(100)])
+
+        assert [v for v, _ in idx.search("a", limit=3)] == ["A000", "A001", "A002"]
+
+    def test_remove_unknown_is_noop(self):
+        idx = PrefixIndex()
+        idx.remove("missing")
+        assert len(idx) == 0
+
+
+class TestAssetIndex:
+    def test_build_and_suggest(self):
+        idx = AssetIndex()
+        idx.build([("1", "SN123", "MacBook Pro"), ("2", "SN124", "MacBook Air")])
+
+        assert idx.suggest("sn12") == [
+            {"field": "serial_number", "value": "SN123", "matches": 1},
+            {"field": "serial_number", "value": "SN124", "matches": 1},
+        ]
+        assert idx.suggest("mac", field="model", limit=1) == [
+            {"field": "model", "value": "MacBook Air", "matches": 1}
+        ]
+
+    def test_upsert_moves_changed_values(self):
+        idx = AssetIndex()
+        idx.upsert(make_asset("1", "OLD-1", "Pixel"))
+        idx.upsert(make_asset("1", "NEW-1", "Pixel"))
+
+        assert idx.suggest("old") == []
+        assert idx.suggest("new")[0]["value"] == "NEW-1"
+        assert idx.suggest("pix")[0]["matches"] == 1
+
+    def test_discard(self):
+        idx = AssetIndex()
+        idx.upsert(make_asset("1", "SN1", None))
+        idx.discard("1")
+        idx.discard("1")
+
+        assert len(idx) == 0
+        assert idx.suggest("sn") == []
@@ -1,5 +1,6 @@
 import pytest
 from datetime import date
+from app.core.config import settings
 from app.services.asset_service import AssetService
 from app.models.user import User
 from app.core.security import hash_password
@@ -66,3 +67,40 @@ async def test_update_asset_fields(session):
     assert updated.model == "Pixel 6"
     assert updated.serial_number == "Pixel-123"
     assert updated.check_out_date == date(2023, 2, 1)
+
+
+@pytest.mark.asyncio
+async def test_bulk_update_descriptions(session, monkeypatch):
+    monkeypatch.setattr(settings, "CHANGE_LOG_SETTLE_SECONDS", 0)
+    service = AssetService()
+
+    owner = User(email="owner3@example.com", hashed_password=hash_password("password"))
+    session.add(owner)
+    await session.commit()
+
+    laptop = await service.create_asset(
+        session,
+        name="Laptop",
+        type="Hardware",
+        check_in_date=date(2023, 1, 1),
+        owner_id=owner.id,
+    )
+    phone = await service.create_asset(
+        session,
+        name="Phone",
+        type="Device",
+        check_in_date=date(2023, 1, 1),
+        owner_id=owner.id,
+    )
+    _, head, _ = await service.get_changes(session, None)
+
+    updated = await service.bulk_update_descriptions(
+        session,
+        {laptop.id: "A laptop", phone.id: "A phone", "missing": "Nothing"},
+    )
+
+    assert sorted(updated) == sorted([laptop.id, phone.id])
+    assert (await service.get_asset(session, laptop.id)).description == "A laptop"
+    assert await service.get_asset_version(session, phone.id) == 2
+    changes, _, _ = await service.get_changes(session, head)
+    assert {c["asset_id"] for c in changes} == {laptop.id, phone.id}
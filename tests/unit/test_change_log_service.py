@@ -0,0 +1,122 @@
+import pytest
+from datetime import date, datetime, timedelta, timezone
+from sqlalchemy import update
+
+from app.models.asset_change import AssetChange
+from app.models.user import User
+from app.core.security import hash_password
+from app.services.asset_service import AssetService
+from app.services.change_log_service import ChangeLogExpiredError, ChangeLogService
+
+
+@pytest.fixture
+async def owner(session):
+    user = User(email="sync@example.com", hashed_password=hash_password("password"))
+    session.add(user)
+    await session.commit()
+    return user
+
+
+async def settle(session):
+    """Age every log entry past the settle window."""
+    old = datetime.now(timezone.utc) - timedelta(minutes=1)
+    await session.execute(update(AssetChange).values(changed_at=old))
+    await session.commit()
+
+
+async def make_asset(session, owner, name):
+    return await AssetService().create_asset(
+        session, name, "Hardware", date(2024, 1, 1), owner_id=owner.id
+    )
+
+
+@pytest.mark.asyncio
+async def test_changes_collapse_to_latest_state(session, owner):
+    svc = AssetService()
+    _, head, _ = await svc.get_changes(session, None)
+    assert head == 0
+
+    laptop = await make_asset(session, owner, "Laptop")
+    phone = await make_asset(session, owner, "Phone")
+    await svc.update_asset(session, laptop, name="Laptop 2")
+    await svc.delete_asset(session, phone)
+    await settle(session)
+
+    changes, cursor, has_more = await svc.get_changes(session, head)
+    assert not has_more
+    assert cursor == 4
+    assert [(c["op"], c["asset_id"]) for c in changes] == [
+        ("update", laptop.id),
+        ("delete", phone.id),
+    ]
+    assert changes[0]["asset"].name == "Laptop 2"
+    assert changes[1]["asset"] is None
+
+    changes, next_cursor, _ = await svc.get_changes(session, cursor)
+    assert changes == [] and next_cursor == cursor
+
+
+@pytest.mark.asyncio
+async def test_noop_update_is_not_logged(session, owner):
+    svc = AssetService()
+    laptop = await make_asset(session, owner, "Laptop")
+    await svc.update_asset(session, laptop, name="Laptop")
+    await settle(session)
+
+    changes, cursor, _ = await svc.get_changes(session, 0)
+    assert [c["op"] for c in changes] == ["insert"]
+    assert cursor == 1
+
+
+@pytest.mark.asyncio
+async def test_paging(session, owner):
+    for i in range(3):
+        await make_asset(session, owner, f"Asset {i}")
+    await settle(session)
+
+    changes, cursor, has_more = await AssetService().get_changes(session, 0, limit=2)
+    assert len(changes) == 2 and has_more and cursor == 2
+
+
+@pytest.mark.asyncio
+async def test_cursor_holds_back_at_unsettled_entry(session, owner):
+    for i in range(3):
+        await make_asset(session, owner, f"Asset {i}")
+    await settle(session)
+    # seq 2 is as if its transaction just committed, after seq 3's
+    await session.execute(
+        update(AssetChange)
+        .where(AssetChange.seq == 2)
+        .values(changed_at=datetime.now(timezone.utc))
+    )
+    await session.commit()
+    svc = ChangeLogService()
+
+    changes, cursor, has_more = await svc.changes_since(session, 0)
+    assert [c["seq"] for c in changes] == [1] and cursor == 1 and not has_more
+    assert await svc.sync_cursor(session) == 1
+    assert await svc.head(session) == 3
+
+    await settle(session)
+    changes, cursor, _ = await svc.changes_since(session, 1)
+    assert [c["seq"] for c in changes] == [2, 3] and cursor == 3
+    assert await svc.sync_cursor(session) == 3
+
+
+@pytest.mark.asyncio
+async def test_prune_and_expired_cursor(session, owner):
+    for i in range(3):
+        await make_asset(session, owner, f"Asset {i}")
+    old = datetime.now(timezone.utc) - timedelta(days=30)
+    await session.execute(update(AssetChange).values(changed_at=old))
+    await session.commit()
+
+    svc = ChangeLogService()
+    # The newest entry survives so the log keeps a lower bound
+    assert await svc.prune(session, timedelta(days=7)) == 2
+    assert await svc.head(session) == 3
+
+    with pytest.raises(ChangeLogExpiredError):
+        await svc.changes_since(session, 0)
+    changes, _, _ = await svc.changes_since(session, 2)
+    assert len(changes) == 1
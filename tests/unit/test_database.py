@@ -0,0 +1,204 @@
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+
+from app.core.database import (
+    ReplicaRouter,
+    RetryingSession,
+    make_session_factory,
+    ping_idle_connections,
+    reads_from_replica,
+)
+from app.models.base import Base
+from app.models.user import User
+
+
+@pytest.fixture
+async def engine(tmp_path):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path}/test.db", pool_size=1, max_overflow=0
+    )
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+def pings(engine):
+    calls = []
+    dialect = engine.sync_engine.dialect
+    real_ping = dialect.do_ping
+
+    def do_ping(dbapi_connection):
+        calls.append(dbapi_connection)
+        return real_ping(dbapi_connection)
+
+    with patch.object(dialect, "do_ping", do_ping):
+        yield calls
+
+
+async def checkout(engine):
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+        return (await conn.get_raw_connection()).driver_connection
+
+
+class TestPingIdleConnections:
+    async def test_recently_used_connection_is_not_pinged(self, engine, pings):
+        ping_idle_connections(engine, idle_after=60)
+
+        await checkout(engine)
+        await checkout(engine)
+
+        assert pings == []
+
+    async def test_idle_connection_is_pinged(self, engine, pings):
+        ping_idle_connections(engine, idle_after=0)
+
+        first = await checkout(engine)  # fresh connection, no ping
+        assert pings == []
+        assert await checkout(engine) is first
+        assert len(pings) == 1
+
+    async def test_dead_idle_connection_is_replaced(self, engine):
+        ping_idle_connections(engine, idle_after=0)
+        first = await checkout(engine)
+
+        with patch.object(
+            engine.sync_engine.dialect, "do_ping", side_effect=OSError("gone")
+        ):
+            second = await checkout(engine)
+
+        assert second is not first
+
+
+def disconnect_once(monkeypatch):
+    """Make the next Session.execute fail like a dropped connection would."""
+    calls = []
+    real_execute = Session.execute
+
+    def execute(self, *args, **kwargs):
+        calls.append(args[0])
+        if len(calls) == 1:
+            raise DBAPIError(
+                "SELECT", {}, OSError("connection reset"), connection_invalidated=True
+            )
+        return real_execute(self, *args, **kwargs)
+
+    monkeypatch.setattr(Session, "execute", execute)
+    return calls
+
+
+class TestRetryingSession:
+    @pytest.fixture
+    async def session_factory(self, engine):
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        return async_sessionmaker(
+            engine, expire_on_commit=False, sync_session_class=RetryingSession
+        )
+
+    async def test_first_statement_is_retried(self, session_factory, monkeypatch):
+        calls = disconnect_once(monkeypatch)
+
+        async with session_factory() as session:
+            result = await session.execute(text("SELECT 1"))
+
+        assert result.scalar() == 1
+        assert len(calls) == 2
+
+    async def test_get_is_retried(self, session_factory, monkeypatch):
+        async with session_factory() as session:
+            user = User(email="a@example.com", hashed_password="x", name="A")
+            session.add(user)
+            await session.commit()
+        calls = disconnect_once(monkeypatch)
+
+        async with session_factory() as session:
+            loaded = await session.get(User, user.id)
+
+        assert loaded.email == "a@example.com"
+        assert len(calls) == 2
+
+    async def test_not_retried_mid_transaction(self, session_factory, monkeypatch):
+        async with session_factory() as session:
+            await session.execute(text("SELECT 1"))
+            disconnect_once(monkeypatch)
+
+            with pytest.raises(DBAPIError):
+                await session.execute(text("SELECT 2"))
+
+    async def test_not_retried_with_pending_changes(self, session_factory, monkeypatch):
+        async with session_factory() as session:
+            session.add(User(email="a@example.com", hashed_password="x", name="A"))
+            disconnect_once(monkeypatch)
+
+            with pytest.raises(DBAPIError):
+                await session.execute(text("SELECT 1"))
+
+
+class TestReplicaRouter:
+    @pytest.fixture
+    async def replicas(self, tmp_path):
+        engines = [
+            create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/replica{i}.db")
+            for i in range(2)
+        ]
+        yield engines
+        for engine in engines:
+            await engine.dispose()
+
+    async def test_round_robin(self, replicas):
+        router = ReplicaRouter(replicas)
+
+        picks = [router.pick() for _ in range(4)]
+
+        assert picks == [0, 1, 0, 1]
+
+    async def test_least_busy(self, replicas):
+        router = ReplicaRouter(replicas, strategy="least_busy")
+
+        async with replicas[0].connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            assert [router.pick() for _ in range(2)] == [1, 1]
+        async with replicas[1].connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            assert router.pick() == 0
+
+    async def test_sessions_are_marked_as_replica(self, replicas):
+        router = ReplicaRouter(replicas)
+
+        async with router.session() as session:
+            await session.execute(text("SELECT 1"))
+            assert reads_from_replica(session)
+            assert session.bind is replicas[0]
+
+    def test_rejects_unknown_strategy(self, replicas):
+        with pytest.raises(ValueError):
+            ReplicaRouter(replicas, strategy="random")
+
+
+class TestAppSession:
+    async def test_callbacks_run_after_commits_that_wrote(self, engine):
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        calls = []
+
+        async def callback():
+            calls.append(1)
+
+        async with make_session_factory(engine)() as session:
+            session.info["after_write_commit"] = [callback]
+            await session.execute(text("SELECT 1"))
+            await session.commit()
+            assert calls == []
+
+            session.add(User(email="a@example.com", hashed_password="x", name="A"))
+            await session.commit()
+            assert calls == [1]
+
+            await session.commit()  # nothing new written
+            assert calls == [1]
@@ -0,0 +1,91 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core import db_metrics
+from app.core.db_metrics import (
+    DB_CHECKOUT_WAIT,
+    DB_QUERY_TIME,
+    DB_SLOW_QUERIES,
+    TimedPool,
+    instrument_engine,
+    normalize_sql,
+    slow_queries,
+)
+from app.core.metrics import render_metrics
+
+
+@pytest.mark.parametrize(
+    "statement, expected",
+    [
+        (
+            "SELECT assets.id\nFROM assets\nWHERE assets.id = $1::VARCHAR",
+            "SELECT assets.id FROM assets WHERE assets.id = ?::VARCHAR",
+        ),
+        (
+            "SELECT * FROM assets WHERE id IN (?, ?, ?) LIMIT 10",
+            "SELECT * FROM assets WHERE id IN (?) LIMIT ?",
+        ),
+        (
+            "INSERT INTO t (a, b) VALUES (:a_0, :b_0), (:a_1, :b_1)",
+            "INSERT INTO t (a, b) VALUES (?)",
+        ),
+        ("SELECT 'it''s' FROM anon_1", "SELECT ? FROM anon_1"),
+    ],
+)
+def test_normalize_sql(statement, expected):
+    assert normalize_sql(statement) == expected
+
+
+@pytest.fixture
+async def engine(tmp_path):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path}/test.db",
+        poolclass=TimedPool,
+        pool_logging_name="test",
+    )
+    yield engine
+    await engine.dispose()
+    db_metrics._engines.pop("test", None)
+    slow_queries.clear()
+
+
+async def test_statements_and_checkouts_are_timed(engine):
+    instrument_engine(engine, "test")
+    checkouts = DB_CHECKOUT_WAIT.count(engine="test")
+    statement = "SELECT ? FROM sqlite_master"
+    queries = DB_QUERY_TIME.count(engine="test", statement=statement)
+
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1 FROM sqlite_master"))
+        await conn.execute(text("SELECT 2 FROM sqlite_master"))
+
+    assert DB_CHECKOUT_WAIT.count(engine="test") == checkouts + 1
+    assert DB_QUERY_TIME.count(engine="test", statement=statement) == queries + 2
+    assert not slow_queries  # no threshold set
+
+
+async def test_pool_gauges(engine):
+    instrument_engine(engine, "test")
+
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+        assert 'db_pool_checked_out{engine="test"} 1' in render_metrics()
+    assert 'db_pool_checked_out{engine="test"} 0' in render_metrics()
+    assert 'db_pool_checked_in{engine="test"} 1' in render_metrics()
+
+
+async def test_slow_query_log_with_plan(engine):
+    instrument_engine(engine, "test", slow_query_ms=0, explain=True)
+    slow = DB_SLOW_QUERIES.get(engine="test")
+
+    async with engine.connect() as conn:
+        await conn.execute(text("CREATE TABLE t (id INTEGER PRIMARY KEY)"))
+        result = await conn.execute(text("SELECT id FROM t WHERE id = :id"), {"id": 1})
+        assert result.all() == []
+
+    assert DB_SLOW_QUERIES.get(engine="test") == slow + 2
+    select, create = slow_queries
+    assert create["plan"] is None
+    assert select["statement"] == "SELECT id FROM t WHERE id = ?"
+    assert any("t USING" in line for line in select["plan"])
@@ -0,0 +1,124 @@
+from io import BytesIO
+
+import pytest
+from PIL import Image, ImageEnhance
+
+from app.services.description_cache import (
+    DescriptionCache,
+    dhash,
+    hamming,
+    phash_bands,
+)
+
+
+def make_image(fmt="PNG", size=(128, 96), brightness=1.0, flip=False):
+    img = Image.new("RGB", size)
+    img.putdata(
+        [
+            ((x * 255) // size[0], (y * 255) // size[1], ((x ^ y) * 7) % 256)
+            for y in range(size[1])
+            for x in range(size[0])
+        ]
+    )
+    if flip:
+        img = img.transpose(Image.Transpose.FLIP_LEFT_RIGHT)
+    if brightness != 1.0:
+        img = ImageEnhance.Brightness(img).enhance(brightness)
+    buf = BytesIO()
+    img.save(buf, format=fmt)
+    return buf.getvalue()
+
+
+@pytest.fixture
+def cache(fake_redis):
+    return DescriptionCache(fake_redis, namespace="ollama:llava:v1", ttl=60)
+
+
+class TestPerceptualHash:
+    def test_reencoded_image_is_close(self):
+        png = dhash(make_image("PNG"))
+        jpeg = dhash(make_image("JPEG", size=(256, 192), brightness=1.1))
+        assert hamming(png, jpeg) <= 6
+
+    def test_different_image_is_far(self):
+        assert hamming(dhash(make_image()), dhash(make_image(flip=True))) > 20
+
+    def test_not_an_image(self):
+        assert dhash(b"not an image") is None
+
+    def test_bands_cover_all_bits(self):
+        value = (1 << 64) - 1
+        bands = phash_bands(value, 7)
+        assert len(bands) == 7
+        assert sum(b.bit_length() for b in bands) == 64
+
+
+class TestDescriptionCache:
+    async def test_miss_then_hit(self, cache):
+        image = make_image()
+        description, key = await cache.lookup(image)
+        assert description is None
+
+        await cache.store(key, "A grey laptop")
+        description, _ = await cache.lookup(image)
+        assert description == "A grey laptop"
+
+    async def test_namespace_isolates_models(self, fake_redis, cache):
+        image = make_image()
+        _, key = await cache.lookup(image)
+        await cache.store(key, "A grey laptop")
+
+        other = DescriptionCache(fake_redis, namespace="ollama:bakllava:v1", ttl=60)
+        description, _ = await other.lookup(image)
+        assert description is None
+
+    async def test_exact_only_without_threshold(self, cache):
+        _, key = await cache.lookup(make_image("PNG"))
+        await cache.store(key, "A grey laptop")
+
+        description, _ = await cache.lookup(make_image("JPEG"))
+        assert description is None
+
+    async def test_near_duplicate_hit(self, fake_redis):
+        cache = DescriptionCache(
+            fake_redis, namespace="ollama:llava:v1", ttl=60, phash_threshold=8
+        )
+        _, key = await cache.lookup(make_image("PNG"))
+        await cache.store(key, "A grey laptop")
+
+        description, _ = await cache.lookup(make_image("JPEG", brightness=1.1))
+        assert description == "A grey laptop"
+
+        description, _ = await cache.lookup(make_image(flip=True))
+        assert description is None
+
+    async def test_disk_tier_survives_redis_loss(self, fake_redis, tmp_path):
+        cache = DescriptionCache(
+            fake_redis, namespace="ollama:llava:v1", ttl=60, disk_dir=str(tmp_path)
+        )
+        image = make_image()
+        _, key = await cache.lookup(image)
+        await cache.store(key, "A grey laptop")
+
+        fake_redis.store.clear()
+        description, _ = await cache.lookup(image)
+        assert description == "A grey laptop"
+        # Redis is refilled from disk
+        assert "A grey laptop" in fake_redis.store.values()
+
+    async def test_redis_errors_are_misses(self):
+        class BrokenRedis:
+            async def get(self, key):
+                raise ConnectionError("down")
+
+            async def setex(self, key, expire, value):
+                raise ConnectionError("down")
+
+        cache = DescriptionCache(BrokenRedis(), namespace="ns", ttl=60)
+        description, key = await cache.lookup(make_image())
+        assert description is None
+        await cache.store(key, "A grey laptop")
+
+    def test_threshold_out_of_range(self, fake_redis):
+        with pytest.raises(ValueError, match="threshold"):
+            DescriptionCache(fake_redis, namespace="ns", ttl=60, phash_threshold=20)
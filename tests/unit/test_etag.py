@@ -0,0 +1,41 @@
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app.core.etag import check_not_modified, etag_matches, make_etag
+
+
+def make_request(if_none_match=None):
+    headers = []
+    if if_none_match is not None:
+        headers.append((b"if-none-match", if_none_match.encode()))
+    return Request({"type": "http", "headers": headers})
+
+
+def test_make_etag():
+    assert make_etag("abc", 3) == '"abc-3"'
+
+
+@pytest.mark.parametrize(
+    "header,expected",
+    [
+        (None, False),
+        ("", False),
+        ('"abc-3"', True),
+        ('W/"abc-3"', True),
+        ('"abc-2", "abc-3"', True),
+        ('"abc-2"', False),
+        ("*", True),
+    ],
+)
+def test_etag_matches(header, expected):
+    assert etag_matches(header, '"abc-3"') is expected
+
+
+def test_check_not_modified_raises_304_with_etag():
+    with pytest.raises(HTTPException) as exc:
+        check_not_modified(make_request('"abc-3"'), '"abc-3"')
+    assert exc.value.status_code == 304
+    assert exc.value.headers == {"ETag": '"abc-3"'}
+
+    check_not_modified(make_request('"abc-2"'), '"abc-3"')
@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from app.models.image_job import ImageJob, JOB_FAILED, JOB_RUNNING, JOB_SUCCEEDED
+from app.services.ai_service import AIOverloadedError
+from app.services.image_job_service import (
+    ImageJobQueue,
+    ImageJobQueueFullError,
+    ImageJobService,
+)
+
+
+@pytest.mark.asyncio
+async def test_fail_unfinished_leaves_finished_jobs(session):
+    svc = ImageJobService()
+    queued = await svc.create_job(session, "a1")
+    running = ImageJob(asset_id="a2", status=JOB_RUNNING)
+    done = ImageJob(asset_id="a3", status=JOB_SUCCEEDED, description="Done")
+    session.add_all([running, done])
+    await session.commit()
+
+    assert await svc.fail_unfinished(session, "Interrupted") == 2
+
+    for job in (queued, running, done):
+        await session.refresh(job)
+    assert queued.status == running.status == JOB_FAILED
+    assert queued.error == "Interrupted"
+    assert done.status == JOB_SUCCEEDED
+
+
+@pytest.mark.asyncio
+async def test_submit_rejects_when_full(session, session_factory):
+    queue = ImageJobQueue(AsyncMock(), session_factory=session_factory, maxsize=1)
+
+    await queue.submit(session, "a1", b"img", "image/png")
+    with pytest.raises(ImageJobQueueFullError):
+        await queue.submit(session, "a1", b"img", "image/png")
+
+
+@pytest.mark.asyncio
+async def test_worker_skips_jobs_no_longer_queued(session, session_factory):
+    ai = AsyncMock()
+    queue = ImageJobQueue(ai, session_factory=session_factory, workers=1)
+    await queue.submit(session, "a1", b"img", "image/png")
+    await ImageJobService().fail_unfinished(session, "Interrupted")
+
+    queue.start()
+    await queue.join()
+    await queue.stop()
+
+    ai.describe_asset_image.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_worker_waits_out_overload(session, session_factory):
+    ai = AsyncMock()
+    ai.describe_asset_image.side_effect = [AIOverloadedError("busy", 0), "A laptop."]
+    queue = ImageJobQueue(ai, session_factory=session_factory, workers=1)
+    job = await queue.submit(session, "a1", b"img", "image/png")
+
+    queue.start()
+    await queue.join()
+    await queue.stop()
+
+    assert ai.describe_asset_image.call_count == 2
+    await session.refresh(job)
+    # Got a description; only the (missing) asset stopped it being saved
+    assert job.error == "Asset not found"
+
+
+@pytest.mark.asyncio
+async def test_worker_survives_failing_crash_handler(session, session_factory):
+    ai = AsyncMock()
+    ai.describe_asset_image.side_effect = RuntimeError("boom")
+    queue = ImageJobQueue(ai, session_factory=session_factory, workers=1)
+    await queue.submit(session, "a1", b"img", "image/png")
+    await queue.submit(session, "a2", b"img", "image/png")
+
+    with patch.object(queue, "_finish", AsyncMock(side_effect=OSError("db down"))):
+        queue.start()
+        await asyncio.wait_for(queue.join(), timeout=5)
+        await queue.stop()
+
+    assert ai.describe_asset_image.call_count == 2
@@ -0,0 +1,78 @@
+import os
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+from app.services.image_processing import prepare_image
+
+
+def photo(size=(3000, 2000), fmt="PNG", mode="RGB", orientation=None):
+    """Noisy image, so it compresses about as badly as a real photo."""
+    img = Image.frombytes("RGB", size, os.urandom(size[0] * size[1] * 3))
+    img = img.convert(mode)
+    buf = BytesIO()
+    kwargs = {}
+    if orientation is not None:
+        exif = Image.Exif()
+        exif[0x0112] = orientation
+        kwargs["exif"] = exif
+    img.save(buf, format=fmt, **kwargs)
+    return buf.getvalue()
+
+
+def decode(data):
+    return Image.open(BytesIO(data))
+
+
+def test_large_image_is_downscaled_and_reencoded():
+    original = photo()
+    prepared, mime = prepare_image(original, "image/png", max_edge=1024)
+
+    assert mime == "image/jpeg"
+    assert decode(prepared).size == (1024, 683)
+    assert len(prepared) * 10 < len(original)
+
+
+def test_webp_output():
+    prepared, mime = prepare_image(photo(), "image/png", max_edge=512, fmt="webp")
+
+    assert mime == "image/webp"
+    assert decode(prepared).format == "WEBP"
+
+
+def test_exif_orientation_applied():
+    # Orientation 6: stored landscape, displayed rotated 90 degrees clockwise
+    original = photo(size=(1600, 1200), fmt="JPEG", orientation=6)
+    prepared, _ = prepare_image(original, "image/jpeg", max_edge=800)
+
+    assert decode(prepared).size == (600, 800)
+
+
+def test_transparency_flattened_for_jpeg():
+    prepared, mime = prepare_image(
+        photo(size=(1200, 1200), mode="RGBA"), "image/png", max_edge=256
+    )
+
+    assert mime == "image/jpeg"
+    assert decode(prepared).mode == "RGB"
+
+
+def test_undecodable_bytes_pass_through():
+    assert prepare_image(b"not an image", "image/jpeg") == (
+        b"not an image",
+        "image/jpeg",
+    )
+
+
+def test_original_kept_when_not_smaller():
+    buf = BytesIO()
+    Image.new("RGB", (8, 8), "white").save(buf, format="PNG")
+    tiny = buf.getvalue()
+
+    assert prepare_image(tiny, "image/png", max_edge=1024) == (tiny, "image/png")
+
+
+def test_unknown_format_rejected():
+    with pytest.raises(ValueError, match="Unsupported output format"):
+        prepare_image(photo((10, 10)), "image/png", fmt="BMP")
@@ -0,0 +1,66 @@
+import base64
+import json
+
+import httpx
+import pytest
+
+from app.core.json_body import BASE64_CHUNK, Base64Bytes, JSONBody
+
+
+async def read(body):
+    return b"".join([chunk async for chunk in body])
+
+
+@pytest.mark.parametrize("size", [0, 1, 2, 3, BASE64_CHUNK + 1, 3 * BASE64_CHUNK])
+async def test_matches_inline_encoding(size):
+    data = bytes(range(256)) * (size // 256) + bytes(size % 256)
+    payload = {
+        "model": "llava",
+        "prompt": 'Say "hi"\n',
+        "images": [Base64Bytes(data), Base64Bytes(b"xy", "data:image/png;base64,")],
+    }
+    body = JSONBody(payload)
+    raw = await read(body)
+
+    expected = {
+        **payload,
+        "images": [
+            base64.b64encode(data).decode(),
+            "data:image/png;base64," + base64.b64encode(b"xy").decode(),
+        ],
+    }
+    assert json.loads(raw) == expected
+    assert len(raw) == len(body)
+
+
+async def test_can_be_read_twice():
+    body = JSONBody({"images": [Base64Bytes(b"abc")]})
+    assert await read(body) == await read(body)
+
+
+async def test_encodes_in_chunks():
+    body = JSONBody({"images": [Base64Bytes(b"x" * (BASE64_CHUNK * 3))]})
+    chunks = [chunk async for chunk in body]
+    assert max(len(chunk) for chunk in chunks) == BASE64_CHUNK * 4 // 3
+
+
+def test_other_objects_still_rejected():
+    with pytest.raises(TypeError):
+        JSONBody({"when": object()})
+
+
+async def test_sent_with_content_length():
+    seen = {}
+
+    def handler(request):
+        seen["headers"] = request.headers
+        seen["payload"] = json.loads(request.content)
+        return httpx.Response(200)
+
+    body = JSONBody({"images": [Base64Bytes(b"abc")]})
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        await client.post("http://test/", content=body, headers=body.headers())
+
+    assert seen["headers"]["content-length"] == str(len(body))
+    assert "transfer-encoding" not in seen["headers"]
+    assert seen["payload"] == {"images": ["YWJj"]}
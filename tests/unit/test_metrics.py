@@ -0,0 +1,57 @@
+from app.core.metrics import Counter, Gauge, Histogram, render_metrics
+
+
+def test_counter_with_labels():
+    counter = Counter("test_requests_total", "Requests", labelnames=("reason",))
+    counter.inc(reason="full")
+    counter.inc(2, reason="full")
+
+    assert counter.get(reason="full") == 3
+    assert 'test_requests_total{reason="full"} 3' in render_metrics()
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("test_wait_seconds", "Wait", buckets=(0.1, 1))
+    for value in (0.05, 0.5, 0.7, 3):
+        histogram.observe(value)
+
+    assert histogram.count() == 4
+    assert histogram.samples() == [
+        'test_wait_seconds_bucket{le="0.1"} 1',
+        'test_wait_seconds_bucket{le="1"} 3',
+        'test_wait_seconds_bucket{le="+Inf"} 4',
+        "test_wait_seconds_sum 4.25",
+        "test_wait_seconds_count 4",
+    ]
+
+
+def test_gauge_callback():
+    depth = [3]
+    gauge = Gauge("test_depth", "Depth", read=lambda: depth[0])
+    depth[0] = 5
+
+    assert gauge.samples() == ["test_depth 5"]
+    assert "# TYPE test_depth gauge" in render_metrics()
+
+
+def test_labelled_gauge_callback():
+    gauge = Gauge(
+        "test_pool_in_use",
+        "In use",
+        read=lambda: {("replica1",): 2, ("primary",): 1},
+        labelnames=("engine",),
+    )
+
+    assert gauge.samples() == [
+        'test_pool_in_use{engine="primary"} 1',
+        'test_pool_in_use{engine="replica1"} 2',
+    ]
+
+
+def test_label_values_are_escaped():
+    counter = Counter("test_statements_total", "Statements", labelnames=("sql",))
+    counter.inc(sql='SELECT "user".id\nFROM "user"')
+
+    assert counter.samples() == [
+        'test_statements_total{sql="SELECT \\"user\\".id\\nFROM \\"user\\""} 1'
+    ]
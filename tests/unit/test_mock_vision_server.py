@@ -0,0 +1,77 @@
+import random
+
+import httpx
+import pytest
+
+from app.services.ai_service import AIProviderError, LMStudioProvider, OllamaProvider
+from benchmarks.mock_vision_server import DESCRIPTION, MockVisionServer, parse_latency
+
+PROVIDERS = [OllamaProvider, LMStudioProvider]
+
+
+def provider_for(server, provider_class):
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app))
+    return provider_class(endpoint="http://mock", client=client)
+
+
+@pytest.mark.parametrize("spec", ["fixed:0.2", "uniform:0.1,0.3", "lognormal:0.2,0.01"])
+def test_parse_latency(spec):
+    sample = parse_latency(spec)
+    assert 0.1 <= sample(random.Random(1)) <= 0.3
+
+
+@pytest.mark.parametrize("spec", ["fixed", "uniform:1", "normal:1,2"])
+def test_parse_latency_rejects_bad_spec(spec):
+    with pytest.raises(ValueError):
+        parse_latency(spec)
+
+
+@pytest.mark.parametrize("provider_class", PROVIDERS)
+async def test_describe_image(provider_class):
+    server = MockVisionServer("fixed:0")
+    provider = provider_for(server, provider_class)
+
+    assert await provider.describe_image(b"img", "image/png") == DESCRIPTION
+    assert server.stats["requests"] == 1
+    assert server.stats["peak_in_flight"] == 1
+
+
+@pytest.mark.parametrize("provider_class", PROVIDERS)
+async def test_stream_description(provider_class):
+    provider = provider_for(MockVisionServer("fixed:0"), provider_class)
+
+    pieces = [piece async for piece in provider.stream_description(b"img", "image/png")]
+
+    assert len(pieces) > 1
+    assert "".join(pieces) == DESCRIPTION
+
+
+@pytest.mark.parametrize("provider_class", PROVIDERS)
+async def test_describe_images(provider_class):
+    provider = provider_for(MockVisionServer("fixed:0"), provider_class)
+
+    descriptions = await provider.describe_images(
+        [(b"a", "image/png"), (b"b", "image/jpeg")]
+    )
+
+    assert descriptions == [f"Image 1: {DESCRIPTION}", f"Image 2: {DESCRIPTION}"]
+
+
+@pytest.mark.parametrize("provider_class", PROVIDERS)
+async def test_error_rate(provider_class):
+    server = MockVisionServer("fixed:0", error_rate=1)
+    provider = provider_for(server, provider_class)
+
+    with pytest.raises(AIProviderError):
+        await provider.describe_image(b"img", "image/png")
+    assert server.stats["errors"] == server.stats["requests"] >= 1
+
+
+async def test_warm_up_loads_model():
+    server = MockVisionServer("fixed:0", load_time=0.01)
+    provider = provider_for(server, OllamaProvider)
+
+    await provider.warm_up()
+
+    assert server.loaded
+    assert server.stats["requests"] == 0
@@ -0,0 +1,103 @@
+import pytest
+
+from app.core.multipart import (
+    MultipartError,
+    PartTooLargeError,
+    iter_parts,
+    read_file_part,
+)
+
+BOUNDARY = "testboundary"
+
+
+def part(name, data, filename=None, content_type=None):
+    disposition = f'form-data; name="{name}"'
+    if filename:
+        disposition += f'; filename="{filename}"'
+    head = f"--{BOUNDARY}\r\nContent-Disposition: {disposition}\r\n"
+    if content_type:
+        head += f"Content-Type: {content_type}\r\n"
+    return head.encode() + b"\r\n" + data + b"\r\n"
+
+
+def body(*parts):
+    return b"".join(parts) + f"--{BOUNDARY}--\r\n".encode()
+
+
+class FakeRequest:
+    """Streams a body in fixed-size chunks, counting how many were read."""
+
+    def __init__(self, data, chunk_size=1024, content_length=True):
+        self.data = data
+        self.chunk_size = chunk_size
+        self.chunks_read = 0
+        self.headers = {"content-type": f"multipart/form-data; boundary={BOUNDARY}"}
+        if content_length:
+            self.headers["content-length"] = str(len(data))
+
+    async def stream(self):
+        for i in range(0, len(self.data), self.chunk_size):
+            self.chunks_read += 1
+            yield self.data[i : i + self.chunk_size]
+
+
+async def test_iter_parts_yields_each_part():
+    request = FakeRequest(
+        body(
+            part("a", b"\xff\xd8\xff" * 10, "a.jpg", "image/jpeg"),
+            part("note", b"hello"),
+        )
+    )
+    parts = [p async for p in iter_parts(request, 1000)]
+
+    assert [p.name for p in parts] == ["a", "note"]
+    assert parts[0].filename == "a.jpg"
+    assert parts[0].content_type == "image/jpeg"
+    assert parts[0].data == b"\xff\xd8\xff" * 10
+    assert parts[1].filename is None
+
+
+async def test_iter_parts_drops_oversized_data():
+    request = FakeRequest(body(part("a", b"x" * 5000, "a.jpg")))
+    [uploaded] = [p async for p in iter_parts(request, 1000)]
+
+    assert uploaded.too_large
+    assert uploaded.size == 5000
+    assert len(uploaded.data) <= 1000
+
+
+async def test_read_file_part():
+    request = FakeRequest(
+        body(part("note", b"hello"), part("image", b"data", "a.png", "image/png"))
+    )
+    uploaded = await read_file_part(request, "image", 1000)
+
+    assert uploaded.data == b"data"
+    assert (
+        await read_file_part(FakeRequest(body(part("note", b"x"))), "image", 10) is None
+    )
+
+
+async def test_read_file_part_stops_reading_past_the_cap():
+    data = body(part("image", b"x" * 1_000_000, "a.jpg"))
+    request = FakeRequest(data, content_length=False)
+
+    with pytest.raises(PartTooLargeError):
+        await read_file_part(request, "image", 10_000)
+    assert request.chunks_read < 20
+
+
+async def test_read_file_part_rejects_by_content_length():
+    request = FakeRequest(body(part("image", b"x" * 1_000_000, "a.jpg")))
+
+    with pytest.raises(PartTooLargeError):
+        await read_file_part(request, "image", 10_000)
+    assert request.chunks_read == 0
+
+
+async def test_not_multipart():
+    request = FakeRequest(b"{}")
+    request.headers["content-type"] = "application/json"
+
+    with pytest.raises(MultipartError):
+        await read_file_part(request, "image", 10)
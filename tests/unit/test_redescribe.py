@@ -0,0 +1,148 @@
+from datetime import date
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.commands.redescribe import Redescriber, current_target, index_images
+from app.core.security import hash_password
+from app.models.asset import Asset
+from app.models.redescribe_run import RedescribeRun
+from app.models.user import User
+from app.services.ai_service import AIProviderError
+
+PNG = b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR"
+
+
+@pytest.fixture
+async def asset_ids(session):
+    owner = User(email="bulk@example.com", hashed_password=hash_password("password"))
+    session.add(owner)
+    await session.commit()
+    assets = [
+        Asset(
+            name=f"Laptop {i}",
+            type="Hardware",
+            description="Old",
+            check_in_date=date(2024, 1, 1),
+            owner_id=owner.id,
+        )
+        for i in range(5)
+    ]
+    session.add_all(assets)
+    await session.commit()
+    return sorted(asset.id for asset in assets)
+
+
+@pytest.fixture
+def image_dir(tmp_path, asset_ids):
+    # Every asset but the last has an image; the first one is corrupt
+    (tmp_path / f"{asset_ids[0]}.jpg").write_bytes(b"not an image")
+    for asset_id in asset_ids[1:4]:
+        (tmp_path / f"{asset_id}.png").write_bytes(PNG)
+    (tmp_path / "notes.txt").write_text("ignored")
+    return tmp_path
+
+
+@pytest.fixture
+def ai():
+    ai = AsyncMock()
+    ai.describe_asset_image.return_value = "New"
+    return ai
+
+
+async def descriptions(session, ids):
+    session.expire_all()
+    return [(await session.get(Asset, asset_id)).description for asset_id in ids]
+
+
+def test_index_images(image_dir, asset_ids):
+    images = index_images(image_dir)
+    assert sorted(images) == asset_ids[:4]
+
+
+async def test_full_run(session, session_factory, image_dir, asset_ids, ai, fake_redis):
+    redescriber = Redescriber(
+        ai, index_images(image_dir), session_factory=session_factory, batch_size=2
+    )
+    run = await redescriber.run(await redescriber.start("test"))
+
+    assert (run.processed, run.updated, run.skipped, run.failed) == (5, 3, 1, 1)
+    assert run.last_asset_id == asset_ids[-1]
+    assert run.finished_at is not None
+    assert await descriptions(session, asset_ids) == ["Old", "New", "New", "New", "Old"]
+    assert ai.describe_asset_image.call_count == 3
+
+
+async def test_resumes_from_checkpoint(
+    session, session_factory, image_dir, asset_ids, ai, fake_redis
+):
+    session.add(
+        RedescribeRun(
+            name="test",
+            target=current_target(),
+            last_asset_id=asset_ids[2],
+            processed=3,
+            updated=2,
+        )
+    )
+    await session.commit()
+
+    redescriber = Redescriber(
+        ai, index_images(image_dir), session_factory=session_factory, batch_size=2
+    )
+    run = await redescriber.run(await redescriber.start("test"))
+
+    assert ai.describe_asset_image.call_count == 1
+    assert (run.processed, run.updated) == (5, 3)
+    assert await descriptions(session, asset_ids[2:]) == ["Old", "New", "Old"]
+
+
+async def test_finished_run_needs_restart(session_factory, image_dir, ai, fake_redis):
+    redescriber = Redescriber(
+        ai, index_images(image_dir), session_factory=session_factory
+    )
+    await redescriber.run(await redescriber.start("test"))
+    ai.describe_asset_image.reset_mock()
+
+    await redescriber.run(await redescriber.start("test"))
+    ai.describe_asset_image.assert_not_called()
+
+    run = await redescriber.run(await redescriber.start("test", restart=True))
+    assert ai.describe_asset_image.call_count == 3
+    assert run.processed == 5
+
+
+async def test_new_prompt_or_model_starts_over(
+    session, session_factory, image_dir, asset_ids, ai, fake_redis
+):
+    session.add(
+        RedescribeRun(
+            name="test", target="ollama:llava:old", last_asset_id=asset_ids[-1]
+        )
+    )
+    await session.commit()
+
+    redescriber = Redescriber(
+        ai, index_images(image_dir), session_factory=session_factory
+    )
+    run = await redescriber.run(await redescriber.start("test"))
+
+    assert run.target == current_target()
+    assert ai.describe_asset_image.call_count == 3
+
+
+async def test_provider_outage_stops_before_checkpoint(
+    session, session_factory, image_dir, asset_ids, ai, fake_redis
+):
+    ai.describe_asset_image.side_effect = AIProviderError("Can't connect")
+    redescriber = Redescriber(
+        ai, index_images(image_dir), session_factory=session_factory, batch_size=2
+    )
+    run = await redescriber.start("test")
+
+    with pytest.raises(AIProviderError):
+        await redescriber.run(run)
+
+    saved = await session.get(RedescribeRun, "test")
+    await session.refresh(saved)
+    assert (saved.last_asset_id, saved.processed, saved.failed) == (None, 0, 0)
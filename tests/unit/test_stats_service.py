@@ -0,0 +1,80 @@
+import pytest
+from datetime import date
+from sqlalchemy import update
+
+from app.models.asset import Asset
+from app.models.asset_stat import AssetStat
+from app.models.user import User
+from app.core.security import hash_password
+from app.services.asset_service import AssetService
+from app.services.stats_service import StatsService, stat_deltas
+
+
+@pytest.fixture
+async def owner(session):
+    user = User(email="stats@example.com", hashed_password=hash_password("password"))
+    session.add(user)
+    await session.commit()
+    return user
+
+
+def test_stat_deltas_cancel_out():
+    snap = ("Hardware", 1, "checked_in", 2)
+    assert stat_deltas(snap, snap) == {}
+    assert stat_deltas(None, snap)[("type", "Hardware")] == (1, 2)
+    assert stat_deltas(snap, ("Hardware", 1, "checked_in", 5)) == {
+        ("total", "all"): (0, 3),
+        ("type", "Hardware"): (0, 3),
+        ("owner", "1"): (0, 3),
+        ("status", "checked_in"): (0, 3),
+    }
+
+
+@pytest.mark.asyncio
+async def test_writes_maintain_stats(session, owner):
+    svc = AssetService()
+    laptop = await svc.create_asset(
+        session, "Laptop", "Hardware", date(2024, 1, 1), count=3, owner_id=owner.id
+    )
+    await svc.create_asset(
+        session, "Licence", "Software", date(2024, 1, 1), count=10, owner_id=owner.id
+    )
+
+    stats = await svc.get_stats(session)
+    assert stats["total"] == {"assets": 2, "units": 13}
+    assert stats["by_type"]["Hardware"] == {"assets": 1, "units": 3}
+    assert stats["by_owner"][owner.id] == {"assets": 2, "units": 13}
+    assert stats["checked_in"] == {"assets": 2, "units": 13}
+
+    await svc.update_asset(session, laptop, count=4, check_out_date=date(2024, 2, 1))
+    stats = await svc.get_stats(session)
+    assert stats["total"] == {"assets": 2, "units": 14}
+    assert stats["checked_out"] == {"assets": 1, "units": 4}
+    assert stats["checked_in"] == {"assets": 1, "units": 10}
+
+    await svc.delete_asset(session, laptop)
+    stats = await svc.get_stats(session)
+    assert stats["total"] == {"assets": 1, "units": 10}
+    assert "Hardware" not in stats["by_type"]
+    assert stats["checked_out"] == {"assets": 0, "units": 0}
+
+
+@pytest.mark.asyncio
+async def test_reconcile_fixes_drift(session, owner):
+    svc = AssetService()
+    await svc.create_asset(
+        session, "Laptop", "Hardware", date(2024, 1, 1), count=3, owner_id=owner.id
+    )
+    assert await StatsService().reconcile(session) == 0
+
+    # Simulate drift: out-of-band write plus a corrupted counter
+    await session.execute(update(Asset).values(type="Peripheral"))
+    await session.execute(
+        update(AssetStat).where(AssetStat.dimension == "total").values(units=99)
+    )
+    await session.commit()
+
+    assert await StatsService().reconcile(session) == 3
+    stats = await svc.get_stats(session)
+    assert stats["total"] == {"assets": 1, "units": 3}
+    assert stats["by_type"] == {"Peripheral": {"assets": 1, "units": 3}}
@@ -0,0 +1,27 @@
+from datetime import datetime
+
+import pytest
+
+from app.core.tasks import within_window
+
+# 2026-10-19 is a Monday
+MONDAY_9AM = datetime(2026, 10, 19, 9, 0)
+SATURDAY_9AM = datetime(2026, 10, 24, 9, 0)
+
+
+@pytest.mark.parametrize(
+    "spec, now, expected",
+    [
+        (None, SATURDAY_9AM, True),
+        ("", MONDAY_9AM, True),
+        ("08:00-18:00", SATURDAY_9AM, True),
+        ("10:00-18:00", MONDAY_9AM, False),
+        ("mon-fri 08:00-18:00", MONDAY_9AM, True),
+        ("mon-fri 08:00-18:00", SATURDAY_9AM, False),
+        ("sat 08:00-12:00", SATURDAY_9AM, True),
+        ("fri-mon 08:00-18:00", SATURDAY_9AM, True),
+        ("MON-FRI 08:00-09:00", MONDAY_9AM, False),
+    ],
+)
+def test_within_window(spec, now, expected):
+    assert within_window(spec, now) is expected